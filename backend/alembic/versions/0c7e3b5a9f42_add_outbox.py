@@ -0,0 +1,52 @@
+"""add outbox
+
+Revision ID: 0c7e3b5a9f42
+Revises: f2a9c4d81b36
+Create Date: 2026-10-19 18:40:12.903175
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0c7e3b5a9f42'
+down_revision = 'f2a9c4d81b36'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('outbox_events',
+    sa.Column('id', sa.String(), nullable=False),
+    sa.Column('organizationId', sa.String(), nullable=False),
+    sa.Column('sequence', sa.Integer(), nullable=False),
+    sa.Column('type', sa.String(), nullable=False),
+    sa.Column('entityId', sa.String(), nullable=True),
+    sa.Column('payload', sa.JSON(none_as_null=True), nullable=True),
+    sa.Column('createdAt', sa.Integer(), nullable=True),
+    sa.ForeignKeyConstraint(['organizationId'], ['organizations.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('organizationId', 'sequence', name='uq_outbox_events_org_sequence')
+    )
+    op.create_index('ix_outbox_events_created', 'outbox_events', ['createdAt'], unique=False)
+    op.create_table('outbox_sequences',
+    sa.Column('organizationId', sa.String(), nullable=False),
+    sa.Column('lastSequence', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['organizationId'], ['organizations.id'], ),
+    sa.PrimaryKeyConstraint('organizationId')
+    )
+    op.create_table('outbox_cursors',
+    sa.Column('consumer', sa.String(), nullable=False),
+    sa.Column('organizationId', sa.String(), nullable=False),
+    sa.Column('lastSequence', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['organizationId'], ['organizations.id'], ),
+    sa.PrimaryKeyConstraint('consumer', 'organizationId')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('outbox_cursors')
+    op.drop_table('outbox_sequences')
+    op.drop_index('ix_outbox_events_created', table_name='outbox_events')
+    op.drop_table('outbox_events')
@@ -0,0 +1,24 @@
+"""add screenshot timestamp index
+
+Revision ID: 3b81f6aa60cd
+Revises: aeffeaa1b303
+Create Date: 2026-10-19 08:46:42.876991
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3b81f6aa60cd'
+down_revision = 'aeffeaa1b303'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_screenshots_org_timestamp', 'screenshots', ['organizationId', 'timestamp'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_screenshots_org_timestamp', table_name='screenshots')
\ No newline at end of file
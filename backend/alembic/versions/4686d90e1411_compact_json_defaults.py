@@ -0,0 +1,124 @@
+"""compact screenshot permissions and project json defaults
+
+Revision ID: 4686d90e1411
+Revises: a746bb39e8bd
+Create Date: 2026-10-19 13:02:44.930127
+
+"""
+from alembic import op
+import sqlalchemy as sa
+import json
+
+
+# revision identifiers, used by Alembic.
+revision = '4686d90e1411'
+down_revision = 'a746bb39e8bd'
+branch_labels = None
+depends_on = None
+
+# Frozen copies of app/db/compact.py and the Project defaults at this revision
+PERMISSION_KEYS = ('accessibility', 'screenAndSystemAudioRecording')
+PERMISSION_STATUSES = ('undetermined', 'authorized', 'denied', 'restricted')
+PROJECT_DEFAULTS = {
+    'statuses': ['To do', 'On hold', 'In progress', 'Done'],
+    'priorities': ['low', 'medium', 'high'],
+    'payroll': {'billRate': 0, 'overtimeBillRate': 0},
+    'screenshotSettings': {'screenshotEnabled': True},
+}
+BATCH_SIZE = 10000
+
+
+def _json_field(dialect, key):
+    if dialect == 'postgresql':
+        return f'("systemPermissions"::jsonb ->> \'{key}\')'
+    return f'json_extract("systemPermissions", \'$.{key}\')'
+
+
+def _is_object(dialect):
+    # Rows holding JSON null, a scalar or an array are left alone; CASE keeps
+    # the key functions, which fail on them, from being evaluated
+    if dialect == 'postgresql':
+        return 'jsonb_typeof("systemPermissions"::jsonb) = \'object\''
+    return 'json_valid("systemPermissions") AND json_type("systemPermissions") = \'object\''
+
+
+def _key_count(dialect):
+    if dialect == 'postgresql':
+        return '(SELECT count(*) FROM jsonb_object_keys("systemPermissions"::jsonb))'
+    return '(SELECT count(*) FROM json_each("systemPermissions"))'
+
+
+def _backfill_screenshots(bind):
+    dialect = bind.dialect.name
+    statuses = ', '.join(f"'{status}'" for status in PERMISSION_STATUSES)
+    encodable = 'CASE WHEN {object} THEN ({checks}) ELSE false END'.format(
+        object=_is_object(dialect),
+        checks=' AND '.join(
+            [f'{_key_count(dialect)} = {len(PERMISSION_KEYS)}']
+            + [f'{_json_field(dialect, key)} IN ({statuses})' for key in PERMISSION_KEYS]
+        )
+    )
+    code = ' + '.join(
+        '(CASE {field} {whens} END) * {factor}'.format(
+            field=_json_field(dialect, key),
+            whens=' '.join(f"WHEN '{status}' THEN {i}" for i, status in enumerate(PERMISSION_STATUSES)),
+            factor=4 ** shift
+        )
+        for shift, key in enumerate(PERMISSION_KEYS)
+    )
+    statement = sa.text(
+        f'UPDATE screenshots SET "permissionsCode" = NULLIF({code}, 0), "systemPermissions" = NULL '
+        f'WHERE id IN (SELECT id FROM screenshots WHERE "systemPermissions" IS NOT NULL AND {encodable} '
+        f'LIMIT {BATCH_SIZE})'
+    )
+    while bind.execute(statement).rowcount:
+        pass
+
+
+def _backfill_projects(bind):
+    columns = list(PROJECT_DEFAULTS)
+    quoted = ', '.join(f'"{column}"' for column in columns)
+    for row in bind.execute(sa.text(f'SELECT id, {quoted} FROM projects')).mappings().all():
+        defaulted = []
+        for column in columns:
+            value = row[column]
+            if isinstance(value, str):
+                value = json.loads(value)
+            if value == PROJECT_DEFAULTS[column]:
+                defaulted.append(column)
+        if defaulted:
+            assignments = ', '.join(f'"{column}" = NULL' for column in defaulted)
+            bind.execute(sa.text(f'UPDATE projects SET {assignments} WHERE id = :id'), {'id': row['id']})
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    # Checked so the upgrade can be re-run after a failed backfill, which has
+    # already committed the column and some batches
+    if 'permissionsCode' not in {column['name'] for column in sa.inspect(bind).get_columns('screenshots')}:
+        op.add_column('screenshots', sa.Column('permissionsCode', sa.SmallInteger(), nullable=True))
+    # Outside the migration's transaction, each batch commits on its own, so
+    # row locks are held briefly on large tables; both backfills are idempotent
+    with op.get_context().autocommit_block():
+        _backfill_screenshots(bind)
+        _backfill_projects(bind)
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    for column, default in PROJECT_DEFAULTS.items():
+        bind.execute(
+            sa.text(f'UPDATE projects SET "{column}" = :value WHERE "{column}" IS NULL'),
+            {'value': json.dumps(default)}
+        )
+    # Expand codes back into JSON
+    for code in range(len(PERMISSION_STATUSES) ** len(PERMISSION_KEYS)):
+        permissions = {
+            key: PERMISSION_STATUSES[(code >> (2 * shift)) & 3] for shift, key in enumerate(PERMISSION_KEYS)
+        }
+        condition = '"permissionsCode" IS NULL' if code == 0 else f'"permissionsCode" = {code}'
+        bind.execute(
+            sa.text(f'UPDATE screenshots SET "systemPermissions" = :value WHERE {condition} AND "systemPermissions" IS NULL'),
+            {'value': json.dumps(permissions)}
+        )
+    op.drop_column('screenshots', 'permissionsCode')
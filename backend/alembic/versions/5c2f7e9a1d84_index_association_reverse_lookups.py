@@ -0,0 +1,26 @@
+"""index association reverse lookups
+
+Revision ID: 5c2f7e9a1d84
+Revises: 4686d90e1411
+Create Date: 2026-10-19 14:21:05.318406
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5c2f7e9a1d84'
+down_revision = '4686d90e1411'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_employee_projects_projectId', 'employee_projects', ['projectId'], unique=False)
+    op.create_index('ix_task_employees_employeeId', 'task_employees', ['employeeId'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_task_employees_employeeId', table_name='task_employees')
+    op.drop_index('ix_employee_projects_projectId', table_name='employee_projects')
@@ -0,0 +1,24 @@
+"""add job heartbeats
+
+Revision ID: 6a1d8e4f2b90
+Revises: 0c7e3b5a9f42
+Create Date: 2026-10-20 09:12:31.420117
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '6a1d8e4f2b90'
+down_revision = '0c7e3b5a9f42'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('jobs', sa.Column('heartbeatAt', sa.Integer(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('jobs', 'heartbeatAt')
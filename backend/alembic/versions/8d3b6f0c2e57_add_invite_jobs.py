@@ -0,0 +1,44 @@
+"""add invite jobs
+
+Revision ID: 8d3b6f0c2e57
+Revises: 5c2f7e9a1d84
+Create Date: 2026-10-19 15:02:17.804412
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8d3b6f0c2e57'
+down_revision = '5c2f7e9a1d84'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('invite_jobs',
+    sa.Column('id', sa.String(), nullable=False),
+    sa.Column('organizationId', sa.String(), nullable=False),
+    sa.Column('createdBy', sa.String(), nullable=False),
+    sa.Column('status', sa.String(), nullable=True),
+    sa.Column('processedRows', sa.Integer(), nullable=True),
+    sa.Column('createdEmployees', sa.Integer(), nullable=True),
+    sa.Column('skippedRows', sa.Integer(), nullable=True),
+    sa.Column('emailsSent', sa.Integer(), nullable=True),
+    sa.Column('emailsFailed', sa.Integer(), nullable=True),
+    sa.Column('errors', sa.JSON(), nullable=True),
+    sa.Column('error', sa.String(), nullable=True),
+    sa.Column('startedAt', sa.Integer(), nullable=True),
+    sa.Column('updatedAt', sa.Integer(), nullable=True),
+    sa.Column('finishedAt', sa.Integer(), nullable=True),
+    sa.ForeignKeyConstraint(['createdBy'], ['employees.id'], ),
+    sa.ForeignKeyConstraint(['organizationId'], ['organizations.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_invite_jobs_org_started', 'invite_jobs', ['organizationId', 'startedAt'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_invite_jobs_org_started', table_name='invite_jobs')
+    op.drop_table('invite_jobs')
@@ -0,0 +1,41 @@
+"""store shift and screenshot ids as native uuid
+
+Revision ID: a746bb39e8bd
+Revises: e115ea73a95d
+Create Date: 2026-10-19 12:20:07.418305
+
+"""
+from alembic import op
+from app.core.config import settings
+
+
+# revision identifiers, used by Alembic.
+revision = 'a746bb39e8bd'
+down_revision = 'e115ea73a95d'
+branch_labels = None
+depends_on = None
+
+# Existing ids are 32-character hex strings, which PostgreSQL casts to uuid
+# directly; new ids are time-ordered UUIDv7 either way (app/db/ids.py)
+COLUMNS = [('shifts', 'id'), ('screenshots', 'id'), ('screenshots', 'shiftId')]
+
+
+def _enabled() -> bool:
+    return op.get_bind().dialect.name == 'postgresql' and settings.DB_NATIVE_UUID
+
+
+def upgrade() -> None:
+    if not _enabled():
+        return
+    for table, column in COLUMNS:
+        op.execute(f'ALTER TABLE "{table}" ALTER COLUMN "{column}" TYPE uuid USING "{column}"::uuid')
+
+
+def downgrade() -> None:
+    if not _enabled():
+        return
+    for table, column in COLUMNS:
+        op.execute(
+            f'ALTER TABLE "{table}" ALTER COLUMN "{column}" TYPE varchar '
+            f'USING replace("{column}"::text, \'-\', \'\')'
+        )
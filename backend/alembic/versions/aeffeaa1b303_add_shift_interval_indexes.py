@@ -0,0 +1,26 @@
+"""add shift interval indexes
+
+Revision ID: aeffeaa1b303
+Revises: 951a887bb0e7
+Create Date: 2026-10-19 08:42:11.430102
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'aeffeaa1b303'
+down_revision = '951a887bb0e7'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_shifts_org_start_end', 'shifts', ['organizationId', 'start', 'end'], unique=False)
+    op.create_index('ix_shifts_org_end', 'shifts', ['organizationId', 'end'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_shifts_org_end', table_name='shifts')
+    op.drop_index('ix_shifts_org_start_end', table_name='shifts')
\ No newline at end of file
@@ -0,0 +1,49 @@
+"""add email deliveries
+
+Revision ID: b47e2d9c6a13
+Revises: 8d3b6f0c2e57
+Create Date: 2026-10-19 15:48:33.120957
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b47e2d9c6a13'
+down_revision = '8d3b6f0c2e57'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('email_deliveries',
+    sa.Column('id', sa.String(), nullable=False),
+    sa.Column('kind', sa.String(), nullable=False),
+    sa.Column('recipient', sa.String(), nullable=False),
+    sa.Column('name', sa.String(), nullable=False),
+    sa.Column('status', sa.String(), nullable=True),
+    sa.Column('attempts', sa.Integer(), nullable=True),
+    sa.Column('nextAttemptAt', sa.Integer(), nullable=True),
+    sa.Column('lastError', sa.String(), nullable=True),
+    sa.Column('createdAt', sa.Integer(), nullable=True),
+    sa.Column('sentAt', sa.Integer(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_email_deliveries_status_next', 'email_deliveries', ['status', 'nextAttemptAt'], unique=False)
+
+    # Invitations are now queued rather than sent by the bulk invite job
+    with op.batch_alter_table('invite_jobs') as batch_op:
+        batch_op.add_column(sa.Column('emailsQueued', sa.Integer(), nullable=True))
+        batch_op.drop_column('emailsSent')
+        batch_op.drop_column('emailsFailed')
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('invite_jobs') as batch_op:
+        batch_op.add_column(sa.Column('emailsFailed', sa.Integer(), nullable=True))
+        batch_op.add_column(sa.Column('emailsSent', sa.Integer(), nullable=True))
+        batch_op.drop_column('emailsQueued')
+
+    op.drop_index('ix_email_deliveries_status_next', table_name='email_deliveries')
+    op.drop_table('email_deliveries')
@@ -0,0 +1,39 @@
+"""add retention runs
+
+Revision ID: e115ea73a95d
+Revises: ec57ea6da626
+Create Date: 2026-10-19 11:03:52.611940
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e115ea73a95d'
+down_revision = 'ec57ea6da626'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('retention_runs',
+    sa.Column('id', sa.String(), nullable=False),
+    sa.Column('organizationId', sa.String(), nullable=False),
+    sa.Column('cutoff', sa.Integer(), nullable=False),
+    sa.Column('status', sa.String(), nullable=True),
+    sa.Column('deletedScreenshots', sa.Integer(), nullable=True),
+    sa.Column('deletedFiles', sa.Integer(), nullable=True),
+    sa.Column('error', sa.String(), nullable=True),
+    sa.Column('startedAt', sa.Integer(), nullable=True),
+    sa.Column('updatedAt', sa.Integer(), nullable=True),
+    sa.Column('finishedAt', sa.Integer(), nullable=True),
+    sa.ForeignKeyConstraint(['organizationId'], ['organizations.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_retention_runs_org_status', 'retention_runs', ['organizationId', 'status'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_retention_runs_org_status', table_name='retention_runs')
+    op.drop_table('retention_runs')
@@ -0,0 +1,125 @@
+"""partition screenshots and shifts by time
+
+Revision ID: ec57ea6da626
+Revises: 3b81f6aa60cd
+Create Date: 2026-10-19 10:12:31.204518
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from datetime import datetime, timezone
+
+
+# revision identifiers, used by Alembic.
+revision = 'ec57ea6da626'
+down_revision = '3b81f6aa60cd'
+branch_labels = None
+depends_on = None
+
+# Partitioned table -> (partition key, foreign keys, indexes); see app/services/partition_service.py
+TABLES = {
+    'shifts': ('start', {
+        'employeeId': 'employees', 'organizationId': 'organizations', 'projectId': 'projects',
+        'taskId': 'tasks', 'teamId': 'teams',
+    }, {
+        'ix_shifts_org_start_end': ['organizationId', 'start', 'end'],
+        'ix_shifts_org_end': ['organizationId', 'end'],
+    }),
+    'screenshots': ('timestamp', {
+        'employeeId': 'employees', 'organizationId': 'organizations', 'projectId': 'projects',
+        'taskId': 'tasks', 'teamId': 'teams',
+    }, {
+        'ix_screenshots_org_timestamp': ['organizationId', 'timestamp'],
+    }),
+}
+MONTHS_AHEAD = 3
+
+
+def _month_start_ms(year, month):
+    return int(datetime(year, month, 1, tzinfo=timezone.utc).timestamp() * 1000)
+
+
+def _months(first_ms, last_ms):
+    """(name suffix, lower, upper) for each month from first_ms to MONTHS_AHEAD past last_ms"""
+    first = datetime.fromtimestamp(first_ms / 1000, tz=timezone.utc)
+    last = datetime.fromtimestamp(last_ms / 1000, tz=timezone.utc)
+    year, month = first.year, first.month
+    end_index = last.year * 12 + last.month - 1 + MONTHS_AHEAD
+    while year * 12 + month - 1 <= end_index:
+        next_year, next_month = (year + 1, 1) if month == 12 else (year, month + 1)
+        yield f'p{year:04d}_{month:02d}', _month_start_ms(year, month), _month_start_ms(next_year, next_month)
+        year, month = next_year, next_month
+
+
+def _add_constraints(table, primary_key, foreign_keys, indexes):
+    op.create_primary_key(f'{table}_pkey', table, primary_key)
+    for column, target in foreign_keys.items():
+        op.create_foreign_key(f'{table}_{column}_fkey', table, target, [column], ['id'])
+    for name, columns in indexes.items():
+        op.create_index(name, table, columns, unique=False)
+
+
+def _upgrade_postgresql():
+    bind = op.get_bind()
+    now_ms = int(datetime.utcnow().timestamp() * 1000)
+
+    # A foreign key must cover the partition key of the referenced table, so
+    # screenshots.shiftId becomes a plain column once shifts is partitioned
+    for fk in sa.inspect(bind).get_foreign_keys('screenshots'):
+        if fk['referred_table'] == 'shifts':
+            op.drop_constraint(fk['name'], 'screenshots', type_='foreignkey')
+
+    for table, (key, foreign_keys, indexes) in TABLES.items():
+        old = f'{table}_unpartitioned'
+        op.rename_table(table, old)
+        op.execute(f'ALTER TABLE "{old}" RENAME CONSTRAINT "{table}_pkey" TO "{old}_pkey"')
+        for name in indexes:
+            op.execute(f'ALTER INDEX "{name}" RENAME TO "{name}_unpartitioned"')
+
+        op.execute(
+            f'CREATE TABLE "{table}" (LIKE "{old}" INCLUDING DEFAULTS) PARTITION BY RANGE ("{key}")'
+        )
+        # The primary key of a partitioned table must include the partition key
+        _add_constraints(table, ['id', key], foreign_keys, indexes)
+
+        first_ms, last_ms = bind.execute(sa.text(f'SELECT min("{key}"), max("{key}") FROM "{old}"')).one()
+        for suffix, lower, upper in _months(first_ms or now_ms, max(last_ms or now_ms, now_ms)):
+            op.execute(f'CREATE TABLE "{table}_{suffix}" PARTITION OF "{table}" FOR VALUES FROM ({lower}) TO ({upper})')
+        op.execute(f'CREATE TABLE "{table}_default" PARTITION OF "{table}" DEFAULT')
+
+        op.execute(f'INSERT INTO "{table}" SELECT * FROM "{old}"')
+        op.drop_table(old)
+
+
+def _downgrade_postgresql():
+    for table, (key, foreign_keys, indexes) in reversed(list(TABLES.items())):
+        partitioned = f'{table}_partitioned'
+        op.rename_table(table, partitioned)
+        for name in indexes:
+            op.execute(f'ALTER INDEX "{name}" RENAME TO "{name}_partitioned"')
+        op.execute(f'ALTER TABLE "{partitioned}" RENAME CONSTRAINT "{table}_pkey" TO "{partitioned}_pkey"')
+        for column in foreign_keys:
+            op.drop_constraint(f'{table}_{column}_fkey', partitioned, type_='foreignkey')
+
+        op.execute(f'CREATE TABLE "{table}" (LIKE "{partitioned}" INCLUDING DEFAULTS)')
+        op.execute(f'INSERT INTO "{table}" SELECT * FROM "{partitioned}"')
+        # Drops all partitions with it
+        op.drop_table(partitioned)
+        _add_constraints(table, ['id'], foreign_keys, indexes)
+
+    op.create_foreign_key('screenshots_shiftId_fkey', 'screenshots', 'shifts', ['shiftId'], ['id'])
+
+
+def upgrade() -> None:
+    op.add_column('organizations', sa.Column('screenshotRetentionDays', sa.Integer(), nullable=True))
+    op.add_column('organizations', sa.Column('shiftRetentionDays', sa.Integer(), nullable=True))
+    # Declarative partitioning is PostgreSQL only; other databases keep plain tables
+    if op.get_bind().dialect.name == 'postgresql':
+        _upgrade_postgresql()
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name == 'postgresql':
+        _downgrade_postgresql()
+    op.drop_column('organizations', 'shiftRetentionDays')
+    op.drop_column('organizations', 'screenshotRetentionDays')
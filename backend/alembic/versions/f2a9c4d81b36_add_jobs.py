@@ -0,0 +1,68 @@
+"""add jobs, replacing invite jobs
+
+Revision ID: f2a9c4d81b36
+Revises: b47e2d9c6a13
+Create Date: 2026-10-19 17:21:40.552318
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f2a9c4d81b36'
+down_revision = 'b47e2d9c6a13'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('jobs',
+    sa.Column('id', sa.String(), nullable=False),
+    sa.Column('name', sa.String(), nullable=False),
+    sa.Column('params', sa.JSON(none_as_null=True), nullable=True),
+    sa.Column('organizationId', sa.String(), nullable=True),
+    sa.Column('createdBy', sa.String(), nullable=True),
+    sa.Column('status', sa.String(), nullable=True),
+    sa.Column('progress', sa.JSON(none_as_null=True), nullable=True),
+    sa.Column('result', sa.JSON(none_as_null=True), nullable=True),
+    sa.Column('error', sa.String(), nullable=True),
+    sa.Column('queuedAt', sa.Integer(), nullable=True),
+    sa.Column('scheduledAt', sa.Integer(), nullable=True),
+    sa.Column('startedAt', sa.Integer(), nullable=True),
+    sa.Column('updatedAt', sa.Integer(), nullable=True),
+    sa.Column('finishedAt', sa.Integer(), nullable=True),
+    sa.ForeignKeyConstraint(['createdBy'], ['employees.id'], ),
+    sa.ForeignKeyConstraint(['organizationId'], ['organizations.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_jobs_org_queued', 'jobs', ['organizationId', 'queuedAt'], unique=False)
+    op.create_index('ix_jobs_status_scheduled', 'jobs', ['status', 'scheduledAt'], unique=False)
+    # Bulk invitations now run as jobs; finished invite jobs are not carried over
+    op.drop_index('ix_invite_jobs_org_started', table_name='invite_jobs')
+    op.drop_table('invite_jobs')
+
+
+def downgrade() -> None:
+    op.create_table('invite_jobs',
+    sa.Column('id', sa.String(), nullable=False),
+    sa.Column('organizationId', sa.String(), nullable=False),
+    sa.Column('createdBy', sa.String(), nullable=False),
+    sa.Column('status', sa.String(), nullable=True),
+    sa.Column('processedRows', sa.Integer(), nullable=True),
+    sa.Column('createdEmployees', sa.Integer(), nullable=True),
+    sa.Column('skippedRows', sa.Integer(), nullable=True),
+    sa.Column('emailsQueued', sa.Integer(), nullable=True),
+    sa.Column('errors', sa.JSON(), nullable=True),
+    sa.Column('error', sa.String(), nullable=True),
+    sa.Column('startedAt', sa.Integer(), nullable=True),
+    sa.Column('updatedAt', sa.Integer(), nullable=True),
+    sa.Column('finishedAt', sa.Integer(), nullable=True),
+    sa.ForeignKeyConstraint(['createdBy'], ['employees.id'], ),
+    sa.ForeignKeyConstraint(['organizationId'], ['organizations.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_invite_jobs_org_started', 'invite_jobs', ['organizationId', 'startedAt'], unique=False)
+    op.drop_index('ix_jobs_status_scheduled', table_name='jobs')
+    op.drop_index('ix_jobs_org_queued', table_name='jobs')
+    op.drop_table('jobs')
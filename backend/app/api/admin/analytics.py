@@ -2,11 +2,12 @@ from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
 from typing import Optional, Dict, Any
 from app.db.database import get_db
-from app.core.deps import get_current_admin_user
+from app.core.deps import get_current_admin_user, get_read_db
 from app.models.employee import Employee
 from app.services.shift_service import ShiftService
 from app.services.screenshot_service import ScreenshotService
 from app.schemas.screenshot import ScreenshotResponse
+from app.schemas.analytics import TimeSeries, Concurrency, Roster, ProductivityAnalytics
 
 router = APIRouter()
 
@@ -22,7 +23,7 @@ async def get_project_time_analytics(
     taskId: Optional[str] = Query(None),
     shiftId: Optional[str] = Query(None),
     current_admin: Employee = Depends(get_current_admin_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ) -> Dict[str, Any]:
     """Get project time analytics"""
     shift_service = ShiftService(db)
@@ -41,6 +42,112 @@ async def get_project_time_analytics(
     return analytics
 
 
+@router.get("/time-series", response_model=TimeSeries)
+async def get_time_series(
+    start: int = Query(..., description="Start time in milliseconds"),
+    end: int = Query(..., description="End time in milliseconds"),
+    interval: str = Query("day", pattern="^(hour|day|week)$"),
+    timezone: Optional[str] = Query(None, description="IANA timezone name, defaults to UTC"),
+    employeeId: Optional[str] = Query(None),
+    teamId: Optional[str] = Query(None),
+    projectId: Optional[str] = Query(None),
+    taskId: Optional[str] = Query(None),
+    current_admin: Employee = Depends(get_current_admin_user),
+    db: Session = Depends(get_read_db)
+):
+    """Get tracked time per hour/day/week in the requested timezone"""
+    shift_service = ShiftService(db)
+    
+    try:
+        return shift_service.get_time_series(
+            organization_id=current_admin.organizationId,
+            start_time=start,
+            end_time=end,
+            interval=interval,
+            timezone=timezone,
+            employee_id=employeeId,
+            team_id=teamId,
+            project_id=projectId,
+            task_id=taskId
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.get("/concurrency", response_model=Concurrency)
+async def get_concurrency(
+    start: int = Query(..., description="Start time in milliseconds"),
+    end: int = Query(..., description="End time in milliseconds"),
+    step: int = Query(60000, ge=1000, description="Sampling step in milliseconds"),
+    teamId: Optional[str] = Query(None),
+    projectId: Optional[str] = Query(None),
+    taskId: Optional[str] = Query(None),
+    current_admin: Employee = Depends(get_current_admin_user),
+    db: Session = Depends(get_read_db)
+):
+    """Get how many employees were clocked in at each step, and the peak"""
+    shift_service = ShiftService(db)
+    
+    try:
+        return shift_service.get_concurrency(
+            organization_id=current_admin.organizationId,
+            start_time=start,
+            end_time=end,
+            step=step,
+            team_id=teamId,
+            project_id=projectId,
+            task_id=taskId
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.get("/working-at", response_model=Roster)
+async def get_working_at(
+    at: int = Query(..., description="Point in time in milliseconds"),
+    teamId: Optional[str] = Query(None),
+    projectId: Optional[str] = Query(None),
+    taskId: Optional[str] = Query(None),
+    current_admin: Employee = Depends(get_current_admin_user),
+    db: Session = Depends(get_read_db)
+):
+    """Get employees who were clocked in at a point in time"""
+    shift_service = ShiftService(db)
+    
+    return shift_service.get_roster(
+        organization_id=current_admin.organizationId,
+        at=at,
+        team_id=teamId,
+        project_id=projectId,
+        task_id=taskId
+    )
+
+
+@router.get("/productivity", response_model=ProductivityAnalytics)
+async def get_productivity_analytics(
+    start: int = Query(..., description="Start time in milliseconds"),
+    end: int = Query(..., description="End time in milliseconds"),
+    top: int = Query(10, ge=1, le=100, description="Number of top sites to return"),
+    employeeId: Optional[str] = Query(None),
+    teamId: Optional[str] = Query(None),
+    projectId: Optional[str] = Query(None),
+    current_admin: Employee = Depends(get_current_admin_user),
+    db: Session = Depends(get_read_db)
+):
+    """Get productivity averages per employee/team/project and top sites"""
+    screenshot_service = ScreenshotService(db)
+    
+    return screenshot_service.get_productivity_analytics(
+        organization_id=current_admin.organizationId,
+        start_time=start,
+        end_time=end,
+        employee_id=employeeId,
+        team_id=teamId,
+        project_id=projectId,
+        top_sites=top
+    )
+
+
 @router.get("/screenshot")
 async def get_screenshots(
     start: int = Query(..., description="Start time in milliseconds"),
@@ -52,7 +159,7 @@ async def get_screenshots(
     taskId: Optional[str] = Query(None),
     shiftId: Optional[str] = Query(None),
     current_admin: Employee = Depends(get_current_admin_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """Get screenshots with filters"""
     screenshot_service = ScreenshotService(db)
@@ -86,7 +193,7 @@ async def get_screenshots_paginated(
     limit: int = Query(10000, ge=1, le=10000),
     next: Optional[str] = Query(None, description="Next token for pagination"),
     current_admin: Employee = Depends(get_current_admin_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """Get screenshots with pagination"""
     screenshot_service = ScreenshotService(db)
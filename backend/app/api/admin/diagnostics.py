@@ -0,0 +1,38 @@
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import FileResponse
+from typing import Dict, Any, List
+from app.core.deps import get_current_admin_user
+from app.core.instrumentation import route_query_metrics
+from app.core.profiling import profile_store
+from app.models.employee import Employee
+
+router = APIRouter()
+
+
+@router.get("/queries")
+async def get_query_metrics(
+    current_admin: Employee = Depends(get_current_admin_user)
+) -> Dict[str, Any]:
+    """Get SQL query counts and DB time per route since startup"""
+    return route_query_metrics.snapshot()
+
+
+@router.get("/profiles")
+async def get_profiles(
+    current_admin: Employee = Depends(get_current_admin_user)
+) -> List[Dict[str, Any]]:
+    """List stored request profiles, newest first"""
+    return profile_store.list()
+
+
+@router.get("/profiles/{name}")
+async def download_profile(
+    name: str,
+    current_admin: Employee = Depends(get_current_admin_user)
+):
+    """Download a stored request profile in pstats format"""
+    path = profile_store.path(name)
+    if not path:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    
+    return FileResponse(path, media_type="application/octet-stream", filename=name)
@@ -1,11 +1,16 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, File, HTTPException, status, Query, UploadFile
 from sqlalchemy.orm import Session
 from typing import List, Optional
 from app.db.database import get_db
-from app.core.deps import get_current_admin_user
+from app.core.config import settings
+from app.core.deps import get_current_admin_user, get_read_db
+from app.core.jobs import enqueue
 from app.models.employee import Employee
 from app.schemas.employee import Employee as EmployeeSchema, EmployeeCreate, EmployeeUpdate, EmployeeInvite, EmployeeStats
+from app.schemas.job import Job as JobSchema
+from app.schemas.common import MemberChanges
 from app.services.employee_service import EmployeeService
+from app.services.bulk_invite_service import spool_upload, upload_format
 
 router = APIRouter()
 
@@ -32,12 +37,38 @@ async def create_employee(
         raise HTTPException(status_code=400, detail=str(e))
 
 
+@router.post("/bulk-invite", response_model=JobSchema, status_code=status.HTTP_202_ACCEPTED)
+async def bulk_invite_employees(
+    file: UploadFile = File(..., description="CSV with a header row, a JSON array or JSON lines"),
+    current_admin: Employee = Depends(get_current_admin_user),
+    db: Session = Depends(get_db)
+):
+    """Invite many employees from an upload; poll /api/v1/jobs/{id} for progress"""
+    try:
+        fmt = upload_format(file.filename, file.content_type)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    try:
+        path = await spool_upload(file, settings.BULK_INVITE_MAX_BYTES)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail=str(e))
+    
+    return enqueue(
+        db,
+        "employees.bulk_invite",
+        {"path": path, "fmt": fmt},
+        organization_id=current_admin.organizationId,
+        created_by=current_admin.id
+    )
+
+
 @router.get("/", response_model=List[EmployeeSchema])
 async def get_employees(
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
     current_admin: Employee = Depends(get_current_admin_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """Get all employees in the organization"""
     employee_service = EmployeeService(db)
@@ -53,7 +84,7 @@ async def get_employees(
 async def get_employee(
     employee_id: str,
     current_admin: Employee = Depends(get_current_admin_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """Get employee by ID"""
     employee_service = EmployeeService(db)
@@ -93,6 +124,27 @@ async def update_employee(
         raise HTTPException(status_code=400, detail=str(e))
 
 
+@router.patch("/{employee_id}/projects", response_model=EmployeeSchema)
+async def update_employee_projects(
+    employee_id: str,
+    changes: MemberChanges,
+    current_admin: Employee = Depends(get_current_admin_user),
+    db: Session = Depends(get_db)
+):
+    """Add or remove project assignments; other assignments are left as they are"""
+    employee_service = EmployeeService(db)
+    
+    # Check if employee exists and belongs to same organization
+    employee = employee_service.get_employee(employee_id)
+    if not employee or employee.organizationId != current_admin.organizationId:
+        raise HTTPException(status_code=404, detail="Employee not found")
+    
+    updated_employee = employee_service.update_projects(employee_id, add=changes.add, remove=changes.remove)
+    if not updated_employee:
+        raise HTTPException(status_code=404, detail="Employee not found")
+    return updated_employee
+
+
 @router.post("/deactivate/{employee_id}", response_model=EmployeeSchema)
 async def deactivate_employee(
     employee_id: str,
@@ -147,7 +199,7 @@ async def activate_employee(
 async def get_employee_stats(
     employee_id: str,
     current_admin: Employee = Depends(get_current_admin_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """Get employee statistics"""
     employee_service = EmployeeService(db)
@@ -0,0 +1,25 @@
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+from typing import List, Optional
+from app.core.deps import get_current_admin_user, get_read_db
+from app.models.employee import Employee
+from app.schemas.event import EventPage
+from app.services.outbox import last_sequence, read_events
+
+router = APIRouter()
+
+
+@router.get("/", response_model=EventPage)
+async def get_events(
+    since: int = Query(0, ge=0, description="Return events after this sequence"),
+    limit: int = Query(500, ge=1, le=5000),
+    types: Optional[List[str]] = Query(None, alias="type"),
+    current_admin: Employee = Depends(get_current_admin_user),
+    db: Session = Depends(get_read_db)
+):
+    """The organization's change feed: events after `since`, oldest first"""
+    # Read first: every event up to it has committed, so a short page means caught up
+    head = last_sequence(db, current_admin.organizationId)
+    events = read_events(db, current_admin.organizationId, since, limit, types, until=head)
+    last = events[-1].sequence if len(events) == limit else max(head, since)
+    return {"events": events, "lastSequence": last}
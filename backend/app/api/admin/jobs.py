@@ -0,0 +1,67 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.orm import Session
+from typing import List, Optional
+from app.db.database import get_db
+from app.core.deps import get_current_admin_user
+from app.core.jobs import enqueue, tasks
+from app.models.employee import Employee
+from app.models.job import Job
+from app.schemas.job import Job as JobSchema, JobCreate
+
+router = APIRouter()
+
+
+@router.get("/", response_model=List[JobSchema])
+async def get_jobs(
+    name: Optional[str] = None,
+    job_status: Optional[str] = Query(None, alias="status"),
+    skip: int = Query(0, ge=0),
+    limit: int = Query(50, ge=1, le=500),
+    current_admin: Employee = Depends(get_current_admin_user),
+    db: Session = Depends(get_db)
+):
+    """List the organization's jobs, newest first"""
+    query = db.query(Job).filter(Job.organizationId == current_admin.organizationId)
+    if name:
+        query = query.filter(Job.name == name)
+    if job_status:
+        query = query.filter(Job.status == job_status)
+    return query.order_by(Job.queuedAt.desc()).offset(skip).limit(limit).all()
+
+
+@router.get("/{job_id}", response_model=JobSchema)
+async def get_job(
+    job_id: str,
+    current_admin: Employee = Depends(get_current_admin_user),
+    db: Session = Depends(get_db)
+):
+    """Status, progress and result of a job"""
+    job = db.query(Job).filter(Job.id == job_id).first()
+    if not job or job.organizationId != current_admin.organizationId:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+
+@router.post("/{name}", response_model=JobSchema, status_code=status.HTTP_202_ACCEPTED)
+async def start_job(
+    name: str,
+    job_data: JobCreate,
+    current_admin: Employee = Depends(get_current_admin_user),
+    db: Session = Depends(get_db)
+):
+    """Start a task admins may run, scoped to their organization"""
+    task = tasks.get(name)
+    if not task or not task.admin:
+        raise HTTPException(status_code=404, detail="Job not found")
+    
+    try:
+        return enqueue(
+            db,
+            name,
+            job_data.params,
+            organization_id=current_admin.organizationId,
+            created_by=current_admin.id,
+            delay_seconds=job_data.delaySeconds
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
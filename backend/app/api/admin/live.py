@@ -0,0 +1,53 @@
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session
+from typing import Optional
+from app.core.config import settings
+from app.core.deps import get_current_admin_user
+from app.db.database import get_db
+from app.models.employee import Employee
+from app.services.live_events import live_hub
+import asyncio
+
+router = APIRouter()
+
+
+@router.get("/")
+async def stream_live_events(
+    since: Optional[int] = Query(None, ge=0, description="Resume after this sequence"),
+    last_event_id: Optional[int] = Header(None, alias="Last-Event-ID"),
+    current_admin: Employee = Depends(get_current_admin_user),
+    db: Session = Depends(get_db)
+):
+    """Server-Sent Events stream of the organization's shift and screenshot events.
+
+    A `reset` event means events were skipped because the client fell behind;
+    reload the dashboard's data and keep reading.
+    """
+    if not live_hub.running:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Live events are not served by this process"
+        )
+    organization_id = current_admin.organizationId
+    # The session would otherwise hold a connection for as long as the stream is open
+    db.close()
+    since = last_event_id if last_event_id is not None else since
+
+    async def frames():
+        # Subscribed once the response starts, so unsubscribing always follows
+        subscription = await live_hub.subscribe(organization_id, since)
+        try:
+            while True:
+                try:
+                    yield await asyncio.wait_for(subscription.queue.get(), settings.LIVE_KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+        finally:
+            live_hub.unsubscribe(subscription)
+
+    return StreamingResponse(
+        frames(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
@@ -2,9 +2,10 @@ from fastapi import APIRouter, Depends, HTTPException, status, Query
 from sqlalchemy.orm import Session
 from typing import List
 from app.db.database import get_db
-from app.core.deps import get_current_admin_user
+from app.core.deps import get_current_admin_user, get_read_db
 from app.models.employee import Employee
 from app.schemas.project import Project as ProjectSchema, ProjectCreate, ProjectUpdate, ProjectStats
+from app.schemas.common import MemberChanges
 from app.services.project_service import ProjectService
 
 router = APIRouter()
@@ -34,7 +35,7 @@ async def get_projects(
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
     current_admin: Employee = Depends(get_current_admin_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """Get all projects in the organization"""
     project_service = ProjectService(db)
@@ -50,7 +51,7 @@ async def get_projects(
 async def get_project(
     project_id: str,
     current_admin: Employee = Depends(get_current_admin_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """Get project by ID"""
     project_service = ProjectService(db)
@@ -90,6 +91,27 @@ async def update_project(
         raise HTTPException(status_code=400, detail=str(e))
 
 
+@router.patch("/{project_id}/employees", response_model=ProjectSchema)
+async def update_project_employees(
+    project_id: str,
+    changes: MemberChanges,
+    current_admin: Employee = Depends(get_current_admin_user),
+    db: Session = Depends(get_db)
+):
+    """Add or remove project employees; other members are left as they are"""
+    project_service = ProjectService(db)
+    
+    # Check if project exists and belongs to same organization
+    project = project_service.get_project(project_id)
+    if not project or project.organizationId != current_admin.organizationId:
+        raise HTTPException(status_code=404, detail="Project not found")
+    
+    updated_project = project_service.update_members(project_id, add=changes.add, remove=changes.remove)
+    if not updated_project:
+        raise HTTPException(status_code=404, detail="Project not found")
+    return updated_project
+
+
 @router.delete("/{project_id}", response_model=ProjectSchema)
 async def delete_project(
     project_id: str,
@@ -117,7 +139,7 @@ async def delete_project(
 async def get_project_stats(
     project_id: str,
     current_admin: Employee = Depends(get_current_admin_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """Get project statistics"""
     project_service = ProjectService(db)
@@ -2,9 +2,10 @@ from fastapi import APIRouter, Depends, HTTPException, status, Query
 from sqlalchemy.orm import Session
 from typing import List, Optional
 from app.db.database import get_db
-from app.core.deps import get_current_admin_user
+from app.core.deps import get_current_admin_user, get_read_db
 from app.models.employee import Employee
 from app.schemas.task import Task as TaskSchema, TaskCreate, TaskUpdate
+from app.schemas.common import MemberChanges
 from app.services.task_service import TaskService
 
 router = APIRouter()
@@ -36,7 +37,7 @@ async def get_tasks(
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
     current_admin: Employee = Depends(get_current_admin_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """Get all tasks in the organization, optionally filtered by project"""
     task_service = TaskService(db)
@@ -53,7 +54,7 @@ async def get_tasks(
 async def get_task(
     task_id: str,
     current_admin: Employee = Depends(get_current_admin_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """Get task by ID"""
     task_service = TaskService(db)
@@ -93,6 +94,27 @@ async def update_task(
         raise HTTPException(status_code=400, detail=str(e))
 
 
+@router.patch("/{task_id}/employees", response_model=TaskSchema)
+async def update_task_employees(
+    task_id: str,
+    changes: MemberChanges,
+    current_admin: Employee = Depends(get_current_admin_user),
+    db: Session = Depends(get_db)
+):
+    """Add or remove task employees; other members are left as they are"""
+    task_service = TaskService(db)
+    
+    # Check if task exists and belongs to same organization
+    task = task_service.get_task(task_id)
+    if not task or task.organizationId != current_admin.organizationId:
+        raise HTTPException(status_code=404, detail="Task not found")
+    
+    updated_task = task_service.update_members(task_id, add=changes.add, remove=changes.remove)
+    if not updated_task:
+        raise HTTPException(status_code=404, detail="Task not found")
+    return updated_task
+
+
 @router.delete("/{task_id}", response_model=TaskSchema)
 async def delete_task(
     task_id: str,
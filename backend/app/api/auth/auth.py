@@ -4,7 +4,7 @@ from sqlalchemy.orm import Session
 from app.db.database import get_db
 from app.schemas.auth import Token, LoginRequest, EmailVerificationRequest, PasswordResetRequest
 from app.services.employee_service import EmployeeService
-from app.services.email_service import email_service
+from app.services.email_queue import email_queue
 from app.core.security import (
     verify_password, 
     create_access_token, 
@@ -104,8 +104,9 @@ async def forgot_password(
             detail="Email not verified. Please contact your administrator."
         )
     
-    # Send password reset email
-    email_sent = email_service.send_password_reset(user.email, user.name)
+    # Queue the password reset email
+    email_queue.enqueue(db, "password_reset", user.email, user.name)
+    db.commit()
     
     return {"message": "If the email exists, a password reset link has been sent"}
 
@@ -11,10 +11,11 @@ router = APIRouter()
 
 @router.get("/me", response_model=EmployeeSchema)
 async def get_current_user_profile(
-    current_user: Employee = Depends(get_current_active_user)
+    current_user: Employee = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
 ):
     """Get current user's profile"""
-    return current_user
+    return EmployeeService(db).get_employee(current_user.id)
 
 
 @router.get("/me/stats", response_model=EmployeeStats)
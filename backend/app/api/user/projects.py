@@ -6,6 +6,7 @@ from app.core.deps import get_current_active_user
 from app.models.employee import Employee
 from app.schemas.project import Project as ProjectSchema
 from app.services.project_service import ProjectService
+from app.services.membership_service import MembershipService
 
 router = APIRouter()
 
@@ -34,15 +35,12 @@ async def get_user_project(
     db: Session = Depends(get_db)
 ):
     """Get specific project if user is assigned to it"""
-    project_service = ProjectService(db)
-    project = project_service.get_project(project_id)
-    
-    if not project:
+    # Unassigned and missing projects look the same; check first so neither is loaded
+    if not MembershipService(db).is_assigned_to_project(current_user, project_id):
         raise HTTPException(status_code=404, detail="Project not found")
     
-    # Check if user is assigned to this project
-    user_project_ids = [p.id for p in current_user.projects]
-    if project_id not in user_project_ids:
+    project = ProjectService(db).get_project(project_id)
+    if not project:
         raise HTTPException(status_code=404, detail="Project not found")
     
     return project
\ No newline at end of file
@@ -6,6 +6,7 @@ from app.core.deps import get_current_active_user
 from app.models.employee import Employee
 from app.schemas.screenshot import Screenshot as ScreenshotSchema, ScreenshotCreate
 from app.services.screenshot_service import ScreenshotService
+from app.services.membership_service import MembershipService
 
 router = APIRouter()
 
@@ -20,20 +21,18 @@ async def create_screenshot(
     screenshot_service = ScreenshotService(db)
     
     # Validate project and task assignment if provided
-    if screenshot_data.projectId:
-        user_project_ids = [p.id for p in current_user.projects]
-        if screenshot_data.projectId not in user_project_ids:
-            raise HTTPException(status_code=400, detail="You are not assigned to this project")
+    membership = MembershipService(db)
+    if screenshot_data.projectId and not membership.is_assigned_to_project(current_user, screenshot_data.projectId):
+        raise HTTPException(status_code=400, detail="You are not assigned to this project")
     
-    if screenshot_data.taskId:
-        user_task_ids = [t.id for t in current_user.tasks]
-        if screenshot_data.taskId not in user_task_ids:
-            raise HTTPException(status_code=400, detail="You are not assigned to this task")
+    if screenshot_data.taskId and not membership.is_assigned_to_task(current_user, screenshot_data.taskId):
+        raise HTTPException(status_code=400, detail="You are not assigned to this task")
     
     screenshot = screenshot_service.create_screenshot(
         screenshot_data,
         current_user.id,
-        current_user.organizationId
+        current_user.organizationId,
+        team_id=current_user.teamId
     )
     
     return screenshot
@@ -0,0 +1,19 @@
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+from app.db.database import get_db
+from app.core.deps import get_current_active_user
+from app.models.employee import Employee
+from app.schemas.sync import CatalogSync
+from app.services.catalog_sync import CatalogSyncService
+
+router = APIRouter()
+
+
+@router.get("/", response_model=CatalogSync)
+async def sync_catalog(
+    since: int = Query(0, ge=0, description="The version returned by the previous sync; 0 for everything"),
+    current_user: Employee = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """Projects and tasks assigned to the current user that changed since a version"""
+    return CatalogSyncService(db).changes(current_user.id, current_user.organizationId, since)
@@ -6,6 +6,7 @@ from app.core.deps import get_current_active_user
 from app.models.employee import Employee
 from app.schemas.task import Task as TaskSchema
 from app.services.task_service import TaskService
+from app.services.membership_service import MembershipService
 
 router = APIRouter()
 
@@ -34,15 +35,12 @@ async def get_user_task(
     db: Session = Depends(get_db)
 ):
     """Get specific task if user is assigned to it"""
-    task_service = TaskService(db)
-    task = task_service.get_task(task_id)
-    
-    if not task:
+    # Unassigned and missing tasks look the same; check first so neither is loaded
+    if not MembershipService(db).is_assigned_to_task(current_user, task_id):
         raise HTTPException(status_code=404, detail="Task not found")
     
-    # Check if user is assigned to this task
-    user_task_ids = [t.id for t in current_user.tasks]
-    if task_id not in user_task_ids:
+    task = TaskService(db).get_task(task_id)
+    if not task:
         raise HTTPException(status_code=404, detail="Task not found")
     
     return task
\ No newline at end of file
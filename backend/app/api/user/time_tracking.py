@@ -6,6 +6,7 @@ from app.core.deps import get_current_active_user
 from app.models.employee import Employee
 from app.schemas.shift import Shift as ShiftSchema, ShiftStart, ShiftEnd
 from app.services.shift_service import ShiftService
+from app.services.membership_service import MembershipService
 
 router = APIRouter()
 
@@ -20,15 +21,12 @@ async def start_time_tracking(
     shift_service = ShiftService(db)
     
     # Validate project and task assignment if provided
-    if shift_data.projectId:
-        user_project_ids = [p.id for p in current_user.projects]
-        if shift_data.projectId not in user_project_ids:
-            raise HTTPException(status_code=400, detail="You are not assigned to this project")
+    membership = MembershipService(db)
+    if shift_data.projectId and not membership.is_assigned_to_project(current_user, shift_data.projectId):
+        raise HTTPException(status_code=400, detail="You are not assigned to this project")
     
-    if shift_data.taskId:
-        user_task_ids = [t.id for t in current_user.tasks]
-        if shift_data.taskId not in user_task_ids:
-            raise HTTPException(status_code=400, detail="You are not assigned to this task")
+    if shift_data.taskId and not membership.is_assigned_to_task(current_user, shift_data.taskId):
+        raise HTTPException(status_code=400, detail="You are not assigned to this task")
     
     try:
         shift = shift_service.start_shift(
@@ -0,0 +1,369 @@
+from collections import OrderedDict
+from app.core.config import settings
+from typing import Any, Callable, Dict, Hashable, List, Optional, Set, Tuple
+import json
+import logging
+import pickle
+import redis
+import threading
+import time
+import uuid
+
+logger = logging.getLogger(__name__)
+
+_MISSING = object()
+
+# Caches by name, reported by /metrics; anything with hits, misses and len() fits
+caches: Dict[str, Any] = {}
+
+
+class LRUCache:
+    """Thread-safe in-process LRU cache.
+
+    Keys are tuples whose first element is the organization id, so all
+    entries of one organization can be dropped when its data changes.
+    """
+
+    def __init__(self, name: str, maxsize: int = 1024):
+        self.name = name
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._data: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+        caches[name] = self
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            value = self._data.get(key, _MISSING)
+            if value is _MISSING:
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def delete(self, key: Hashable) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def invalidate_organization(self, organization_id: str) -> None:
+        with self._lock:
+            for key in [k for k in self._data if k[0] == organization_id]:
+                del self._data[key]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class RedisTier:
+    """Shared L2 storage and invalidation broadcasts for TwoTierCache.
+
+    Each (cache, organization) pair is one Redis hash, so invalidating an
+    organization is a single DEL. Every change is published on CHANNEL and
+    the other processes drop their L1 copies. When Redis fails, calls are
+    skipped for `retry_seconds` and caches behave as local-only, with L1
+    entries expiring after CACHE_LOCAL_TTL_SECONDS to bound staleness. A
+    cache with an invalidation that did not reach Redis stops using L2 until
+    Redis is reachable again, when its hashes are cleared and every process
+    told to drop its L1 copies. Values are pickled, so the Redis server must
+    be trusted.
+    """
+
+    CHANNEL = "cache:invalidate"
+
+    def __init__(self, client, ttl_seconds: int = None, retry_seconds: float = 30):
+        self.client = client
+        self.ttl_seconds = settings.CACHE_REDIS_TTL_SECONDS if ttl_seconds is None else ttl_seconds
+        self.retry_seconds = retry_seconds
+        self.origin = uuid.uuid4().hex
+        self._caches: Dict[str, "TwoTierCache"] = {}
+        self._down_until = 0.0
+        # Caches whose L2 may hold values that were invalidated while Redis failed
+        self._untrusted: Set[str] = set()
+        self._resync_scheduled = False
+        self._listening = False
+        self._lock = threading.Lock()
+
+    def attach(self, cache: "TwoTierCache") -> None:
+        self._caches[cache.name] = cache
+        with self._lock:
+            if not self._listening:
+                self._listening = True
+                self._subscribe()
+
+    def _subscribe(self) -> None:
+        try:
+            pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+            pubsub.subscribe(**{self.CHANNEL: self._on_message})
+            pubsub.run_in_thread(sleep_time=1, daemon=True, exception_handler=self._on_listener_error)
+        except redis.RedisError as e:
+            logger.warning(f"Cache invalidation listener cannot reach Redis, retrying: {str(e)}")
+            retry = threading.Timer(self.retry_seconds, self._subscribe)
+            retry.daemon = True
+            retry.start()
+            return
+        # Anything cached before subscribing may have missed invalidations
+        for cached in list(self._caches.values()):
+            cached.local.clear()
+
+    @staticmethod
+    def _hash(name: str, organization_id: Any) -> str:
+        return f"cache:{name}:{organization_id}"
+
+    @staticmethod
+    def _field(key: Tuple) -> str:
+        return json.dumps(list(key[1:]))
+
+    def _safely(self, operation: Callable[[], Any], default: Any = None) -> Any:
+        if time.monotonic() < self._down_until:
+            return default
+        try:
+            if self._untrusted:
+                self._resync()
+            return operation()
+        except redis.RedisError as e:
+            self._down_until = time.monotonic() + self.retry_seconds
+            logger.warning(f"Redis cache unavailable, using local caches for {self.retry_seconds}s: {str(e)}")
+            return default
+
+    def _resync(self) -> None:
+        """Clear the caches whose invalidations were missed, now that Redis answers"""
+        for name in list(self._untrusted):
+            self._delete_all(name)
+            self.client.publish(self.CHANNEL, self._message(name, None, None))
+            self._untrusted.discard(name)
+
+    def get(self, name: str, key: Tuple) -> Any:
+        def read():
+            if name in self._untrusted:
+                return None
+            return self.client.hget(self._hash(name, key[0]), self._field(key))
+        data = self._safely(read)
+        return _MISSING if data is None else pickle.loads(data)
+
+    def set(self, name: str, key: Tuple, value: Any) -> None:
+        def write():
+            if name in self._untrusted:
+                return
+            pipe = self.client.pipeline()
+            pipe.hset(self._hash(name, key[0]), self._field(key), pickle.dumps(value))
+            if self.ttl_seconds:
+                pipe.expire(self._hash(name, key[0]), self.ttl_seconds)
+            pipe.execute()
+        self._safely(write)
+
+    def _invalidate(self, name: str, remove: Callable[[], Any], organization_id: Any, field: Optional[str]) -> None:
+        """Remove entries from L2 and tell the other processes to drop them from L1"""
+        def run():
+            remove()
+            self.client.publish(self.CHANNEL, self._message(name, organization_id, field))
+            return True
+        if not self._safely(run, False):
+            self._untrusted.add(name)
+            self._schedule_resync()
+
+    def _schedule_resync(self) -> None:
+        """Retry clearing untrusted caches even if this process makes no more cache calls"""
+        def attempt():
+            with self._lock:
+                self._resync_scheduled = False
+            self._safely(lambda: None)
+            if self._untrusted:
+                self._schedule_resync()
+
+        with self._lock:
+            if self._resync_scheduled:
+                return
+            self._resync_scheduled = True
+        timer = threading.Timer(self.retry_seconds, attempt)
+        timer.daemon = True
+        timer.start()
+
+    def delete(self, name: str, key: Tuple) -> None:
+        self._invalidate(
+            name, lambda: self.client.hdel(self._hash(name, key[0]), self._field(key)), key[0], self._field(key)
+        )
+
+    def delete_organization(self, name: str, organization_id: Any) -> None:
+        self._invalidate(name, lambda: self.client.delete(self._hash(name, organization_id)), organization_id, None)
+
+    def clear(self, name: str) -> None:
+        self._invalidate(name, lambda: self._delete_all(name), None, None)
+
+    def _delete_all(self, name: str) -> None:
+        keys = list(self.client.scan_iter(match=f"cache:{name}:*", count=1000))
+        if keys:
+            self.client.delete(*keys)
+
+    def _message(self, name: str, organization_id: Any, field: Optional[str]) -> str:
+        return json.dumps({"origin": self.origin, "cache": name, "org": organization_id, "field": field})
+
+    def _on_message(self, message: Dict[str, Any]) -> None:
+        data = json.loads(message["data"])
+        cache = self._caches.get(data["cache"])
+        if cache is None or data["origin"] == self.origin:
+            return
+        if data["org"] is None:
+            cache.local.clear()
+        elif data["field"] is None:
+            cache.local.invalidate_organization(data["org"])
+        else:
+            cache.local.delete((data["org"], *json.loads(data["field"])))
+
+    def _on_listener_error(self, error: Exception, pubsub, thread) -> None:
+        # Invalidations may have been missed; the listener resubscribes on its next poll
+        logger.warning(f"Cache invalidation listener lost Redis: {str(error)}")
+        for cache in list(self._caches.values()):
+            cache.local.clear()
+        time.sleep(self.retry_seconds)
+
+
+class TwoTierCache:
+    """LRUCache (L1) in front of a RedisTier (L2) shared by every process.
+
+    Same interface as LRUCache. Reads fall through to Redis on an L1 miss;
+    writes and invalidations go to both, and invalidations reach other
+    processes' L1 through pub/sub.
+    """
+
+    def __init__(self, name: str, maxsize: int, tier: RedisTier, local_ttl_seconds: float = None):
+        self.name = name
+        self.tier = tier
+        self.local_ttl_seconds = settings.CACHE_LOCAL_TTL_SECONDS if local_ttl_seconds is None else local_ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        # L1 values are (expires at, value)
+        self.local = LRUCache(name, maxsize)
+        caches[name] = self
+        tier.attach(self)
+
+    def get(self, key: Tuple, default: Any = None) -> Any:
+        now = time.monotonic()
+        entry = self.local.get(key)
+        if entry is not None and entry[0] > now:
+            self.hits += 1
+            return entry[1]
+        value = self.tier.get(self.name, key)
+        if value is _MISSING:
+            self.misses += 1
+            return default
+        self.local.set(key, (now + self.local_ttl_seconds, value))
+        self.hits += 1
+        return value
+
+    def set(self, key: Tuple, value: Any) -> None:
+        self.local.set(key, (time.monotonic() + self.local_ttl_seconds, value))
+        self.tier.set(self.name, key, value)
+
+    def delete(self, key: Tuple) -> None:
+        self.local.delete(key)
+        self.tier.delete(self.name, key)
+
+    def invalidate_organization(self, organization_id: str) -> None:
+        self.local.invalidate_organization(organization_id)
+        self.tier.delete_organization(self.name, organization_id)
+
+    def clear(self) -> None:
+        self.local.clear()
+        self.tier.clear(self.name)
+
+    def __len__(self) -> int:
+        return len(self.local)
+
+
+class FakeRedis:
+    """The subset of redis.Redis that RedisTier uses, in memory, for tests.
+
+    Clients made with `connect()` share one server, like processes sharing
+    Redis; messages are delivered synchronously. `fail` makes calls raise.
+    """
+
+    def __init__(self, server: Dict[str, Any] = None):
+        self.server = server if server is not None else {"hashes": {}, "subscribers": []}
+        self.fail = False
+
+    def connect(self) -> "FakeRedis":
+        return FakeRedis(self.server)
+
+    def _check(self) -> None:
+        if self.fail:
+            raise redis.ConnectionError("Fake Redis is down")
+
+    def hget(self, name: str, field: str) -> Optional[bytes]:
+        self._check()
+        return self.server["hashes"].get(name, {}).get(field)
+
+    def hset(self, name: str, field: str, value: bytes) -> None:
+        self._check()
+        self.server["hashes"].setdefault(name, {})[field] = value
+
+    def hdel(self, name: str, field: str) -> None:
+        self._check()
+        self.server["hashes"].get(name, {}).pop(field, None)
+
+    def delete(self, *names: str) -> None:
+        self._check()
+        for name in names:
+            self.server["hashes"].pop(name, None)
+
+    def expire(self, name: str, seconds: int) -> None:
+        self._check()
+
+    def scan_iter(self, match: str, count: int = None) -> List[str]:
+        self._check()
+        return [name for name in self.server["hashes"] if name.startswith(match.rstrip("*"))]
+
+    def pipeline(self) -> "FakeRedis":
+        return self
+
+    def execute(self) -> None:
+        pass
+
+    def publish(self, channel: str, message: str) -> None:
+        self._check()
+        for subscribed, handler in list(self.server["subscribers"]):
+            if subscribed == channel:
+                handler({"channel": channel, "data": message})
+
+    def pubsub(self, ignore_subscribe_messages: bool = False) -> "FakeRedis":
+        return self
+
+    def subscribe(self, **handlers: Callable) -> None:
+        self.server["subscribers"].extend(handlers.items())
+
+    def run_in_thread(self, **kwargs) -> None:
+        return None
+
+
+_shared_tier: Optional[RedisTier] = None
+
+
+def shared_tier() -> Optional[RedisTier]:
+    """The process's RedisTier when CACHE_BACKEND is redis"""
+    global _shared_tier
+    if settings.CACHE_BACKEND != "redis":
+        return None
+    if _shared_tier is None:
+        client = redis.Redis.from_url(settings.REDIS_URL, socket_connect_timeout=0.5, socket_timeout=0.5)
+        _shared_tier = RedisTier(client)
+    return _shared_tier
+
+
+def make_cache(name: str, maxsize: int = 1024):
+    """LRUCache, or with CACHE_BACKEND=redis a TwoTierCache shared across processes"""
+    tier = shared_tier()
+    if tier is None:
+        return LRUCache(name, maxsize)
+    return TwoTierCache(name, maxsize, tier)
@@ -1,7 +1,8 @@
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.orm import Session
-from app.db.database import get_db
+from app.db.database import get_db, read_replica, statement_timeout_ms
+from app.core.config import settings
 from app.core.security import verify_token
 from app.models.employee import Employee
 from app.schemas.auth import TokenData
@@ -40,9 +41,26 @@ def get_current_user(
             headers={"WWW-Authenticate": "Bearer"},
         )
     
+    # Lets commits on this session count as the user's writes (read-your-writes)
+    db.info["user_id"] = user.id
     return user
 
 
+def get_read_db(
+    current_user: Employee = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Session for read-only endpoints: the replica when usable, else the primary"""
+    read_db = read_replica.session(current_user.id)
+    if read_db is None:
+        yield db
+        return
+    try:
+        yield read_db
+    finally:
+        read_db.close()
+
+
 def get_current_admin_user(
     current_user: Employee = Depends(get_current_user)
 ) -> Employee:
@@ -64,4 +82,23 @@ def get_current_active_user(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Email not verified"
         )
-    return current_user
\ No newline at end of file
+    return current_user
+
+
+ROUTE_STATEMENT_TIMEOUTS = {
+    "default": lambda: settings.DB_STATEMENT_TIMEOUT_MS,
+    "agent": lambda: settings.DB_AGENT_STATEMENT_TIMEOUT_MS,
+    "analytics": lambda: settings.DB_ANALYTICS_STATEMENT_TIMEOUT_MS,
+}
+
+
+def statement_timeout(route_class: str):
+    """Router dependency applying the statement timeout of a route class"""
+    timeout = ROUTE_STATEMENT_TIMEOUTS[route_class]
+    
+    # Async so the value is set in the request's own context, which the
+    # endpoint and later threadpool dependencies inherit
+    async def set_statement_timeout():
+        statement_timeout_ms.set(timeout())
+    
+    return set_statement_timeout
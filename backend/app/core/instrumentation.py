@@ -0,0 +1,139 @@
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from app.core.config import settings
+from typing import Dict, Any, List, Optional, Tuple
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class QueryStats:
+    """SQL statements executed while handling one request"""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0  # in seconds
+        self.statements: Counter = Counter()
+
+    def record(self, statement: str, duration: float) -> None:
+        self.count += 1
+        self.duration += duration
+        self.statements[statement] += 1
+
+    def repeated(self, threshold: int) -> List[Tuple[str, int]]:
+        """Identical statements executed at least `threshold` times (likely N+1)"""
+        return [(s, n) for s, n in self.statements.most_common() if n >= threshold]
+
+
+_current_stats: ContextVar[Optional[QueryStats]] = ContextVar("query_stats", default=None)
+
+
+def current_query_stats() -> Optional[QueryStats]:
+    return _current_stats.get()
+
+
+@contextmanager
+def track_queries():
+    """Collect the queries executed inside the block"""
+    stats = QueryStats()
+    token = _current_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        _current_stats.reset(token)
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info["query_start_time"].pop()
+    stats = _current_stats.get()
+    if stats is not None:
+        stats.record(statement, time.perf_counter() - started)
+
+
+class RouteQueryMetrics:
+    """Query totals per route, aggregated across requests"""
+
+    def __init__(self):
+        self._routes: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, route: str, stats: QueryStats, repeated: List[Tuple[str, int]]) -> None:
+        with self._lock:
+            entry = self._routes.setdefault(route, {
+                "requests": 0,
+                "queries": 0,
+                "maxQueries": 0,
+                "dbTimeMs": 0.0,
+                "nPlusOneRequests": 0
+            })
+            entry["requests"] += 1
+            entry["queries"] += stats.count
+            entry["maxQueries"] = max(entry["maxQueries"], stats.count)
+            entry["dbTimeMs"] += stats.duration * 1000
+            if repeated:
+                entry["nPlusOneRequests"] += 1
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            return {
+                route: {**entry, "avgQueries": entry["queries"] / entry["requests"]}
+                for route, entry in self._routes.items()
+            }
+
+    def reset(self) -> None:
+        with self._lock:
+            self._routes.clear()
+
+
+route_query_metrics = RouteQueryMetrics()
+
+
+def route_path(scope) -> str:
+    """Route template (e.g. /api/v1/employee/{employee_id}) for a request scope"""
+    route = scope.get("route")
+    return getattr(route, "path", None) or "unmatched"
+
+
+class QueryStatsMiddleware:
+    """Counts queries per request and reports them via headers, logs and metrics"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        async def send_with_timing(message):
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                headers.append((b"x-db-query-count", str(stats.count).encode()))
+                headers.append((
+                    b"server-timing",
+                    f'db;dur={stats.duration * 1000:.2f};desc="{stats.count} queries"'.encode()
+                ))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        with track_queries() as stats:
+            try:
+                await self.app(scope, receive, send_with_timing)
+            finally:
+                route = f"{scope['method']} {route_path(scope)}"
+                repeated = stats.repeated(settings.N_PLUS_ONE_THRESHOLD)
+                for statement, times in repeated:
+                    logger.warning(f"Possible N+1 on {route}: {times}x {' '.join(statement.split())[:200]}")
+                logger.debug(f"{route} ran {stats.count} queries in {stats.duration * 1000:.1f}ms")
+                route_query_metrics.observe(route, stats, repeated)
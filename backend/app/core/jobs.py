@@ -0,0 +1,295 @@
+from concurrent.futures import ThreadPoolExecutor
+from sqlalchemy import func
+from sqlalchemy.orm import Session, sessionmaker
+from app.core.config import settings
+from app.core.metrics import Counter, Histogram, registry
+from app.models.job import Job
+from datetime import datetime
+from typing import Any, Callable, Dict, Optional, Set
+import asyncio
+import inspect
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+job_queue_latency_seconds = registry.register(Histogram(
+    "job_queue_latency_seconds", "Time jobs waited between becoming due and starting", ("task",),
+    buckets=(0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 15.0, 60.0, 300.0, 1800.0)
+))
+job_duration_seconds = registry.register(Histogram(
+    "job_duration_seconds", "Job runtime", ("task",),
+    buckets=(0.01, 0.1, 0.5, 1.0, 5.0, 15.0, 60.0, 300.0, 1800.0, 7200.0)
+))
+jobs_total = registry.register(Counter(
+    "jobs_total", "Jobs finished, by outcome", ("task", "status")
+))
+
+
+def _now_ms() -> int:
+    return int(datetime.utcnow().timestamp() * 1000)
+
+
+class JobContext:
+    """Handed to a running task: its session, its Job row and progress reporting"""
+
+    def __init__(self, db: Session, job: Optional[Job]):
+        self.db = db
+        self.job = job
+
+    @property
+    def organization_id(self) -> Optional[str]:
+        return self.job.organizationId if self.job else None
+
+    def progress(self, **values: Any) -> None:
+        """Merge values into job.progress and commit, which also commits the task's work so far"""
+        if self.job is not None:
+            self.job.progress = {**(self.job.progress or {}), **values}
+            self.job.updatedAt = _now_ms()
+        self.db.commit()
+
+
+class Task:
+    def __init__(
+        self,
+        name: str,
+        fn: Callable[..., Any],
+        admin: bool,
+        cleanup: Optional[Callable[[Dict[str, Any]], None]] = None
+    ):
+        self.name = name
+        self.fn = fn
+        self.admin = admin  # Admins may start it for their own organization
+        # Called with the params of a job abandoned by a worker that died
+        self.cleanup = cleanup
+
+    def check_params(self, params: Dict[str, Any]) -> None:
+        """Raise ValueError now rather than fail the job later on unexpected params"""
+        try:
+            inspect.signature(self.fn).bind(None, **params)
+        except TypeError as e:
+            raise ValueError(f"Invalid params for {self.name}: {str(e)}")
+
+
+# Populated by app.tasks, which both the API and the Celery worker import
+tasks: Dict[str, Task] = {}
+
+
+def task(name: str, admin: bool = False, cleanup: Callable[[Dict[str, Any]], None] = None):
+    """Register `fn(ctx, **params)` as a job; its return value is stored as the job's result"""
+    def register(fn):
+        tasks[name] = Task(name, fn, admin, cleanup)
+        return fn
+    return register
+
+
+def enqueue(
+    db: Session,
+    name: str,
+    params: Dict[str, Any] = None,
+    organization_id: str = None,
+    created_by: str = None,
+    delay_seconds: float = 0
+) -> Job:
+    """Record a job, commit, and hand it to JOB_BACKEND"""
+    if name not in tasks:
+        raise ValueError(f"Unknown job: {name}")
+    tasks[name].check_params(params or {})
+    now = _now_ms()
+    job = Job(
+        name=name,
+        params=params or None,
+        organizationId=organization_id,
+        createdBy=created_by,
+        queuedAt=now,
+        scheduledAt=now + int(delay_seconds * 1000)
+    )
+    db.add(job)
+    db.commit()
+    db.refresh(job)
+    # Eager and thread backends run jobs against the enqueuing session's database
+    _dispatch(job.id, delay_seconds, sessionmaker(autocommit=False, autoflush=False, bind=db.get_bind()))
+    return job
+
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+# Jobs handed to this process's pool or timers and not yet finished, so sweeps skip them
+_dispatched: Set[str] = set()
+# Jobs running in this process, whose heartbeats it keeps fresh
+_running: Dict[str, sessionmaker] = {}
+_heartbeat: Optional[threading.Thread] = None
+
+
+def _thread_pool() -> ThreadPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(settings.JOB_WORKERS, thread_name_prefix="job")
+        return _executor
+
+
+def _dispatch(job_id: str, delay_seconds: float, session_factory: sessionmaker) -> None:
+    if settings.JOB_BACKEND == "eager":
+        run_job(job_id, session_factory)
+    elif settings.JOB_BACKEND == "celery":
+        from app.worker import run_job_task
+        run_job_task.apply_async((job_id,), countdown=delay_seconds or None)
+    else:
+        with _executor_lock:
+            _dispatched.add(job_id)
+        if delay_seconds:
+            timer = threading.Timer(delay_seconds, _thread_pool().submit, (run_job, job_id, session_factory))
+            timer.daemon = True
+            timer.start()
+        else:
+            _thread_pool().submit(run_job, job_id, session_factory)
+
+
+def _beat() -> None:
+    while True:
+        time.sleep(settings.JOB_HEARTBEAT_SECONDS)
+        with _executor_lock:
+            running = list(_running.items())
+        for job_id, session_factory in running:
+            db = session_factory()
+            try:
+                db.query(Job).filter(Job.id == job_id, Job.status == "running").update(
+                    {Job.heartbeatAt: _now_ms()}, synchronize_session=False
+                )
+                db.commit()
+            except Exception as e:
+                logger.error(f"Heartbeat for job {job_id} failed: {str(e)}")
+            finally:
+                db.close()
+
+
+def _track(job_id: str, session_factory: sessionmaker) -> None:
+    """Keep the job's heartbeat fresh while it runs, so sweeps know its worker is alive"""
+    global _heartbeat
+    with _executor_lock:
+        _running[job_id] = session_factory
+        if _heartbeat is None and settings.JOB_BACKEND != "eager":
+            _heartbeat = threading.Thread(target=_beat, name="job-heartbeat", daemon=True)
+            _heartbeat.start()
+
+
+def _untrack(job_id: str) -> None:
+    with _executor_lock:
+        _running.pop(job_id, None)
+        _dispatched.discard(job_id)
+
+
+def run_job(job_id: str, session_factory: sessionmaker) -> Optional[Job]:
+    """Run a queued job once; duplicate deliveries of a started job are ignored"""
+    db = session_factory()
+    try:
+        # Claimed with a conditional update, as Celery may deliver a message twice
+        now = _now_ms()
+        claimed = db.query(Job).filter(Job.id == job_id, Job.status == "queued").update(
+            {Job.status: "running", Job.startedAt: now, Job.heartbeatAt: now}, synchronize_session=False
+        )
+        db.commit()
+        if not claimed:
+            return None
+        _track(job_id, session_factory)
+        job = db.query(Job).filter(Job.id == job_id).one()
+        job_queue_latency_seconds.observe(max(job.startedAt - (job.scheduledAt or job.queuedAt), 0) / 1000, job.name)
+
+        started = time.perf_counter()
+        try:
+            result = tasks[job.name].fn(JobContext(db, job), **(job.params or {}))
+            job.result = result
+            job.status = "completed"
+        except Exception as e:
+            db.rollback()
+            job.status = "failed"
+            job.error = str(e)[:500]
+            logger.exception(f"Job {job.name} ({job.id}) failed")
+        job.finishedAt = job.updatedAt = _now_ms()
+        db.commit()
+        job_duration_seconds.observe(time.perf_counter() - started, job.name)
+        jobs_total.inc(1, job.name, job.status)
+        return job
+    finally:
+        _untrack(job_id)
+        db.close()
+
+
+def recover_jobs(session_factory: sessionmaker) -> Dict[str, int]:
+    """Fail jobs whose worker died and dispatch due jobs that no worker holds.
+
+    A running job whose heartbeat is older than JOB_STALE_SECONDS lost its
+    worker: it is marked failed (tasks are not assumed safe to rerun) and its
+    task's cleanup is called. Queued jobs that are due are dispatched again,
+    which covers in-memory queues and timers lost in a restart; the claim in
+    run_job keeps a job that was still queued elsewhere from running twice.
+    Celery only gets jobs due for JOB_STALE_SECONDS, so backlogged messages
+    are not duplicated.
+    """
+    db = session_factory()
+    try:
+        now = _now_ms()
+        cutoff = now - settings.JOB_STALE_SECONDS * 1000
+        stale = func.coalesce(Job.heartbeatAt, Job.startedAt) < cutoff
+        abandoned = 0
+        for job in db.query(Job).filter(Job.status == "running", stale).all():
+            failed = db.query(Job).filter(Job.id == job.id, Job.status == "running", stale).update({
+                Job.status: "failed",
+                Job.error: "The worker running this job stopped",
+                Job.finishedAt: now,
+                Job.updatedAt: now,
+            }, synchronize_session=False)
+            db.commit()
+            if not failed:
+                continue
+            abandoned += 1
+            jobs_total.inc(1, job.name, "failed")
+            task = tasks.get(job.name)
+            if task and task.cleanup:
+                try:
+                    task.cleanup(job.params or {})
+                except Exception as e:
+                    logger.error(f"Cleanup of abandoned job {job.name} ({job.id}) failed: {str(e)}")
+
+        due = now if settings.JOB_BACKEND != "celery" else cutoff
+        queued = [job_id for job_id, in db.query(Job.id).filter(
+            Job.status == "queued", Job.scheduledAt <= due
+        ).order_by(Job.scheduledAt).limit(settings.JOB_RECOVER_BATCH_SIZE)]
+        db.close()
+        with _executor_lock:
+            queued = [job_id for job_id in queued if job_id not in _dispatched]
+        for job_id in queued:
+            _dispatch(job_id, 0, session_factory)
+        return {"abandoned": abandoned, "dispatched": len(queued)}
+    finally:
+        db.close()
+
+
+async def recover_periodically(session_factory: sessionmaker) -> None:
+    """Run recover_jobs every JOB_RECOVER_SECONDS, starting now (thread backend, application startup)"""
+    while True:
+        try:
+            counts = await asyncio.to_thread(recover_jobs, session_factory)
+            if any(counts.values()):
+                logger.warning(f"Recovered jobs: {counts}")
+        except Exception as e:
+            logger.error(f"Job recovery failed: {str(e)}")
+        await asyncio.sleep(settings.JOB_RECOVER_SECONDS)
+
+
+def run_untracked(name: str, session_factory: sessionmaker, **params: Any) -> Any:
+    """Run a task without a Job row, for frequent periodic work such as email delivery"""
+    db = session_factory()
+    started = time.perf_counter()
+    status = "failed"
+    try:
+        result = tasks[name].fn(JobContext(db, None), **params)
+        db.commit()
+        status = "completed"
+        return result
+    finally:
+        db.close()
+        job_duration_seconds.observe(time.perf_counter() - started, name)
+        jobs_total.inc(1, name, status)
@@ -0,0 +1,238 @@
+from bisect import bisect_left
+from app.core.cache import caches
+from app.core.instrumentation import current_query_stats, route_path
+from typing import Callable, Dict, Iterable, List, Sequence, Tuple
+import threading
+import time
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _escape(value: str) -> str:
+    """A label value in the text exposition format"""
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def render(self) -> List[str]:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"] + self._samples()
+
+    def _samples(self) -> List[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, help, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1, *labels: str) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            items = list(self._values.items())
+        return [f"{self.name}{_format_labels(self.labelnames, k)} {_format_value(v)}" for k, v in items]
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def dec(self, amount: float = 1, *labels: str) -> None:
+        self.inc(-amount, *labels)
+
+    def set(self, value: float, *labels: str) -> None:
+        with self._lock:
+            self._values[labels] = value
+
+
+class CallbackGauge(_Metric):
+    """Gauge read at scrape time from a function returning (labels, value) pairs"""
+
+    kind = "gauge"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str],
+                 callback: Callable[[], Iterable[Tuple[Tuple[str, ...], float]]]):
+        super().__init__(name, help, labelnames)
+        self.callback = callback
+
+    def _samples(self) -> List[str]:
+        return [
+            f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}"
+            for labels, value in self.callback()
+        ]
+
+
+class CallbackCounter(CallbackGauge):
+    kind = "counter"
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(buckets)
+        # labels -> [per-bucket counts..., +Inf count, sum]
+        self._values: Dict[Tuple[str, ...], List[float]] = {}
+
+    def observe(self, value: float, *labels: str) -> None:
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._values.get(labels)
+            if series is None:
+                series = self._values[labels] = [0] * (len(self.buckets) + 2)
+            series[index] += 1
+            series[-1] += value
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            items = [(labels, list(series)) for labels, series in self._values.items()]
+        lines = []
+        for labels, series in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), series[:-1]):
+                cumulative += count
+                le = f'le="{_format_value(bound)}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, labels, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, labels)} {_format_value(series[-1])}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, labels)} {cumulative}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+
+    def register(self, metric: _Metric) -> _Metric:
+        self._metrics[metric.name] = metric
+        return metric
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+http_requests_total = registry.register(Counter(
+    "http_requests_total", "HTTP requests handled", ("method", "route", "status")
+))
+http_request_duration_seconds = registry.register(Histogram(
+    "http_request_duration_seconds", "HTTP request latency", ("method", "route")
+))
+http_requests_in_flight = registry.register(Gauge(
+    "http_requests_in_flight", "HTTP requests currently being handled"
+))
+db_queries_total = registry.register(Counter(
+    "db_queries_total", "SQL statements executed while handling requests", ("method", "route")
+))
+db_pool_checkout_seconds = registry.register(Histogram(
+    "db_pool_checkout_seconds", "Time spent waiting for a pooled connection", ("engine",),
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 30.0)
+))
+db_pool_connections_created_total = registry.register(Counter(
+    "db_pool_connections_created_total", "New DBAPI connections opened", ("engine",)
+))
+db_pool_invalidations_total = registry.register(Counter(
+    "db_pool_invalidations_total", "Pooled connections invalidated", ("engine",)
+))
+registry.register(CallbackCounter(
+    "cache_hits_total", "Cache hits", ("cache",),
+    lambda: [((name,), cache.hits) for name, cache in list(caches.items())]
+))
+registry.register(CallbackCounter(
+    "cache_misses_total", "Cache misses", ("cache",),
+    lambda: [((name,), cache.misses) for name, cache in list(caches.items())]
+))
+registry.register(CallbackGauge(
+    "cache_entries", "Entries currently held by a cache", ("cache",),
+    lambda: [((name,), len(cache)) for name, cache in list(caches.items())]
+))
+
+# Engines registered by app.db.database; their pools are read at scrape time
+_engines: Dict[str, object] = {}
+
+
+def register_engine(name: str, engine) -> None:
+    _engines[name] = engine
+
+
+def _pool_gauge(method: str) -> Callable:
+    def collect():
+        pools = [(name, engine.pool) for name, engine in list(_engines.items())]
+        return [((name,), getattr(pool, method)()) for name, pool in pools if hasattr(pool, method)]
+    return collect
+
+
+registry.register(CallbackGauge("db_pool_size", "Configured pool size", ("engine",), _pool_gauge("size")))
+registry.register(CallbackGauge(
+    "db_pool_checked_out", "Connections currently checked out", ("engine",), _pool_gauge("checkedout")
+))
+registry.register(CallbackGauge(
+    "db_pool_checked_in", "Idle connections in the pool", ("engine",), _pool_gauge("checkedin")
+))
+registry.register(CallbackGauge(
+    "db_pool_overflow", "Connections open beyond the pool size", ("engine",), _pool_gauge("overflow")
+))
+
+
+class MetricsMiddleware:
+    """Records request count, latency and in-flight requests per route template"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = "500"
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = str(message["status"])
+            await send(message)
+
+        started = time.perf_counter()
+        http_requests_in_flight.inc()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            http_requests_in_flight.dec()
+            route = route_path(scope)
+            method = scope["method"]
+            http_request_duration_seconds.observe(time.perf_counter() - started, method, route)
+            http_requests_total.inc(1, method, route, status)
+            stats = current_query_stats()
+            if stats is not None:
+                db_queries_total.inc(stats.count, method, route)
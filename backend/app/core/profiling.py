@@ -0,0 +1,164 @@
+from datetime import datetime
+from pathlib import Path
+from typing import List, Dict, Any, Optional
+from app.core.config import settings
+from app.core.instrumentation import route_path
+import cProfile
+import hmac
+import logging
+import random
+import re
+import threading
+
+logger = logging.getLogger(__name__)
+
+PROFILE_HEADER = "x-profile-token"
+PROFILE_SUFFIX = ".pstats"
+# Server-Sent Events responses are not profiled
+STREAMING_CONTENT_TYPE = b"text/event-stream"
+
+# cProfile cannot run two profilers at once, so concurrent samples are skipped
+_profiler_lock = threading.Lock()
+
+
+class ProfileStore:
+    """Bounded on-disk ring buffer of .pstats files (open with snakeviz or flameprof)"""
+
+    def __init__(self, directory: str, max_files: int):
+        self.directory = Path(directory)
+        self.max_files = max_files
+
+    def new_name(self, method: str, route: str) -> str:
+        slug = re.sub(r"[^A-Za-z0-9]+", "_", route).strip("_") or "root"
+        return f"{datetime.utcnow():%Y%m%dT%H%M%S%f}_{method}_{slug}{PROFILE_SUFFIX}"
+
+    def save(self, profiler: cProfile.Profile, name: str) -> None:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        profiler.dump_stats(str(self.directory / name))
+        # Oldest first, as names start with a timestamp
+        for stale in self._files()[:-self.max_files]:
+            stale.unlink(missing_ok=True)
+
+    def list(self) -> List[Dict[str, Any]]:
+        return [
+            {"name": path.name, "size": path.stat().st_size}
+            for path in reversed(self._files())
+        ]
+
+    def path(self, name: str) -> Optional[Path]:
+        """Path of a stored profile; only names currently in the buffer resolve"""
+        for path in self._files():
+            if path.name == name:
+                return path
+        return None
+
+    def _files(self) -> List[Path]:
+        if not self.directory.is_dir():
+            return []
+        return sorted(self.directory.glob(f"*{PROFILE_SUFFIX}"))
+
+
+profile_store = ProfileStore(settings.PROFILE_DIR, settings.PROFILE_MAX_FILES)
+
+
+def _should_profile(scope) -> bool:
+    if settings.PROFILE_TOKEN:
+        for key, value in scope.get("headers", []):
+            if key == PROFILE_HEADER.encode() and hmac.compare_digest(value, settings.PROFILE_TOKEN.encode()):
+                return True
+    return settings.PROFILE_SAMPLE_RATE > 0 and random.random() < settings.PROFILE_SAMPLE_RATE
+
+
+class _Profiled:
+    """Awaits a coroutine with the profiler enabled only while it runs.
+
+    cProfile records everything on the thread while enabled, and the event
+    loop runs other requests whenever this one awaits. Stepping the
+    coroutine here and disabling the profiler around each suspension keeps
+    them out of the profile; time spent suspended is not recorded.
+    """
+
+    def __init__(self, coroutine, profiler: cProfile.Profile):
+        self.coroutine = coroutine
+        self.profiler = profiler
+        self.stopped = False
+
+    def stop(self) -> None:
+        """Record nothing more; the rest of the coroutine runs unprofiled"""
+        self.stopped = True
+        self.profiler.disable()
+
+    def __await__(self):
+        value, error = None, None
+        while True:
+            if not self.stopped:
+                self.profiler.enable()
+            try:
+                if error is not None:
+                    yielded = self.coroutine.throw(error)
+                else:
+                    yielded = self.coroutine.send(value)
+            except StopIteration as stop:
+                return stop.value
+            finally:
+                self.profiler.disable()
+            try:
+                value, error = (yield yielded), None
+            except GeneratorExit:
+                self.coroutine.close()
+                raise
+            except BaseException as e:
+                value, error = None, e
+
+
+class ProfilingMiddleware:
+    """Profiles a sample of requests, or those sent with the profiling token"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not _should_profile(scope):
+            await self.app(scope, receive, send)
+            return
+
+        if not _profiler_lock.acquire(blocking=False):
+            await self.app(scope, receive, send)
+            return
+
+        name = None
+        profiled: Optional[_Profiled] = None
+        released = False
+
+        def release() -> None:
+            nonlocal released
+            if not released:
+                released = True
+                _profiler_lock.release()
+
+        async def send_with_profile_id(message):
+            nonlocal name
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                if dict(headers).get(b"content-type", b"").startswith(STREAMING_CONTENT_TYPE):
+                    # Streams stay open for hours; profiling them would block other samples
+                    profiled.stop()
+                    release()
+                else:
+                    name = profile_store.new_name(scope["method"], route_path(scope))
+                    message = {**message, "headers": headers + [(b"x-profile-id", name.encode())]}
+            await send(message)
+
+        # Only this request's task is recorded; sync endpoints and dependencies
+        # executed in the threadpool, and other tasks, are not part of the profile
+        profiler = cProfile.Profile()
+        profiled = _Profiled(self.app(scope, receive, send_with_profile_id), profiler)
+        try:
+            await profiled
+        finally:
+            release()
+            if name:
+                try:
+                    profile_store.save(profiler, name)
+                except OSError as e:
+                    logger.error(f"Failed to store request profile {name}: {str(e)}")
@@ -0,0 +1,88 @@
+from typing import Any, Callable, Dict, Optional, Tuple
+
+# Screenshot.systemPermissions packs each known permission into 2 bits;
+# anything outside this vocabulary is kept as JSON instead
+PERMISSION_KEYS = ("accessibility", "screenAndSystemAudioRecording")
+PERMISSION_STATUSES = ("undetermined", "authorized", "denied", "restricted")
+
+
+def _read_only(self, *args, **kwargs):
+    raise TypeError(f"{type(self).__name__} is read-only; assign a new value to the attribute instead")
+
+
+class FrozenList(list):
+    """A list that refuses changes, so edits are not silently lost when the
+    value is a copy; compares and serializes as a list"""
+
+    append = extend = insert = remove = pop = clear = sort = reverse = _read_only
+    __setitem__ = __delitem__ = __iadd__ = __imul__ = _read_only
+
+    def __reduce__(self):
+        return FrozenList, (list(self),)
+
+
+class FrozenDict(dict):
+    """A dict that refuses changes; see FrozenList"""
+
+    pop = popitem = clear = update = setdefault = _read_only
+    __setitem__ = __delitem__ = __ior__ = _read_only
+
+    def __reduce__(self):
+        return FrozenDict, (dict(self),)
+
+
+def freeze(value: Any) -> Any:
+    if isinstance(value, dict):
+        return FrozenDict({key: freeze(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return FrozenList(freeze(item) for item in value)
+    return value
+
+
+def thaw(value: Any) -> Any:
+    """A plain, independent copy of a JSON value, frozen or not"""
+    if isinstance(value, dict):
+        return {key: thaw(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [thaw(item) for item in value]
+    return value
+
+
+def default_system_permissions() -> Dict[str, str]:
+    return {key: PERMISSION_STATUSES[0] for key in PERMISSION_KEYS}
+
+
+def encode_permissions(permissions: Optional[Dict[str, str]]) -> Tuple[Optional[int], Optional[Dict[str, str]]]:
+    """(code, json) for a permissions dict; (None, None) is the all-undetermined default"""
+    if permissions is None:
+        return None, None
+    if set(permissions) != set(PERMISSION_KEYS) or not all(v in PERMISSION_STATUSES for v in permissions.values()):
+        return None, dict(permissions)
+    code = 0
+    for shift, key in enumerate(PERMISSION_KEYS):
+        code |= PERMISSION_STATUSES.index(permissions[key]) << (2 * shift)
+    return code or None, None
+
+
+def decode_permissions(code: Optional[int], permissions: Optional[Dict[str, str]]) -> Dict[str, str]:
+    if permissions is not None:
+        return dict(permissions)
+    code = code or 0
+    return {key: PERMISSION_STATUSES[(code >> (2 * shift)) & 3] for shift, key in enumerate(PERMISSION_KEYS)}
+
+
+def json_with_default(column_attribute: str, default: Callable[[], Any]) -> property:
+    """Property over a JSON column that stores NULL while the value equals the default.
+
+    The value is read-only: the default is built on each read and the column
+    is not tracked for changes in place, so update it by assigning a new value.
+    """
+
+    def get(self):
+        value = getattr(self, column_attribute)
+        return freeze(default() if value is None else value)
+
+    def set(self, value):
+        setattr(self, column_attribute, None if value is None or value == default() else thaw(value))
+
+    return property(get, set)
@@ -1,17 +1,238 @@
-from sqlalchemy import create_engine
+from contextvars import ContextVar
+from fastapi import Request
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.exc import DBAPIError
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, raiseload, sessionmaker
+from sqlalchemy.pool import QueuePool
 from app.core.config import settings
+from app.core import metrics
+from typing import Any, Dict, Optional
+import logging
+import threading
+import time
 
-engine = create_engine(settings.DATABASE_URL)
+logger = logging.getLogger(__name__)
+
+# Set per route class by app.core.deps.statement_timeout; unset outside requests
+statement_timeout_ms: ContextVar[Optional[int]] = ContextVar("statement_timeout_ms", default=None)
+
+
+def current_statement_timeout() -> int:
+    timeout = statement_timeout_ms.get()
+    return settings.DB_JOB_STATEMENT_TIMEOUT_MS if timeout is None else timeout
+
+
+@event.listens_for(Session, "after_begin")
+def _set_postgres_statement_timeout(session, transaction, connection):
+    if connection.dialect.name == "postgresql":
+        # SET LOCAL lasts until the transaction ends, so pooled connections stay clean
+        connection.exec_driver_sql(f"SET LOCAL statement_timeout = {int(current_statement_timeout())}")
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _set_sqlite_statement_timeout(conn, cursor, statement, parameters, context, executemany):
+    if conn.dialect.name != "sqlite":
+        return
+    timeout = current_statement_timeout()
+    dbapi_connection = conn.connection.dbapi_connection
+    if not timeout:
+        dbapi_connection.set_progress_handler(None, 0)
+        return
+    # SQLite has no statement timeout; abort from the progress handler instead
+    deadline = time.monotonic() + timeout / 1000
+    dbapi_connection.set_progress_handler(lambda: time.monotonic() > deadline, 10000)
+
+
+class TimedQueuePool(QueuePool):
+    """QueuePool that records how long each checkout waited"""
+
+    def connect(self):
+        started = time.perf_counter()
+        try:
+            return super().connect()
+        finally:
+            metrics.db_pool_checkout_seconds.observe(time.perf_counter() - started, self.metrics_name)
+
+    def recreate(self):
+        pool = super().recreate()
+        pool.metrics_name = self.metrics_name
+        return pool
+
+
+def sqlite_pragmas() -> Dict[str, Any]:
+    """PRAGMAs of the SQLite production profile"""
+    return {
+        # Readers no longer wait for the writer, and commits only fsync at checkpoints
+        "journal_mode": "WAL",
+        "synchronous": settings.SQLITE_SYNCHRONOUS,
+        "mmap_size": settings.SQLITE_MMAP_SIZE_MB * 1024 * 1024,
+        "cache_size": -settings.SQLITE_CACHE_SIZE_MB * 1024,  # negative means KiB
+        "busy_timeout": settings.SQLITE_BUSY_TIMEOUT_MS,
+        "temp_store": "MEMORY",
+    }
+
+
+# Execution option of connections whose transactions write (see configure_sqlite)
+WRITE_OPTIONS = {"sqlite_begin_immediate": True}
+
+
+def configure_sqlite(db_engine: Engine, pragmas: Dict[str, Any], begin_immediate: bool) -> None:
+    """Apply PRAGMAs to every new connection and optionally start write transactions with BEGIN IMMEDIATE.
+
+    A deferred transaction that reads and then writes fails at once with
+    "database is locked" if another writer committed in between; busy_timeout
+    cannot help. BEGIN IMMEDIATE takes the write lock up front, so such
+    transactions wait in busy_timeout instead. It is only used on connections
+    with WRITE_OPTIONS, as the lock is held until the transaction ends; other
+    transactions begin deferred and, with WAL, never block writers.
+    """
+    @event.listens_for(db_engine, "connect")
+    def _set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name} = {value}")
+        cursor.close()
+        if begin_immediate:
+            # Stop pysqlite from emitting its own (deferred) BEGIN
+            dbapi_connection.isolation_level = None
+
+    if begin_immediate:
+        @event.listens_for(db_engine, "begin")
+        def _begin(conn):
+            immediate = conn.get_execution_options().get("sqlite_begin_immediate")
+            conn.exec_driver_sql("BEGIN IMMEDIATE" if immediate else "BEGIN")
+
+
+def _create_instrumented_engine(url: str, name: str, **kwargs):
+    parsed = make_url(url)
+    default_pool = parsed.get_dialect().get_pool_class(parsed)
+    if issubclass(default_pool, QueuePool):
+        kwargs.setdefault("poolclass", TimedQueuePool)
+        kwargs.setdefault("pool_size", settings.DB_POOL_SIZE)
+        kwargs.setdefault("max_overflow", settings.DB_MAX_OVERFLOW)
+        kwargs.setdefault("pool_timeout", settings.DB_POOL_TIMEOUT)
+    kwargs.setdefault("pool_recycle", settings.DB_POOL_RECYCLE)
+    kwargs.setdefault("pool_pre_ping", settings.DB_POOL_PRE_PING)
+    db_engine = create_engine(url, **kwargs)
+    db_engine.pool.metrics_name = name
+    metrics.register_engine(name, db_engine)
+
+    @event.listens_for(db_engine, "connect")
+    def _on_connect(dbapi_connection, connection_record):
+        metrics.db_pool_connections_created_total.inc(1, name)
+
+    @event.listens_for(db_engine, "invalidate")
+    def _on_invalidate(dbapi_connection, connection_record, exception):
+        metrics.db_pool_invalidations_total.inc(1, name)
+
+    if parsed.get_backend_name() == "sqlite" and settings.SQLITE_PROFILE == "production":
+        configure_sqlite(db_engine, sqlite_pragmas(), settings.SQLITE_BEGIN_IMMEDIATE)
+
+    return db_engine
+
+
+engine = _create_instrumented_engine(settings.DATABASE_URL, "primary")
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# Sessions that write: requests other than GET, jobs and scripts
+WriteSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine.execution_options(**WRITE_OPTIONS))
 
 Base = declarative_base()
 
 
-def get_db():
-    db = SessionLocal()
+@event.listens_for(Session, "do_orm_execute")
+def _strict_loading(orm_execute_state):
+    """In strict sessions, relationships not loaded explicitly raise instead of lazy loading"""
+    if (
+        orm_execute_state.session.info.get("strict_loading")
+        and orm_execute_state.is_select
+        and not orm_execute_state.is_relationship_load
+        and not orm_execute_state.is_column_load
+    ):
+        # Explicit selectinload/joinedload options take precedence over the wildcard
+        orm_execute_state.statement = orm_execute_state.statement.options(raiseload("*", sql_only=True))
+
+
+def get_db(request: Request):
+    db = (SessionLocal if request.method in ("GET", "HEAD", "OPTIONS") else WriteSessionLocal)()
+    db.info["strict_loading"] = settings.ORM_STRICT_LOADING
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+
+class ReadReplica:
+    """Routes reads to a replica, falling back to the primary.
+
+    The primary is used while the replica is unreachable and, per user, for
+    a short window after that user's own writes so they see them
+    immediately. Write times are kept per process.
+    """
+
+    def __init__(self, session_factory: Optional[sessionmaker], retry_seconds: int, read_your_writes_seconds: int):
+        self.session_factory = session_factory
+        self.retry_seconds = retry_seconds
+        self.read_your_writes_seconds = read_your_writes_seconds
+        self.down_until = 0.0
+        self._writes: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def record_write(self, user_id: str) -> None:
+        now = time.monotonic()
+        with self._lock:
+            self._writes[user_id] = now
+            if len(self._writes) > 10000:
+                cutoff = now - self.read_your_writes_seconds
+                self._writes = {k: t for k, t in self._writes.items() if t > cutoff}
+
+    def recently_wrote(self, user_id: str) -> bool:
+        written = self._writes.get(user_id)
+        return written is not None and time.monotonic() - written < self.read_your_writes_seconds
+
+    def session(self, user_id: Optional[str] = None) -> Optional[Session]:
+        """A replica session, or None when the primary should serve the read"""
+        if self.session_factory is None or time.monotonic() < self.down_until:
+            return None
+        if user_id and self.recently_wrote(user_id):
+            return None
+        db = self.session_factory()
+        db.info["strict_loading"] = settings.ORM_STRICT_LOADING
+        try:
+            # Connect now so an unreachable replica falls back before the query runs
+            db.connection()
+        except DBAPIError as e:
+            db.close()
+            self.down_until = time.monotonic() + self.retry_seconds
+            logger.error(f"Read replica unavailable, using primary for {self.retry_seconds}s: {str(e)}")
+            return None
+        return db
+
+
+read_engine = (
+    _create_instrumented_engine(settings.READ_DATABASE_URL, "replica")
+    if settings.READ_DATABASE_URL else None
+)
+read_replica = ReadReplica(
+    sessionmaker(autocommit=False, autoflush=False, bind=read_engine) if read_engine else None,
+    retry_seconds=settings.READ_REPLICA_RETRY_SECONDS,
+    read_your_writes_seconds=settings.READ_YOUR_WRITES_SECONDS
+)
+
+
+@event.listens_for(Session, "after_flush")
+def _mark_write(session, flush_context):
+    session.info["wrote"] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _record_user_write(session):
+    # user_id is set on the request session by app.core.deps.get_current_user
+    if session.info.pop("wrote", False) and session.info.get("user_id"):
+        read_replica.record_write(session.info["user_id"])
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _discard_write(session, previous_transaction):
+    session.info.pop("wrote", None)
@@ -1,14 +1,50 @@
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+from fastapi import Depends, FastAPI, Header, HTTPException, Response, status
 from fastapi.middleware.cors import CORSMiddleware
 from app.core.config import settings
+from app.core.jobs import recover_periodically
+from app.core.deps import statement_timeout
+from app.core.instrumentation import QueryStatsMiddleware
+from app.core.metrics import MetricsMiddleware, registry
+from app.core.profiling import ProfilingMiddleware
 from app.api.auth import auth
-from app.api.admin import employees, projects, tasks, analytics
-from app.api.user import profile, projects as user_projects, tasks as user_tasks, time_tracking, screenshots
+from app.api.admin import employees, projects, tasks, analytics, diagnostics, jobs, events, live
+from app.api.user import profile, projects as user_projects, tasks as user_tasks, time_tracking, screenshots, sync
+from app.db.database import WriteSessionLocal
+from app.services.email_queue import email_queue
+from app.services.live_events import live_hub
+from app import tasks as background_tasks  # noqa: F401 (registers them with app.core.jobs)
+from typing import Optional
+import asyncio
+import hmac
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if settings.EMAIL_QUEUE_WORKER:
+        email_queue.start()
+    if settings.LIVE_EVENTS:
+        live_hub.start()
+    # Jobs queued in memory by a previous run of this process would otherwise never run
+    recovery = None
+    if settings.JOB_BACKEND == "thread":
+        recovery = asyncio.create_task(recover_periodically(WriteSessionLocal))
+    yield
+    if recovery:
+        recovery.cancel()
+    if settings.LIVE_EVENTS:
+        await live_hub.stop()
+    if settings.EMAIL_QUEUE_WORKER:
+        await email_queue.stop()
+
 
 app = FastAPI(
     title=settings.APP_NAME,
     description="Employee Time Tracking API compatible with Insightful",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan,
+    # Routers below override it for their route class
+    dependencies=[Depends(statement_timeout("default"))]
 )
 
 # Set up CORS
@@ -18,8 +54,16 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["Server-Timing", "X-DB-Query-Count"],
 )
 
+# Sampled cProfile of individual requests
+app.add_middleware(ProfilingMiddleware)
+# Route metrics run inside the query tracking so they can read its counts
+app.add_middleware(MetricsMiddleware)
+# Per-request SQL query count and DB time
+app.add_middleware(QueryStatsMiddleware)
+
 # Authentication routes
 app.include_router(auth.router, prefix="/api/v1/auth", tags=["Authentication"])
 
@@ -27,14 +71,34 @@ app.include_router(auth.router, prefix="/api/v1/auth", tags=["Authentication"])
 app.include_router(employees.router, prefix="/api/v1/employee", tags=["Admin - Employees"])
 app.include_router(projects.router, prefix="/api/v1/project", tags=["Admin - Projects"])
 app.include_router(tasks.router, prefix="/api/v1/task", tags=["Admin - Tasks"])
-app.include_router(analytics.router, prefix="/api/v1/analytics", tags=["Admin - Analytics"])
+app.include_router(
+    analytics.router,
+    prefix="/api/v1/analytics",
+    tags=["Admin - Analytics"],
+    dependencies=[Depends(statement_timeout("analytics"))]
+)
+app.include_router(diagnostics.router, prefix="/api/v1/diagnostics", tags=["Admin - Diagnostics"])
+app.include_router(jobs.router, prefix="/api/v1/jobs", tags=["Admin - Jobs"])
+app.include_router(events.router, prefix="/api/v1/events", tags=["Admin - Events"])
+app.include_router(live.router, prefix="/api/v1/live", tags=["Admin - Live"])
 
-# User routes
-app.include_router(profile.router, prefix="/api/v1/user", tags=["User - Profile"])
-app.include_router(user_projects.router, prefix="/api/v1/user/projects", tags=["User - Projects"])
-app.include_router(user_tasks.router, prefix="/api/v1/user/tasks", tags=["User - Tasks"])
-app.include_router(time_tracking.router, prefix="/api/v1/user/time-tracking", tags=["User - Time Tracking"])
-app.include_router(screenshots.router, prefix="/api/v1/user/screenshots", tags=["User - Screenshots"])
+# User routes (desktop agents), with short statement timeouts
+agent_timeout = [Depends(statement_timeout("agent"))]
+app.include_router(profile.router, prefix="/api/v1/user", tags=["User - Profile"], dependencies=agent_timeout)
+app.include_router(
+    user_projects.router, prefix="/api/v1/user/projects", tags=["User - Projects"], dependencies=agent_timeout
+)
+app.include_router(user_tasks.router, prefix="/api/v1/user/tasks", tags=["User - Tasks"], dependencies=agent_timeout)
+app.include_router(sync.router, prefix="/api/v1/user/sync", tags=["User - Sync"], dependencies=agent_timeout)
+app.include_router(
+    time_tracking.router,
+    prefix="/api/v1/user/time-tracking",
+    tags=["User - Time Tracking"],
+    dependencies=agent_timeout
+)
+app.include_router(
+    screenshots.router, prefix="/api/v1/user/screenshots", tags=["User - Screenshots"], dependencies=agent_timeout
+)
 
 
 @app.get("/")
@@ -47,6 +111,21 @@ async def health_check():
     return {"status": "healthy"}
 
 
+@app.get("/metrics", include_in_schema=False)
+async def metrics(authorization: Optional[str] = Header(None)):
+    """Prometheus text exposition of request, DB pool and cache metrics, for the METRICS_TOKEN bearer"""
+    if not settings.METRICS_TOKEN:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+    expected = f"Bearer {settings.METRICS_TOKEN}".encode()
+    if not authorization or not hmac.compare_digest(authorization.encode(), expected):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid metrics token",
+            headers={"WWW-Authenticate": "Bearer"}
+        )
+    return Response(registry.render(), media_type="text/plain; version=0.0.4")
+
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=12000)
\ No newline at end of file
@@ -5,5 +5,9 @@ from .shift import Shift
 from .screenshot import Screenshot
 from .organization import Organization
 from .team import Team
+from .retention_run import RetentionRun
+from .email_delivery import EmailDelivery
+from .job import Job
+from .outbox import OutboxEvent, OutboxSequence, OutboxCursor
 
-__all__ = ["Employee", "Project", "Task", "Shift", "Screenshot", "Organization", "Team"]
\ No newline at end of file
+__all__ = ["Employee", "Project", "Task", "Shift", "Screenshot", "Organization", "Team", "RetentionRun", "EmailDelivery", "Job", "OutboxEvent", "OutboxSequence", "OutboxCursor"]
\ No newline at end of file
@@ -0,0 +1,24 @@
+from sqlalchemy import Column, String, Integer, Index
+from app.db.database import Base
+import uuid
+from datetime import datetime
+
+
+class EmailDelivery(Base):
+    """One queued email; dead rows are the dead-letter store"""
+    __tablename__ = "email_deliveries"
+    __table_args__ = (
+        Index("ix_email_deliveries_status_next", "status", "nextAttemptAt"),
+    )
+
+    id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()).replace('-', ''))
+    kind = Column(String, nullable=False)  # verification, password_reset
+    recipient = Column(String, nullable=False)
+    name = Column(String, nullable=False)
+    status = Column(String, default="pending")  # pending, sending, sent, dead
+    attempts = Column(Integer, default=0)
+    # When a pending delivery is due, or when a claimed one's lease runs out
+    nextAttemptAt = Column(Integer, default=lambda: int(datetime.utcnow().timestamp() * 1000))
+    lastError = Column(String, nullable=True)
+    createdAt = Column(Integer, default=lambda: int(datetime.utcnow().timestamp() * 1000))
+    sentAt = Column(Integer, nullable=True)
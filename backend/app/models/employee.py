@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Integer, Boolean, ForeignKey, JSON, Table
+from sqlalchemy import Column, String, Integer, Boolean, ForeignKey, JSON, Table, Index
 from sqlalchemy.orm import relationship
 from app.db.database import Base
 import uuid
@@ -9,7 +9,9 @@ employee_projects = Table(
     'employee_projects',
     Base.metadata,
     Column('employeeId', String, ForeignKey('employees.id'), primary_key=True),
-    Column('projectId', String, ForeignKey('projects.id'), primary_key=True)
+    Column('projectId', String, ForeignKey('projects.id'), primary_key=True),
+    # The primary key covers lookups by employee; this one covers a project's members
+    Index('ix_employee_projects_projectId', 'projectId')
 )
 
 
@@ -0,0 +1,29 @@
+from sqlalchemy import Column, String, Integer, ForeignKey, JSON, Index
+from app.db.database import Base
+import uuid
+from datetime import datetime
+
+
+class Job(Base):
+    """One run of a registered background task, with its progress and outcome"""
+    __tablename__ = "jobs"
+    __table_args__ = (
+        Index("ix_jobs_org_queued", "organizationId", "queuedAt"),
+        Index("ix_jobs_status_scheduled", "status", "scheduledAt"),
+    )
+
+    id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()).replace('-', ''))
+    name = Column(String, nullable=False)  # Registered task name, e.g. "retention.purge"
+    params = Column(JSON(none_as_null=True), nullable=True)
+    organizationId = Column(String, ForeignKey("organizations.id"), nullable=True)  # None for system jobs
+    createdBy = Column(String, ForeignKey("employees.id"), nullable=True)
+    status = Column(String, default="queued")  # queued, running, completed, failed
+    progress = Column(JSON(none_as_null=True), nullable=True)
+    result = Column(JSON(none_as_null=True), nullable=True)
+    error = Column(String, nullable=True)
+    queuedAt = Column(Integer, default=lambda: int(datetime.utcnow().timestamp() * 1000))
+    scheduledAt = Column(Integer, nullable=True)  # Not run before this time (ms)
+    startedAt = Column(Integer, nullable=True)
+    heartbeatAt = Column(Integer, nullable=True)  # Refreshed by the worker while running
+    updatedAt = Column(Integer, nullable=True)
+    finishedAt = Column(Integer, nullable=True)
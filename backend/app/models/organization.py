@@ -13,6 +13,8 @@ class Organization(Base):
     domain = Column(String, unique=True, nullable=False)
     isActive = Column(Boolean, default=True)
     createdAt = Column(Integer, default=lambda: int(datetime.utcnow().timestamp() * 1000))
+    screenshotRetentionDays = Column(Integer, nullable=True)  # None keeps screenshots forever
+    shiftRetentionDays = Column(Integer, nullable=True)  # None keeps shifts forever
     
     # Relationships
     employees = relationship("Employee", back_populates="organization")
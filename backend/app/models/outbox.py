@@ -0,0 +1,38 @@
+from sqlalchemy import Column, String, Integer, ForeignKey, JSON, Index, UniqueConstraint
+from app.db.database import Base
+import uuid
+from datetime import datetime
+
+
+class OutboxEvent(Base):
+    """A change recorded in the same transaction as the change itself"""
+    __tablename__ = "outbox_events"
+    __table_args__ = (
+        UniqueConstraint("organizationId", "sequence", name="uq_outbox_events_org_sequence"),
+        Index("ix_outbox_events_created", "createdAt"),
+    )
+
+    id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()).replace('-', ''))
+    organizationId = Column(String, ForeignKey("organizations.id"), nullable=False)
+    sequence = Column(Integer, nullable=False)  # Per organization, gap-free, in commit order
+    type = Column(String, nullable=False)  # e.g. shift.started, project.members_changed
+    entityId = Column(String, nullable=True)
+    payload = Column(JSON(none_as_null=True), nullable=True)
+    createdAt = Column(Integer, default=lambda: int(datetime.utcnow().timestamp() * 1000))
+
+
+class OutboxSequence(Base):
+    """Last sequence number handed out per organization"""
+    __tablename__ = "outbox_sequences"
+
+    organizationId = Column(String, ForeignKey("organizations.id"), primary_key=True)
+    lastSequence = Column(Integer, nullable=False, default=0)
+
+
+class OutboxCursor(Base):
+    """How far a dispatcher consumer has read each organization's events"""
+    __tablename__ = "outbox_cursors"
+
+    consumer = Column(String, primary_key=True)
+    organizationId = Column(String, ForeignKey("organizations.id"), primary_key=True)
+    lastSequence = Column(Integer, nullable=False, default=0)
@@ -1,6 +1,7 @@
 from sqlalchemy import Column, String, Integer, Boolean, ForeignKey, JSON, Table
 from sqlalchemy.orm import relationship
 from app.db.database import Base
+from app.db.compact import json_with_default
 import uuid
 from datetime import datetime
 
@@ -18,15 +19,16 @@ class Project(Base):
 
     id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()).replace('-', ''))
     archived = Column(Boolean, default=False)
-    statuses = Column(JSON, default=lambda: ["To do", "On hold", "In progress", "Done"])
-    priorities = Column(JSON, default=lambda: ["low", "medium", "high"])
+    # JSON settings are stored as NULL while they equal the defaults below
+    _statuses = Column("statuses", JSON(none_as_null=True), nullable=True)
+    _priorities = Column("priorities", JSON(none_as_null=True), nullable=True)
     billable = Column(Boolean, default=True)
-    payroll = Column(JSON, default=lambda: {"billRate": 0, "overtimeBillRate": 0})
+    _payroll = Column("payroll", JSON(none_as_null=True), nullable=True)
     name = Column(String, nullable=False)
     description = Column(String, nullable=True)
     creatorId = Column(String, ForeignKey("employees.id"), nullable=False)
     organizationId = Column(String, ForeignKey("organizations.id"), nullable=False)
-    screenshotSettings = Column(JSON, default=lambda: {"screenshotEnabled": True})
+    _screenshotSettings = Column("screenshotSettings", JSON(none_as_null=True), nullable=True)
     createdAt = Column(Integer, default=lambda: int(datetime.utcnow().timestamp() * 1000))
     
     # Relationships
@@ -36,4 +38,9 @@ class Project(Base):
     teams = relationship("Team", secondary=project_teams, back_populates="projects")
     tasks = relationship("Task", back_populates="project")
     shifts = relationship("Shift", back_populates="project")
-    screenshots = relationship("Screenshot", back_populates="project")
\ No newline at end of file
+    screenshots = relationship("Screenshot", back_populates="project")
+
+    statuses = json_with_default("_statuses", lambda: ["To do", "On hold", "In progress", "Done"])
+    priorities = json_with_default("_priorities", lambda: ["low", "medium", "high"])
+    payroll = json_with_default("_payroll", lambda: {"billRate": 0, "overtimeBillRate": 0})
+    screenshotSettings = json_with_default("_screenshotSettings", lambda: {"screenshotEnabled": True})
\ No newline at end of file
@@ -0,0 +1,23 @@
+from sqlalchemy import Column, String, Integer, ForeignKey, Index
+from app.db.database import Base
+import uuid
+from datetime import datetime
+
+
+class RetentionRun(Base):
+    """Progress of one screenshot retention purge, so interrupted runs resume"""
+    __tablename__ = "retention_runs"
+    __table_args__ = (
+        Index("ix_retention_runs_org_status", "organizationId", "status"),
+    )
+
+    id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()).replace('-', ''))
+    organizationId = Column(String, ForeignKey("organizations.id"), nullable=False)
+    cutoff = Column(Integer, nullable=False)  # Screenshots before this time (ms) are purged
+    status = Column(String, default="running")  # running, completed, failed
+    deletedScreenshots = Column(Integer, default=0)
+    deletedFiles = Column(Integer, default=0)
+    error = Column(String, nullable=True)
+    startedAt = Column(Integer, default=lambda: int(datetime.utcnow().timestamp() * 1000))
+    updatedAt = Column(Integer, default=lambda: int(datetime.utcnow().timestamp() * 1000))
+    finishedAt = Column(Integer, nullable=True)
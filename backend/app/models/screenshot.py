@@ -1,14 +1,18 @@
-from sqlalchemy import Column, String, Integer, Float, ForeignKey, JSON
+from sqlalchemy import Column, String, Integer, SmallInteger, Float, ForeignKey, JSON, Index
 from sqlalchemy.orm import relationship
 from app.db.database import Base
-import uuid
+from app.db.ids import HexUUID, uuid7_hex
+from app.db.compact import encode_permissions, decode_permissions, freeze
 from datetime import datetime
 
 
 class Screenshot(Base):
     __tablename__ = "screenshots"
+    __table_args__ = (
+        Index("ix_screenshots_org_timestamp", "organizationId", "timestamp"),
+    )
 
-    id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()).replace('-', ''))
+    id = Column(HexUUID, primary_key=True, default=uuid7_hex)  # Time-ordered for insert locality
     site = Column(String, nullable=True)
     productivity = Column(Float, default=0.0)
     employeeId = Column(String, ForeignKey("employees.id"), nullable=False)
@@ -19,15 +23,16 @@ class Screenshot(Base):
     organizationId = Column(String, ForeignKey("organizations.id"), nullable=False)
     projectId = Column(String, ForeignKey("projects.id"), nullable=True)
     taskId = Column(String, ForeignKey("tasks.id"), nullable=True)
-    shiftId = Column(String, ForeignKey("shifts.id"), nullable=True)
+    # Not enforced on PostgreSQL, where shifts is partitioned (see migration ec57ea6da626)
+    shiftId = Column(HexUUID, ForeignKey("shifts.id"), nullable=True)
     srcEmployeeId = Column(String, nullable=True)
     srcTeamId = Column(String, nullable=True)
     timestamp = Column(Integer, nullable=False)
     timestampTranslated = Column(String, nullable=True)
-    systemPermissions = Column(JSON, default=lambda: {
-        "accessibility": "undetermined",
-        "screenAndSystemAudioRecording": "undetermined"
-    })
+    # Known permission values are packed into permissionsCode (NULL when all
+    # undetermined); the JSON column is only filled for anything else
+    permissionsCode = Column(SmallInteger, nullable=True)
+    _systemPermissions = Column("systemPermissions", JSON(none_as_null=True), nullable=True)
     next = Column(String, nullable=True)  # Hash value for pagination
     imageUrl = Column(String, nullable=True)  # URL to screenshot image
     
@@ -37,4 +42,13 @@ class Screenshot(Base):
     team = relationship("Team")
     project = relationship("Project", back_populates="screenshots")
     task = relationship("Task", back_populates="screenshots")
-    shift = relationship("Shift", back_populates="screenshots")
\ No newline at end of file
+    shift = relationship("Shift", back_populates="screenshots")
+
+    @property
+    def systemPermissions(self):
+        # Read-only, like the Project JSON settings: assign a new dict to change it
+        return freeze(decode_permissions(self.permissionsCode, self._systemPermissions))
+
+    @systemPermissions.setter
+    def systemPermissions(self, value):
+        self.permissionsCode, self._systemPermissions = encode_permissions(value)
@@ -1,14 +1,19 @@
-from sqlalchemy import Column, String, Integer, Boolean, ForeignKey, Float
+from sqlalchemy import Column, String, Integer, Boolean, ForeignKey, Float, Index
 from sqlalchemy.orm import relationship
 from app.db.database import Base
-import uuid
+from app.db.ids import HexUUID, uuid7_hex
 from datetime import datetime
 
 
 class Shift(Base):
     __tablename__ = "shifts"
+    __table_args__ = (
+        # Interval-overlap lookups: start < window_end AND end > window_start
+        Index("ix_shifts_org_start_end", "organizationId", "start", "end"),
+        Index("ix_shifts_org_end", "organizationId", "end"),
+    )
 
-    id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()).replace('-', ''))
+    id = Column(HexUUID, primary_key=True, default=uuid7_hex)  # Time-ordered for insert locality
     token = Column(String, nullable=True)
     type = Column(String, default="manual")  # manual, automated, scheduled, leave
     start = Column(Integer, nullable=False)  # Time in milliseconds when shift started
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Integer, Boolean, ForeignKey, JSON, Table
+from sqlalchemy import Column, String, Integer, Boolean, ForeignKey, JSON, Table, Index
 from sqlalchemy.orm import relationship
 from app.db.database import Base
 import uuid
@@ -9,7 +9,9 @@ task_employees = Table(
     'task_employees',
     Base.metadata,
     Column('taskId', String, ForeignKey('tasks.id'), primary_key=True),
-    Column('employeeId', String, ForeignKey('employees.id'), primary_key=True)
+    Column('employeeId', String, ForeignKey('employees.id'), primary_key=True),
+    # The primary key covers a task's members; this one covers lookups by employee
+    Index('ix_task_employees_employeeId', 'employeeId')
 )
 
 task_teams = Table(
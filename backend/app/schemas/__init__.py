@@ -5,4 +5,7 @@ from .shift import *
 from .screenshot import *
 from .auth import *
 from .organization import *
-from .team import *
\ No newline at end of file
+from .team import *
+from .analytics import *
+from .job import *
+from .event import *
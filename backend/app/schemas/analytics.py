@@ -0,0 +1,63 @@
+from pydantic import BaseModel
+from typing import List, Optional
+
+
+class TimeSeriesBucket(BaseModel):
+    start: int  # Bucket start in milliseconds (UTC)
+    end: int  # Bucket end in milliseconds (UTC)
+    label: str  # Local ISO 8601 start time
+    totalTime: int  # in milliseconds
+
+
+class TimeSeries(BaseModel):
+    interval: str
+    timezone: str
+    totalTime: int  # in milliseconds
+    buckets: List[TimeSeriesBucket]
+
+
+class ConcurrencyPoint(BaseModel):
+    time: int  # in milliseconds
+    count: int
+
+
+class Concurrency(BaseModel):
+    step: int  # in milliseconds
+    peak: int
+    peakAt: int  # First time the peak is reached, in milliseconds
+    points: List[ConcurrencyPoint]
+
+
+class RosterEntry(BaseModel):
+    employeeId: str
+    shiftId: str
+    projectId: Optional[str] = None
+    taskId: Optional[str] = None
+    start: int
+
+
+class Roster(BaseModel):
+    at: int
+    count: int
+    employees: List[RosterEntry]
+
+
+class ProductivityGroup(BaseModel):
+    id: str  # Employee, team or project ID
+    averageProductivity: float
+    screenshotCount: int
+
+
+class SiteUsage(BaseModel):
+    site: str
+    screenshotCount: int
+    averageProductivity: float
+
+
+class ProductivityAnalytics(BaseModel):
+    averageProductivity: float
+    screenshotCount: int
+    byEmployee: List[ProductivityGroup]
+    byTeam: List[ProductivityGroup]
+    byProject: List[ProductivityGroup]
+    topSites: List[SiteUsage]
@@ -0,0 +1,19 @@
+from pydantic import BaseModel, model_validator
+from typing import Any, List
+
+
+def ids_of(value: Any) -> List[Any]:
+    """Relationship collections are returned as lists of ids"""
+    return [getattr(item, "id", item) for item in value or []]
+
+
+class MemberChanges(BaseModel):
+    """Ids to link and unlink, leaving every other member untouched"""
+    add: List[str] = []
+    remove: List[str] = []
+
+    @model_validator(mode="after")
+    def _disjoint(self):
+        if set(self.add) & set(self.remove):
+            raise ValueError("The same id cannot be both added and removed")
+        return self
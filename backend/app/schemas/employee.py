@@ -1,5 +1,6 @@
-from pydantic import BaseModel, EmailStr
+from pydantic import BaseModel, EmailStr, field_validator
 from typing import Optional, List, Dict, Any
+from app.schemas.common import ids_of
 
 
 class SystemPermission(BaseModel):
@@ -59,6 +60,11 @@ class Employee(EmployeeBase):
     systemPermissions: List[SystemPermission] = []
     createdAt: int
 
+    @field_validator("projects", mode="before")
+    @classmethod
+    def _relationship_ids(cls, value):
+        return ids_of(value)
+
     class Config:
         from_attributes = True
 
@@ -70,4 +76,4 @@ class EmployeeStats(BaseModel):
     totalScreenshots: int
     activeShifts: int
     weeklyTimeLogged: int
-    monthlyTimeLogged: int
\ No newline at end of file
+    monthlyTimeLogged: int
@@ -0,0 +1,18 @@
+from pydantic import BaseModel
+from typing import Any, Dict, List, Optional
+
+
+class Event(BaseModel):
+    sequence: int
+    type: str
+    entityId: Optional[str] = None
+    payload: Optional[Dict[str, Any]] = None
+    createdAt: int
+
+    class Config:
+        from_attributes = True
+
+
+class EventPage(BaseModel):
+    events: List[Event]
+    lastSequence: int  # Pass as `since` to continue; the newest sequence when caught up
@@ -0,0 +1,28 @@
+from pydantic import BaseModel, Field
+from typing import Any, Dict, Optional
+
+
+class JobCreate(BaseModel):
+    params: Dict[str, Any] = {}
+    delaySeconds: float = Field(0, ge=0, le=7 * 24 * 3600)  # Run no earlier than this from now
+
+
+class Job(BaseModel):
+    id: str
+    name: str
+    params: Optional[Dict[str, Any]] = None
+    organizationId: Optional[str] = None
+    createdBy: Optional[str] = None
+    status: str
+    progress: Optional[Dict[str, Any]] = None  # Task specific, e.g. rows processed so far
+    result: Optional[Any] = None
+    error: Optional[str] = None
+    queuedAt: int
+    scheduledAt: Optional[int] = None
+    startedAt: Optional[int] = None
+    heartbeatAt: Optional[int] = None
+    updatedAt: Optional[int] = None
+    finishedAt: Optional[int] = None
+
+    class Config:
+        from_attributes = True
@@ -15,12 +15,16 @@ class OrganizationUpdate(BaseModel):
     name: Optional[str] = None
     domain: Optional[str] = None
     isActive: Optional[bool] = None
+    screenshotRetentionDays: Optional[int] = None
+    shiftRetentionDays: Optional[int] = None
 
 
 class Organization(OrganizationBase):
     id: str
     isActive: bool
     createdAt: int
+    screenshotRetentionDays: Optional[int] = None
+    shiftRetentionDays: Optional[int] = None
 
     class Config:
         from_attributes = True
\ No newline at end of file
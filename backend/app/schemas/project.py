@@ -1,5 +1,6 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, field_validator
 from typing import Optional, List, Dict, Any
+from app.schemas.common import ids_of
 
 
 class ProjectBase(BaseModel):
@@ -44,6 +45,11 @@ class Project(ProjectBase):
     screenshotSettings: Dict[str, Any]
     createdAt: int
 
+    @field_validator("employees", "teams", mode="before")
+    @classmethod
+    def _relationship_ids(cls, value):
+        return ids_of(value)
+
     class Config:
         from_attributes = True
 
@@ -1,5 +1,6 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, field_validator
 from typing import Optional, Dict, Any, List
+from app.db.ids import normalize_hex_id
 
 
 class ScreenshotBase(BaseModel):
@@ -15,6 +16,16 @@ class ScreenshotCreate(ScreenshotBase):
     systemPermissions: Optional[Dict[str, str]] = None
     imageUrl: Optional[str] = None
 
+    @field_validator("shiftId")
+    @classmethod
+    def _shift_id(cls, value):
+        if value is None:
+            return value
+        shift_id = normalize_hex_id(value)
+        if shift_id is None:
+            raise ValueError("shiftId must be a 32-character hex id")
+        return shift_id
+
 
 class ScreenshotUpdate(BaseModel):
     productivity: Optional[float] = None
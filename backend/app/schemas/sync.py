@@ -0,0 +1,13 @@
+from pydantic import BaseModel
+from typing import List
+from app.schemas.project import Project
+from app.schemas.task import Task
+
+
+class CatalogSync(BaseModel):
+    version: int  # Pass as `since` on the next sync
+    full: bool  # The whole catalog: replace local projects and tasks instead of merging
+    projects: List[Project]  # Created, updated or newly assigned
+    tasks: List[Task]
+    deletedProjects: List[str]  # Deleted or no longer assigned
+    deletedTasks: List[str]
@@ -1,5 +1,6 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, field_validator
 from typing import Optional, List
+from app.schemas.common import ids_of
 
 
 class TaskBase(BaseModel):
@@ -40,5 +41,10 @@ class Task(TaskBase):
     teams: List[str]
     createdAt: int
 
+    @field_validator("employees", "teams", mode="before")
+    @classmethod
+    def _relationship_ids(cls, value):
+        return ids_of(value)
+
     class Config:
         from_attributes = True
\ No newline at end of file
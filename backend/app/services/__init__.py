@@ -1,4 +1,5 @@
 from .email_service import EmailService, email_service
+from .email_queue import EmailQueue, email_queue
 from .employee_service import EmployeeService
 from .project_service import ProjectService
 from .task_service import TaskService
@@ -8,6 +9,8 @@ from .screenshot_service import ScreenshotService
 __all__ = [
     "EmailService",
     "email_service",
+    "EmailQueue",
+    "email_queue",
     "EmployeeService", 
     "ProjectService",
     "TaskService",
@@ -0,0 +1,72 @@
+from sqlalchemy import Table
+from sqlalchemy.orm import Session
+from typing import Iterable, List, Set, Tuple
+
+# Keeps IN lists well under SQLite's bound parameter limit
+CHUNK_SIZE = 500
+
+
+def _chunks(ids: Iterable[str]) -> Iterable[List[str]]:
+    ids = list(ids)
+    for start in range(0, len(ids), CHUNK_SIZE):
+        yield ids[start:start + CHUNK_SIZE]
+
+
+class Association:
+    """One side of a many-to-many table, edited with set differences.
+
+    Only rows that actually change are inserted or deleted, instead of
+    clearing an ORM collection and re-adding every member. Changes go
+    straight to the table, so callers reload the owner after committing.
+    """
+
+    def __init__(self, table: Table, owner: str, target: str, target_model):
+        self.table = table
+        self.owner = table.c[owner]
+        self.target = table.c[target]
+        self.target_model = target_model
+
+    def current(self, db: Session, owner_id: str) -> Set[str]:
+        rows = db.execute(self.table.select().with_only_columns(self.target).where(self.owner == owner_id))
+        return {target_id for target_id, in rows}
+
+    def _existing(self, db: Session, target_ids: Set[str]) -> Set[str]:
+        """Ids that exist; unknown ids are ignored, as the ORM collections always did"""
+        found = set()
+        for chunk in _chunks(target_ids):
+            found.update(target_id for target_id, in db.query(self.target_model.id).filter(
+                self.target_model.id.in_(chunk)
+            ))
+        return found
+
+    def _insert(self, db: Session, owner_id: str, target_ids: Set[str]) -> None:
+        if target_ids:
+            db.execute(self.table.insert(), [
+                {self.owner.key: owner_id, self.target.key: target_id} for target_id in target_ids
+            ])
+
+    def _delete(self, db: Session, owner_id: str, target_ids: Set[str]) -> None:
+        for chunk in _chunks(target_ids):
+            db.execute(self.table.delete().where(self.owner == owner_id, self.target.in_(chunk)))
+
+    def add(self, db: Session, owner_id: str, target_ids: Iterable[str]) -> Set[str]:
+        """Link the given ids; returns the ones that were not linked before"""
+        added = self._existing(db, set(target_ids) - self.current(db, owner_id))
+        self._insert(db, owner_id, added)
+        return added
+
+    def remove(self, db: Session, owner_id: str, target_ids: Iterable[str]) -> Set[str]:
+        """Unlink the given ids; returns the ones that were linked"""
+        removed = set(target_ids) & self.current(db, owner_id)
+        self._delete(db, owner_id, removed)
+        return removed
+
+    def replace(self, db: Session, owner_id: str, target_ids: Iterable[str]) -> Tuple[Set[str], Set[str]]:
+        """Make the links exactly the given ids; returns (added, removed)"""
+        wanted = set(target_ids)
+        current = self.current(db, owner_id)
+        added = self._existing(db, wanted - current)
+        removed = current - wanted
+        self._insert(db, owner_id, added)
+        self._delete(db, owner_id, removed)
+        return added, removed
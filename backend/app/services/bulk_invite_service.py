@@ -0,0 +1,228 @@
+from sqlalchemy import insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from pydantic import ValidationError
+from app.core.config import settings
+from app.core.jobs import JobContext
+from app.models.employee import Employee, employee_projects
+from app.models.project import Project
+from app.models.team import Team
+from app.schemas.employee import EmployeeInvite
+from app.services.email_queue import email_queue
+from app.services.outbox import record_event
+from datetime import datetime
+from typing import IO, Any, Dict, Iterator, List, Optional, Set, Tuple
+import csv
+import io
+import json
+import logging
+import os
+import tempfile
+import uuid
+
+logger = logging.getLogger(__name__)
+
+UPLOAD_FORMATS = {
+    ".csv": "csv", "text/csv": "csv",
+    ".json": "json", "application/json": "json",
+    ".jsonl": "ndjson", ".ndjson": "ndjson", "application/x-ndjson": "ndjson",
+}
+_TRUE = {"1", "true", "yes", "y"}
+
+
+def _now_ms() -> int:
+    return int(datetime.utcnow().timestamp() * 1000)
+
+
+def upload_format(filename: Optional[str], content_type: Optional[str]) -> str:
+    """csv, json (an array of objects) or ndjson (one object per line)"""
+    extension = "." + filename.rsplit(".", 1)[-1].lower() if filename and "." in filename else None
+    content_type = (content_type or "").split(";")[0].strip().lower()
+    fmt = UPLOAD_FORMATS.get(extension) or UPLOAD_FORMATS.get(content_type)
+    if not fmt:
+        raise ValueError("Upload a .csv, .json or .jsonl file")
+    return fmt
+
+
+async def spool_upload(upload, max_bytes: int) -> str:
+    """Copy an upload into JOB_FILES_DIR for the background job, which deletes it; returns the path"""
+    directory = settings.JOB_FILES_DIR or tempfile.gettempdir()
+    os.makedirs(directory, exist_ok=True)
+    size = 0
+    with tempfile.NamedTemporaryFile(dir=directory, prefix="bulk-invite-", delete=False) as spooled:
+        try:
+            while True:
+                block = await upload.read(64 * 1024)
+                if not block:
+                    break
+                size += len(block)
+                if size > max_bytes:
+                    raise ValueError(f"Upload is larger than {max_bytes} bytes")
+                spooled.write(block)
+        except Exception:
+            spooled.close()
+            os.remove(spooled.name)
+            raise
+    return spooled.name
+
+
+def _csv_row(row: Dict[str, Optional[str]]) -> Dict[str, Any]:
+    values = {key.strip(): (value or "").strip() for key, value in row.items() if key}
+    values = {key: value for key, value in values.items() if value}
+    if "projects" in values:
+        values["projects"] = [p.strip() for p in values["projects"].split(";") if p.strip()]
+    if "isAdmin" in values:
+        values["isAdmin"] = values["isAdmin"].lower() in _TRUE
+    return values
+
+
+def iter_rows(upload: IO[bytes], fmt: str) -> Iterator[Tuple[int, Any]]:
+    """(row number, raw row) pairs, read incrementally except for JSON arrays"""
+    text = io.TextIOWrapper(upload, encoding="utf-8-sig", newline="" if fmt == "csv" else None)
+    if fmt == "csv":
+        # Row 1 is the header
+        for number, row in enumerate(csv.DictReader(text), start=2):
+            yield number, _csv_row(row)
+    elif fmt == "ndjson":
+        for number, line in enumerate(text, start=1):
+            if line.strip():
+                yield number, json.loads(line)
+    else:
+        rows = json.load(text)
+        if not isinstance(rows, list):
+            raise ValueError("A JSON upload must be an array of employees")
+        yield from enumerate(rows, start=1)
+
+
+class BulkInviteService:
+    """Creates employees from an uploaded list, one chunk per transaction.
+
+    Each chunk costs one IN query for existing emails, one each for the
+    referenced teams and projects, and batched inserts of employees and
+    project assignments, with the chunk's invitations queued in the same
+    transaction. Progress is reported on the job after every chunk.
+    """
+
+    def __init__(self, db: Session, chunk_size: int = None, max_errors: int = None):
+        self.db = db
+        self.chunk_size = chunk_size or settings.BULK_INVITE_CHUNK_SIZE
+        self.max_errors = settings.BULK_INVITE_MAX_ERRORS if max_errors is None else max_errors
+
+    def run(self, ctx: JobContext, upload: IO[bytes], fmt: str) -> Dict[str, int]:
+        """Invite every row into the job's organization; returns the final counts"""
+        counts = {"processedRows": 0, "createdEmployees": 0, "skippedRows": 0, "emailsQueued": 0}
+        ctx.progress(**counts, errors=[])
+
+        seen: Set[str] = set()
+        chunk: List[Tuple[int, EmployeeInvite]] = []
+        errors: List[Dict[str, Any]] = []
+        for number, raw in iter_rows(upload, fmt):
+            try:
+                chunk.append((number, EmployeeInvite(**raw)))
+            except (TypeError, ValidationError) as e:
+                email = raw.get("email") if isinstance(raw, dict) else None
+                errors.append(self._row_error(number, email, e))
+            if len(chunk) + len(errors) >= self.chunk_size:
+                self._process_chunk(ctx, counts, chunk, errors, seen)
+                chunk, errors = [], []
+        if chunk or errors:
+            self._process_chunk(ctx, counts, chunk, errors, seen)
+        return counts
+
+    def _row_error(self, number: int, email: Optional[str], error: Any) -> Dict[str, Any]:
+        if isinstance(error, ValidationError):
+            message = "; ".join(f"{'.'.join(map(str, e['loc']))}: {e['msg']}" for e in error.errors())
+        else:
+            message = str(error)
+        return {"row": number, "email": email, "error": message}
+
+    def _process_chunk(
+        self,
+        ctx: JobContext,
+        counts: Dict[str, int],
+        chunk: List[Tuple[int, EmployeeInvite]],
+        errors: List[Dict[str, Any]],
+        seen: Set[str]
+    ) -> None:
+        try:
+            invited, chunk_errors, taken = self._insert_chunk(ctx.organization_id, chunk, seen)
+        except IntegrityError:
+            # An employee created concurrently took one of the emails; the retry sees it
+            self.db.rollback()
+            invited, chunk_errors, taken = self._insert_chunk(ctx.organization_id, chunk, seen)
+        seen |= taken
+
+        counts["processedRows"] += len(chunk) + len(errors)
+        errors = errors + chunk_errors
+        counts["createdEmployees"] += len(invited)
+        counts["emailsQueued"] += len(invited)
+        counts["skippedRows"] += len(errors)
+        kept = ctx.job.progress.get("errors", []) if ctx.job else []
+        # The progress commit also commits the chunk's employees and emails
+        ctx.progress(**counts, errors=kept + errors[:max(self.max_errors - len(kept), 0)])
+
+    def _insert_chunk(
+        self,
+        organization_id: str,
+        chunk: List[Tuple[int, EmployeeInvite]],
+        seen: Set[str]
+    ) -> Tuple[List[Tuple[str, str]], List[Dict[str, Any]], Set[str]]:
+        """Insert the chunk's new employees; returns (invited, row errors, newly used emails)"""
+        emails = [row.email for _, row in chunk]
+        existing = {email for email, in self.db.query(Employee.email).filter(Employee.email.in_(emails))}
+        team_ids = {row.teamId for _, row in chunk if row.teamId}
+        teams = {team_id for team_id, in self.db.query(Team.id).filter(
+            Team.id.in_(team_ids), Team.organizationId == organization_id
+        )} if team_ids else set()
+        project_ids = {p for _, row in chunk for p in row.projects or []}
+        projects = {project_id for project_id, in self.db.query(Project.id).filter(
+            Project.id.in_(project_ids), Project.organizationId == organization_id
+        )} if project_ids else set()
+
+        taken = set()
+        now = _now_ms()
+        employees, links, invited, errors = [], [], [], []
+        assigned: Dict[str, List[str]] = {}
+        for number, row in chunk:
+            if row.email in seen or row.email in taken:
+                errors.append({"row": number, "email": row.email, "error": "Duplicate email in upload"})
+                continue
+            if row.email in existing:
+                errors.append({"row": number, "email": row.email, "error": "Employee with this email already exists"})
+                continue
+            if row.teamId and row.teamId not in teams:
+                errors.append({"row": number, "email": row.email, "error": "Team not found"})
+                continue
+            taken.add(row.email)
+            employee_id = uuid.uuid4().hex
+            employees.append({
+                "id": employee_id,
+                "name": row.name,
+                "email": row.email,
+                "title": row.title,
+                "teamId": row.teamId,
+                "organizationId": organization_id,
+                "isAdmin": row.isAdmin,
+                "invited": now,
+                "createdAt": now,
+            })
+            # Unknown projects are ignored, as when inviting one employee
+            assigned[employee_id] = [p for p in dict.fromkeys(row.projects or []) if p in projects]
+            links.extend({"employeeId": employee_id, "projectId": p} for p in assigned[employee_id])
+            invited.append((row.email, row.name))
+
+        if employees:
+            self.db.execute(insert(Employee), employees)
+        if links:
+            self.db.execute(employee_projects.insert(), links)
+        for employee in employees:
+            record_event(self.db, organization_id, "employee.created", employee["id"], {
+                "name": employee["name"],
+                "email": employee["email"],
+                "teamId": employee["teamId"],
+                "isAdmin": employee["isAdmin"],
+                "projects": assigned[employee["id"]],
+            })
+        email_queue.enqueue_many(self.db, "verification", invited)
+        return invited, errors, taken
+
@@ -0,0 +1,97 @@
+from sqlalchemy.orm import Session
+from app.models.outbox import OutboxEvent
+from app.services.outbox import iter_events, last_sequence
+from app.services.project_service import ProjectService
+from app.services.task_service import TaskService
+from typing import Any, Dict, List, Optional, Set
+
+# Outbox events that can change an employee's project and task catalog
+CATALOG_EVENT_TYPES = [
+    "project.created", "project.updated", "project.members_changed", "project.deleted",
+    "task.created", "task.updated", "task.members_changed", "task.deleted",
+    "employee.projects_changed",
+]
+
+
+class CatalogSyncService:
+    """Changes to an employee's assigned projects and tasks since a version.
+
+    The version is the organization's outbox sequence. Events after it name
+    the projects and tasks that may have changed, which are then read in
+    their current state; the ones that name the employee as removed, and
+    are no longer assigned, are reported as deleted. An up-to-date agent
+    costs one query. A version that is 0, unknown or older than the
+    retained events gets the full catalog instead.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def _retained(self, organization_id: str, since: int) -> bool:
+        """Whether every event after `since` is still in the outbox"""
+        return self.db.query(OutboxEvent.id).filter(
+            OutboxEvent.organizationId == organization_id,
+            OutboxEvent.sequence == since + 1
+        ).first() is not None
+
+    def changes(self, employee_id: str, organization_id: str, since: int = 0) -> Dict[str, Any]:
+        # Read first: data read afterwards is at least this new, so nothing is missed
+        version = last_sequence(self.db, organization_id)
+        if since == 0 or since > version or (since < version and not self._retained(organization_id, since)):
+            return self._result(
+                version,
+                True,
+                ProjectService(self.db).get_user_projects(employee_id, limit=None),
+                TaskService(self.db).get_user_tasks(employee_id, limit=None)
+            )
+        if since == version:
+            return self._result(version, False)
+
+        touched = {"project": set(), "task": set()}
+        removed = {"project": set(), "task": set()}
+        for batch in iter_events(self.db, organization_id, since, types=CATALOG_EVENT_TYPES, until=version):
+            for event in batch:
+                kind, action = event.type.split(".")
+                payload = event.payload or {}
+                if kind == "employee":
+                    if event.entityId == employee_id:
+                        touched["project"].update(payload.get("added", []))
+                        removed["project"].update(payload.get("removed", []))
+                    continue
+                touched[kind].add(event.entityId)
+                if employee_id in payload.get("removed", []) or (
+                    action == "deleted" and employee_id in payload.get("employees", [])
+                ):
+                    removed[kind].add(event.entityId)
+
+        projects = tasks = []
+        if touched["project"]:
+            projects = ProjectService(self.db).get_user_projects(employee_id, limit=None, ids=touched["project"])
+        if touched["task"]:
+            tasks = TaskService(self.db).get_user_tasks(employee_id, limit=None, ids=touched["task"])
+        return self._result(
+            version,
+            False,
+            projects,
+            tasks,
+            removed["project"] - {project.id for project in projects},
+            removed["task"] - {task.id for task in tasks}
+        )
+
+    @staticmethod
+    def _result(
+        version: int,
+        full: bool,
+        projects: Optional[List] = None,
+        tasks: Optional[List] = None,
+        deleted_projects: Set[str] = frozenset(),
+        deleted_tasks: Set[str] = frozenset()
+    ) -> Dict[str, Any]:
+        return {
+            "version": version,
+            "full": full,
+            "projects": projects or [],
+            "tasks": tasks or [],
+            "deletedProjects": sorted(deleted_projects),
+            "deletedTasks": sorted(deleted_tasks),
+        }
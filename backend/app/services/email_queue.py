@@ -0,0 +1,201 @@
+from concurrent.futures import ThreadPoolExecutor
+from sqlalchemy import event, insert
+from sqlalchemy.orm import Session, sessionmaker
+from app.core.config import settings
+from app.core.metrics import Counter, registry
+from app.db.database import WriteSessionLocal
+from app.models.email_delivery import EmailDelivery
+from app.services.email_service import EmailService, PermanentEmailError, email_service
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+import asyncio
+import logging
+import random
+
+logger = logging.getLogger(__name__)
+
+emails_total = registry.register(Counter(
+    "emails_total", "Queued email delivery attempts by outcome", ("kind", "outcome")
+))
+
+
+def _now_ms() -> int:
+    return int(datetime.utcnow().timestamp() * 1000)
+
+
+class EmailQueue:
+    """Emails stored in email_deliveries and sent by a background worker.
+
+    Deliveries are inserted in the caller's transaction, so an email goes
+    out only if the change that caused it commits. Workers claim due rows
+    with a conditional UPDATE, which makes any number of processes safe,
+    and send up to `concurrency` at a time. Failures are retried with
+    exponential backoff; after `max_attempts`, or on a permanent error, the
+    row is marked dead and kept for inspection and requeueing.
+    """
+
+    def __init__(
+        self,
+        session_factory: sessionmaker,
+        service: EmailService,
+        concurrency: int = None,
+        batch_size: int = None,
+        max_attempts: int = None
+    ):
+        self.session_factory = session_factory
+        self.service = service
+        self.concurrency = concurrency or settings.EMAIL_CONCURRENCY
+        self.batch_size = batch_size or settings.EMAIL_BATCH_SIZE
+        self.max_attempts = max_attempts or settings.EMAIL_MAX_ATTEMPTS
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def enqueue(self, db: Session, kind: str, email: str, name: str) -> None:
+        """Queue one email in the caller's transaction"""
+        self.enqueue_many(db, kind, [(email, name)])
+
+    def enqueue_many(self, db: Session, kind: str, recipients: Iterable[Tuple[str, str]]) -> int:
+        rows = [{"kind": kind, "recipient": email, "name": name} for email, name in recipients]
+        if rows:
+            db.execute(insert(EmailDelivery), rows)
+            if not event.contains(db, "after_commit", self._wake_after_commit):
+                event.listen(db, "after_commit", self._wake_after_commit)
+        return len(rows)
+
+    def backoff_ms(self, attempts: int) -> int:
+        """Delay before the next attempt: doubles each time, capped, with jitter"""
+        delay = min(settings.EMAIL_RETRY_BASE_SECONDS * 2 ** (attempts - 1), settings.EMAIL_RETRY_MAX_SECONDS)
+        return int(delay * random.uniform(0.5, 1.0) * 1000)
+
+    def _claim(self, db: Session, now: int) -> List[Tuple[str, str, str, str]]:
+        """(id, kind, recipient, name) of due deliveries, plus claimed ones whose worker stopped"""
+        due = db.query(EmailDelivery).filter(
+            EmailDelivery.status.in_(("pending", "sending")),
+            EmailDelivery.nextAttemptAt <= now
+        ).order_by(EmailDelivery.nextAttemptAt).limit(self.batch_size).all()
+        lease = now + int(settings.EMAIL_SEND_TIMEOUT_SECONDS * 2 * 1000)
+        claimed = []
+        for delivery in due:
+            # Another worker that read the same row changed nextAttemptAt first
+            won = db.query(EmailDelivery).filter(
+                EmailDelivery.id == delivery.id,
+                EmailDelivery.nextAttemptAt == delivery.nextAttemptAt
+            ).update({
+                EmailDelivery.status: "sending",
+                EmailDelivery.nextAttemptAt: lease,
+                EmailDelivery.attempts: EmailDelivery.attempts + 1
+            }, synchronize_session=False)
+            if won:
+                claimed.append((delivery.id, delivery.kind, delivery.recipient, delivery.name))
+        db.commit()
+        return claimed
+
+    def _send(self, claimed: Tuple[str, str, str, str]) -> Optional[Exception]:
+        _, kind, recipient, name = claimed
+        try:
+            self.service.transport.send(self.service.render(kind, recipient, name))
+        except Exception as e:
+            return e
+        return None
+
+    def run_once(self) -> Dict[str, int]:
+        """Claim one batch of due deliveries and send it; returns counts by outcome"""
+        counts = {"sent": 0, "retrying": 0, "dead": 0}
+        db = self.session_factory()
+        try:
+            claimed = self._claim(db, _now_ms())
+            if not claimed:
+                return counts
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(self.concurrency, thread_name_prefix="email")
+            # Threads only send; the session stays on this thread
+            errors = dict(zip((c[0] for c in claimed), self._executor.map(self._send, claimed)))
+
+            now = _now_ms()
+            for delivery in db.query(EmailDelivery).filter(EmailDelivery.id.in_(errors)):
+                error = errors[delivery.id]
+                if error is None:
+                    delivery.status = "sent"
+                    delivery.sentAt = now
+                    delivery.lastError = None
+                    outcome = "sent"
+                elif isinstance(error, PermanentEmailError) or delivery.attempts >= self.max_attempts:
+                    delivery.status = "dead"
+                    delivery.lastError = str(error)[:500]
+                    outcome = "dead"
+                    logger.error(f"Giving up on {delivery.kind} email to {delivery.recipient}: {str(error)}")
+                else:
+                    delivery.status = "pending"
+                    delivery.nextAttemptAt = now + self.backoff_ms(delivery.attempts)
+                    delivery.lastError = str(error)[:500]
+                    outcome = "retrying"
+                    logger.warning(f"Retrying {delivery.kind} email to {delivery.recipient}: {str(error)}")
+                counts[outcome] += 1
+                emails_total.inc(1, delivery.kind, outcome)
+            db.commit()
+            return counts
+        finally:
+            db.close()
+
+    def requeue_dead(self, db: Session, delivery_ids: Iterable[str] = None) -> int:
+        """Give dead deliveries a fresh set of attempts"""
+        query = db.query(EmailDelivery).filter(EmailDelivery.status == "dead")
+        if delivery_ids is not None:
+            query = query.filter(EmailDelivery.id.in_(list(delivery_ids)))
+        count = query.update({
+            EmailDelivery.status: "pending",
+            EmailDelivery.attempts: 0,
+            EmailDelivery.nextAttemptAt: _now_ms()
+        }, synchronize_session=False)
+        db.commit()
+        return count
+
+    def _wake_after_commit(self, session) -> None:
+        self.wake()
+
+    def wake(self) -> None:
+        """Start the next poll now instead of after EMAIL_POLL_SECONDS"""
+        if self._loop is not None and self._wakeup is not None:
+            self._loop.call_soon_threadsafe(self._wakeup.set)
+        elif settings.JOB_BACKEND == "celery":
+            # No worker in this process; a Celery worker delivers instead
+            from app.worker import run_untracked_task
+            run_untracked_task.delay("email.deliver")
+
+    async def _work(self) -> None:
+        while True:
+            self._wakeup.clear()
+            try:
+                counts = await asyncio.to_thread(self.run_once)
+            except Exception as e:
+                logger.error(f"Email queue poll failed: {str(e)}")
+                counts = {}
+            if sum(counts.values()) >= self.batch_size:
+                continue
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), settings.EMAIL_POLL_SECONDS)
+            except asyncio.TimeoutError:
+                pass
+
+    def start(self) -> None:
+        """Run the worker on the current event loop (application startup)"""
+        self._loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+        self._task = self._loop.create_task(self._work())
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._task = self._loop = self._wakeup = None
+        if self._executor:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+
+email_queue = EmailQueue(WriteSessionLocal, email_service)
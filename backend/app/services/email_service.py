@@ -1,34 +1,100 @@
 import sendgrid
+from python_http_client.exceptions import HTTPError
 from sendgrid.helpers.mail import Mail
 from app.core.config import settings
 from app.core.security import create_email_verification_token
+from typing import List
 import logging
 
 logger = logging.getLogger(__name__)
 
 
-class EmailService:
+class EmailMessage:
+    def __init__(self, to: str, subject: str, html: str):
+        self.to = to
+        self.subject = subject
+        self.html = html
+
+
+class PermanentEmailError(Exception):
+    """Delivery failed in a way retrying cannot fix (e.g. the provider rejected the address)"""
+
+
+class SendGridTransport:
+    def __init__(self, api_key: str, timeout: float):
+        self.sg = sendgrid.SendGridAPIClient(api_key=api_key)
+        self.sg.client.timeout = timeout
+
+    def send(self, message: EmailMessage) -> None:
+        mail = Mail(
+            from_email=settings.FROM_EMAIL,
+            to_emails=message.to,
+            subject=message.subject,
+            html_content=message.html
+        )
+        try:
+            response = self.sg.send(mail)
+        except HTTPError as e:
+            # 4xx other than rate limiting will fail the same way next time
+            if 400 <= e.status_code < 500 and e.status_code != 429:
+                raise PermanentEmailError(f"SendGrid rejected the message: {e.status_code}") from e
+            raise
+        if response.status_code != 202:
+            raise RuntimeError(f"SendGrid returned {response.status_code}")
+        logger.info(f"Email '{message.subject}' sent to {message.to}")
+
+
+class LogTransport:
+    """Used when SendGrid is not configured"""
+
+    def send(self, message: EmailMessage) -> None:
+        logger.info(f"Would send '{message.subject}' to {message.to} (SendGrid not configured)")
+
+
+class FakeTransport:
+    """Keeps messages in memory; `fail_next` makes the next sends raise"""
+
     def __init__(self):
-        if settings.SENDGRID_API_KEY:
-            self.sg = sendgrid.SendGridAPIClient(api_key=settings.SENDGRID_API_KEY)
-        else:
-            self.sg = None
-            logger.warning("SendGrid API key not configured. Email sending disabled.")
+        self.sent: List[EmailMessage] = []
+        self._failures: List[Exception] = []
 
-    def send_email_verification(self, email: str, name: str) -> bool:
-        """Send email verification link to new employee"""
-        if not self.sg:
-            logger.info(f"Would send email verification to {email} (SendGrid not configured)")
-            return True
-            
+    def fail_next(self, count: int = 1, permanent: bool = False) -> None:
+        error = PermanentEmailError("Fake permanent failure") if permanent else RuntimeError("Fake failure")
+        self._failures.extend([error] * count)
+
+    def send(self, message: EmailMessage) -> None:
+        if self._failures:
+            raise self._failures.pop(0)
+        self.sent.append(message)
+
+    def clear(self) -> None:
+        self.sent.clear()
+        self._failures.clear()
+
+
+def make_transport():
+    """EMAIL_TRANSPORT: sendgrid (the default), log or fake"""
+    if settings.EMAIL_TRANSPORT == "fake":
+        return FakeTransport()
+    if settings.EMAIL_TRANSPORT == "log":
+        return LogTransport()
+    if not settings.SENDGRID_API_KEY:
+        logger.warning("SendGrid API key not configured. Email sending disabled.")
+        return LogTransport()
+    return SendGridTransport(settings.SENDGRID_API_KEY, settings.EMAIL_SEND_TIMEOUT_SECONDS)
+
+
+class EmailService:
+    def __init__(self, transport=None):
+        self.transport = transport or make_transport()
+
+    def verification_message(self, email: str, name: str) -> EmailMessage:
         token = create_email_verification_token(email)
         verification_link = f"{settings.FRONTEND_URL}/verify-email?token={token}"
-        
-        message = Mail(
-            from_email=settings.FROM_EMAIL,
-            to_emails=email,
+        return EmailMessage(
+            to=email,
             subject=f"Welcome to {settings.APP_NAME} - Verify Your Email",
-            html_content=f"""
+            html=f"""
             <h2>Welcome to {settings.APP_NAME}, {name}!</h2>
             <p>You have been invited to join our time tracking platform.</p>
             <p>Please click the link below to verify your email and set up your password:</p>
@@ -37,29 +103,14 @@ class EmailService:
             <p>If you didn't expect this email, please ignore it.</p>
             """
         )
-        
-        try:
-            response = self.sg.send(message)
-            logger.info(f"Email verification sent to {email}. Status: {response.status_code}")
-            return response.status_code == 202
-        except Exception as e:
-            logger.error(f"Failed to send email verification to {email}: {str(e)}")
-            return False
 
-    def send_password_reset(self, email: str, name: str) -> bool:
-        """Send password reset link"""
-        if not self.sg:
-            logger.info(f"Would send password reset to {email} (SendGrid not configured)")
-            return True
-            
+    def password_reset_message(self, email: str, name: str) -> EmailMessage:
         token = create_email_verification_token(email)
         reset_link = f"{settings.FRONTEND_URL}/reset-password?token={token}"
-        
-        message = Mail(
-            from_email=settings.FROM_EMAIL,
-            to_emails=email,
+        return EmailMessage(
+            to=email,
             subject=f"{settings.APP_NAME} - Password Reset",
-            html_content=f"""
+            html=f"""
             <h2>Password Reset Request</h2>
             <p>Hello {name},</p>
             <p>You requested a password reset for your {settings.APP_NAME} account.</p>
@@ -69,14 +120,30 @@ class EmailService:
             <p>If you didn't request this, please ignore this email.</p>
             """
         )
-        
+
+    def render(self, kind: str, email: str, name: str) -> EmailMessage:
+        """Message for a queued delivery; tokens are minted at send time"""
+        if kind == "verification":
+            return self.verification_message(email, name)
+        if kind == "password_reset":
+            return self.password_reset_message(email, name)
+        raise ValueError(f"Unknown email kind: {kind}")
+
+    def send_email_verification(self, email: str, name: str) -> bool:
+        """Send email verification link to new employee right away (prefer email_queue)"""
+        return self._send_now(self.verification_message(email, name))
+
+    def send_password_reset(self, email: str, name: str) -> bool:
+        """Send password reset link right away (prefer email_queue)"""
+        return self._send_now(self.password_reset_message(email, name))
+
+    def _send_now(self, message: EmailMessage) -> bool:
         try:
-            response = self.sg.send(message)
-            logger.info(f"Password reset sent to {email}. Status: {response.status_code}")
-            return response.status_code == 202
+            self.transport.send(message)
+            return True
         except Exception as e:
-            logger.error(f"Failed to send password reset to {email}: {str(e)}")
+            logger.error(f"Failed to send '{message.subject}' to {message.to}: {str(e)}")
             return False
 
 
-email_service = EmailService()
\ No newline at end of file
+email_service = EmailService()
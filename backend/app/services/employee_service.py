@@ -1,24 +1,37 @@
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, selectinload
 from sqlalchemy import and_, func
-from app.models.employee import Employee
+from app.models.employee import Employee, employee_projects
 from app.models.project import Project
 from app.models.shift import Shift
 from app.models.task import Task
 from app.models.screenshot import Screenshot
 from app.schemas.employee import EmployeeCreate, EmployeeUpdate, EmployeeStats
 from app.core.security import get_password_hash
-from app.services.email_service import email_service
+from app.services.associations import Association
+from app.services.email_queue import email_queue
+from app.services.membership_service import MembershipService
+from app.services.outbox import record_event
 from datetime import datetime, timedelta
-from typing import List, Optional
+from typing import Iterable, List, Optional
 import logging
 
 logger = logging.getLogger(__name__)
 
+employee_project_links = Association(employee_projects, "employeeId", "projectId", Project)
+
 
 class EmployeeService:
     def __init__(self, db: Session):
         self.db = db
 
+    def _query(self):
+        # Employee responses include project ids
+        return self.db.query(Employee).options(selectinload(Employee.projects))
+
+    def _reload(self, employee: Employee) -> Employee:
+        """Reload after a commit, which expires the eagerly loaded collections"""
+        return self._query().populate_existing().filter(Employee.id == employee.id).one()
+
     def create_employee(self, employee_data: EmployeeCreate) -> Employee:
         """Create a new employee and send invitation email"""
         # Check if email already exists
@@ -41,60 +54,97 @@ class EmployeeService:
             invited=int(datetime.utcnow().timestamp() * 1000)
         )
         
-        self.db.add(db_employee)
-        self.db.commit()
-        self.db.refresh(db_employee)
-        
         # Add projects if specified
         if employee_data.projects:
             projects = self.db.query(Project).filter(Project.id.in_(employee_data.projects)).all()
             db_employee.projects.extend(projects)
-            self.db.commit()
         
-        # Send invitation email
-        email_sent = email_service.send_email_verification(employee_data.email, employee_data.name)
-        if not email_sent:
-            logger.warning(f"Failed to send invitation email to {employee_data.email}")
-        
-        return db_employee
+        self.db.add(db_employee)
+        record_event(self.db, employee_data.organizationId, "employee.created", db_employee, {
+            "name": employee_data.name,
+            "email": employee_data.email,
+            "teamId": employee_data.teamId,
+            "isAdmin": employee_data.isAdmin,
+            "projects": [p.id for p in db_employee.projects],
+        })
+        # Invitation email, sent by the queue once the employee is committed
+        email_queue.enqueue(self.db, "verification", employee_data.email, employee_data.name)
+        self.db.commit()
+        return self._reload(db_employee)
 
     def get_employee(self, employee_id: str) -> Optional[Employee]:
         """Get employee by ID"""
-        return self.db.query(Employee).filter(Employee.id == employee_id).first()
+        return self._query().filter(Employee.id == employee_id).first()
 
     def get_employee_by_email(self, email: str) -> Optional[Employee]:
         """Get employee by email"""
-        return self.db.query(Employee).filter(Employee.email == email).first()
+        return self._query().filter(Employee.email == email).first()
 
     def get_employees(self, organization_id: str, skip: int = 0, limit: int = 100) -> List[Employee]:
         """Get all employees for an organization"""
-        return self.db.query(Employee).filter(
+        return self._query().filter(
             Employee.organizationId == organization_id
         ).offset(skip).limit(limit).all()
 
     def update_employee(self, employee_id: str, employee_data: EmployeeUpdate) -> Optional[Employee]:
         """Update employee"""
-        db_employee = self.get_employee(employee_id)
+        # Projects are edited through the association table, so only the row is loaded
+        db_employee = self.db.query(Employee).filter(Employee.id == employee_id).first()
         if not db_employee:
             return None
         
         update_data = employee_data.dict(exclude_unset=True)
+        fields = sorted(field for field in update_data if field != "projects")
         
-        # Handle projects update
+        # Handle projects update, touching only the changed rows
+        reassigned = False
         if "projects" in update_data:
-            project_ids = update_data.pop("projects")
-            projects = self.db.query(Project).filter(Project.id.in_(project_ids)).all()
-            db_employee.projects.clear()
-            db_employee.projects.extend(projects)
+            added, removed = employee_project_links.replace(self.db, employee_id, update_data.pop("projects"))
+            reassigned = bool(added or removed)
+            self._record_projects_changed(db_employee, added, removed)
         
         # Update other fields
         for field, value in update_data.items():
             setattr(db_employee, field, value)
+        if fields:
+            record_event(self.db, db_employee.organizationId, "employee.updated", employee_id, {
+                "fields": fields
+            })
         
         self.db.commit()
-        self.db.refresh(db_employee)
+        db_employee = self._reload(db_employee)
+        if reassigned:
+            MembershipService.invalidate(db_employee.organizationId, [db_employee.id])
         return db_employee
 
+    def update_projects(
+        self,
+        employee_id: str,
+        add: Iterable[str] = (),
+        remove: Iterable[str] = ()
+    ) -> Optional[Employee]:
+        """Add and remove project assignments without replacing the whole list"""
+        db_employee = self.db.query(Employee).filter(Employee.id == employee_id).first()
+        if not db_employee:
+            return None
+        
+        added = employee_project_links.add(self.db, employee_id, add)
+        removed = employee_project_links.remove(self.db, employee_id, remove)
+        self._record_projects_changed(db_employee, added, removed)
+        
+        self.db.commit()
+        db_employee = self._reload(db_employee)
+        if added or removed:
+            MembershipService.invalidate(db_employee.organizationId, [db_employee.id])
+        return db_employee
+
+    def _record_projects_changed(self, db_employee: Employee, added: Iterable[str], removed: Iterable[str]) -> None:
+        if added or removed:
+            record_event(self.db, db_employee.organizationId, "employee.projects_changed", db_employee.id, {
+                "added": sorted(added),
+                "removed": sorted(removed),
+            })
+
     def deactivate_employee(self, employee_id: str) -> Optional[Employee]:
         """Deactivate employee"""
         db_employee = self.get_employee(employee_id)
@@ -105,9 +155,9 @@ class EmployeeService:
             raise ValueError("Employee is already deactivated")
         
         db_employee.deactivated = int(datetime.utcnow().timestamp() * 1000)
+        record_event(self.db, db_employee.organizationId, "employee.deactivated", db_employee.id)
         self.db.commit()
-        self.db.refresh(db_employee)
-        return db_employee
+        return self._reload(db_employee)
 
     def activate_employee(self, employee_id: str) -> Optional[Employee]:
         """Activate employee"""
@@ -116,9 +166,9 @@ class EmployeeService:
             return None
         
         db_employee.deactivated = None
+        record_event(self.db, db_employee.organizationId, "employee.activated", db_employee.id)
         self.db.commit()
-        self.db.refresh(db_employee)
-        return db_employee
+        return self._reload(db_employee)
 
     def verify_email_and_set_password(self, email: str, password: str) -> Optional[Employee]:
         """Verify email and set password for new employee"""
@@ -131,9 +181,9 @@ class EmployeeService:
         
         db_employee.password_hash = get_password_hash(password)
         db_employee.emailVerified = True
+        record_event(self.db, db_employee.organizationId, "employee.verified", db_employee.id)
         self.db.commit()
-        self.db.refresh(db_employee)
-        return db_employee
+        return self._reload(db_employee)
 
     def get_employee_stats(self, employee_id: str) -> EmployeeStats:
         """Get employee statistics"""
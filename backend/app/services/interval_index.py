@@ -0,0 +1,60 @@
+from typing import Iterable, List, Tuple
+import numpy as np
+
+
+class IntervalIndex:
+    """Static sweep-line index over half-open [start, end) intervals.
+
+    Building sorts the endpoints once (O(n log n)); point counts are then two
+    binary searches each, and the peak is one pass over the sorted events.
+    """
+
+    def __init__(self, starts: Iterable[int], ends: Iterable[int]):
+        self.starts = np.asarray(starts, dtype=np.int64)
+        self.ends = np.asarray(ends, dtype=np.int64)
+        self._sorted_starts = np.sort(self.starts)
+        self._sorted_ends = np.sort(self.ends)
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def counts_at(self, points: Iterable[int]) -> np.ndarray:
+        """Number of intervals active at each point"""
+        points = np.asarray(points, dtype=np.int64)
+        started = np.searchsorted(self._sorted_starts, points, side="right")
+        ended = np.searchsorted(self._sorted_ends, points, side="right")
+        return started - ended
+
+    def peak(self, window_start: int, window_end: int) -> Tuple[int, int]:
+        """Highest number of simultaneous intervals in a window, and when it first occurs"""
+        times = np.concatenate((self.starts, self.ends))
+        deltas = np.concatenate((np.ones(len(self), dtype=np.int64), -np.ones(len(self), dtype=np.int64)))
+        # Ends sort before starts at the same instant, as intervals are half-open
+        order = np.lexsort((deltas, times))
+        times, active = times[order], np.cumsum(deltas[order])
+
+        inside = (times > window_start) & (times < window_end)
+        best_count, best_time = int(self.counts_at([window_start])[0]), window_start
+        if inside.any():
+            candidates = np.flatnonzero(inside)
+            top = candidates[np.argmax(active[candidates])]
+            if active[top] > best_count:
+                best_count, best_time = int(active[top]), int(times[top])
+        return best_count, best_time
+
+
+def merge_per_key(rows: Iterable[Tuple[str, int, int]]) -> Tuple[List[int], List[int]]:
+    """Union overlapping (key, start, end) intervals per key.
+
+    Used so that an employee with overlapping shifts is counted once.
+    """
+    starts, ends = [], []
+    current_key = None
+    for key, start, end in sorted(rows):
+        if key == current_key and start <= ends[-1]:
+            ends[-1] = max(ends[-1], end)
+            continue
+        current_key = key
+        starts.append(start)
+        ends.append(end)
+    return starts, ends
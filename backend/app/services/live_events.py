@@ -0,0 +1,242 @@
+from sqlalchemy.orm import Session, sessionmaker
+from app.core.config import settings
+from app.core.metrics import Counter, Gauge, registry
+from app.db.database import SessionLocal
+from app.models.outbox import OutboxEvent, OutboxSequence
+from app.services import outbox
+from typing import Dict, List, Optional, Set, Tuple
+import asyncio
+import json
+import logging
+
+logger = logging.getLogger(__name__)
+
+live_connections = registry.register(Gauge(
+    "live_connections", "Open live event streams in this process"
+))
+live_events_sent_total = registry.register(Counter(
+    "live_events_sent_total", "Events queued to live streams"
+))
+live_resets_total = registry.register(Counter(
+    "live_resets_total", "Live streams that fell behind and were told to reload"
+))
+
+# What the dashboard shows: who is working, and their screenshots as they arrive
+LIVE_EVENT_TYPES = ("shift.started", "shift.ended", "shift.updated", "screenshot.created")
+
+# Sent in place of events a client missed; it should reload its state over the REST API
+RESET_FRAME = "event: reset\ndata: {}\n\n"
+
+Frame = Tuple[int, str]
+
+
+def format_event(event: OutboxEvent) -> str:
+    """An outbox event as a Server-Sent Events frame; the id lets clients resume"""
+    data = json.dumps({
+        "sequence": event.sequence,
+        "type": event.type,
+        "entityId": event.entityId,
+        "payload": event.payload,
+        "createdAt": event.createdAt,
+    })
+    return f"id: {event.sequence}\nevent: {event.type}\ndata: {data}\n\n"
+
+
+class Subscription:
+    """One client's stream: a bounded queue of frames"""
+
+    def __init__(self, organization_id: str, maxsize: int, position: int = 0):
+        self.organization_id = organization_id
+        self.queue: "asyncio.Queue[str]" = asyncio.Queue(maxsize)
+        # Last sequence queued, so a resumed client never gets an event twice
+        self.position = position
+
+    def offer(self, frames: List[Frame]) -> None:
+        """Queue frames without waiting; a full queue is replaced by a reset"""
+        for sequence, frame in frames:
+            if sequence <= self.position:
+                continue
+            self.position = sequence
+            try:
+                self.queue.put_nowait(frame)
+                live_events_sent_total.inc()
+            except asyncio.QueueFull:
+                self.reset()
+
+    def reset(self) -> None:
+        while not self.queue.empty():
+            self.queue.get_nowait()
+        self.queue.put_nowait(RESET_FRAME)
+        live_resets_total.inc()
+
+
+class LiveHub:
+    """Fans outbox events out to live streams, with one poller per process.
+
+    Each poll is a single query for the outbox heads of organizations that
+    have subscribers, then one read per organization with new events, however
+    many streams are open. Commits in this process wake the poller at once;
+    other processes' events arrive within `poll_seconds`. Frames are queued
+    without waiting, so a slow client cannot hold up the others: when its
+    queue is full it is sent a reset and continues from the newest events.
+    """
+
+    def __init__(
+        self,
+        session_factory: sessionmaker,
+        poll_seconds: float = None,
+        queue_size: int = None,
+        batch_size: int = None,
+        types: Tuple[str, ...] = LIVE_EVENT_TYPES
+    ):
+        self.session_factory = session_factory
+        self.poll_seconds = poll_seconds or settings.LIVE_POLL_SECONDS
+        self.queue_size = queue_size or settings.LIVE_QUEUE_SIZE
+        self.batch_size = batch_size or settings.OUTBOX_BATCH_SIZE
+        self.types = list(types)
+        self._subscribers: Dict[str, Set[Subscription]] = {}
+        # Last sequence read per subscribed organization
+        self._positions: Dict[str, int] = {}
+        self._lock = asyncio.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None
+
+    def _read_frames(self, db: Session, organization_id: str, since: int, until: int, limit: int = None) -> List[Frame]:
+        frames = []
+        while True:
+            events = outbox.read_events(db, organization_id, since, self.batch_size, self.types, until)
+            frames.extend((event.sequence, format_event(event)) for event in events)
+            if len(events) < self.batch_size or (limit and len(frames) > limit):
+                return frames
+            since = events[-1].sequence
+
+    def _join(self, organization_id: str, since: Optional[int]) -> Tuple[int, List[Frame]]:
+        """The organization's position (the current head for a new one) and a resuming client's backlog"""
+        db = self.session_factory()
+        try:
+            position = self._positions.get(organization_id)
+            if position is None:
+                position = outbox.last_sequence(db, organization_id)
+            if since is None or since >= position:
+                return position, []
+            return position, self._read_frames(db, organization_id, since, position, self.queue_size)
+        finally:
+            db.close()
+
+    def _poll(self, positions: Dict[str, int]) -> Dict[str, Tuple[int, List[Frame]]]:
+        db = self.session_factory()
+        try:
+            heads = db.query(OutboxSequence.organizationId, OutboxSequence.lastSequence).filter(
+                OutboxSequence.organizationId.in_(list(positions))
+            ).all()
+            return {
+                organization_id: (head, self._read_frames(db, organization_id, positions[organization_id], head))
+                for organization_id, head in heads
+                if head > positions[organization_id]
+            }
+        finally:
+            db.close()
+
+    async def subscribe(self, organization_id: str, since: int = None) -> Subscription:
+        """Open a stream of the organization's events, after `since` when a client resumes"""
+        async with self._lock:
+            position, backlog = await asyncio.to_thread(self._join, organization_id, since)
+            # A client ahead of the head (e.g. after a restore) would otherwise skip new events
+            start = position if since is None else min(since, position)
+            subscription = Subscription(organization_id, self.queue_size, start)
+            if len(backlog) > self.queue_size:
+                subscription.position = position
+                subscription.reset()
+            else:
+                subscription.offer(backlog)
+            self._positions[organization_id] = position
+            self._subscribers.setdefault(organization_id, set()).add(subscription)
+        live_connections.inc()
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        subscribers = self._subscribers.get(subscription.organization_id)
+        if subscribers is None or subscription not in subscribers:
+            return
+        subscribers.discard(subscription)
+        if not subscribers:
+            del self._subscribers[subscription.organization_id]
+            del self._positions[subscription.organization_id]
+        live_connections.dec()
+
+    async def poll_once(self) -> int:
+        """Queue new events to every subscriber; returns the number of events read"""
+        async with self._lock:
+            if not self._positions:
+                return 0
+            updates = await asyncio.to_thread(self._poll, dict(self._positions))
+            read = 0
+            for organization_id, (head, frames) in updates.items():
+                if organization_id not in self._positions:
+                    continue
+                self._positions[organization_id] = head
+                for subscription in list(self._subscribers[organization_id]):
+                    subscription.offer(frames)
+                read += len(frames)
+            return read
+
+    def wake(self, organization_ids: Set[str]) -> None:
+        """Poll now if a commit wrote events for a subscribed organization.
+
+        Called after commits on any thread; the subscriptions are only read
+        on the loop, which the ids are handed to.
+        """
+        loop = self._loop
+        if loop is None:
+            return
+        try:
+            loop.call_soon_threadsafe(self._wake_for, organization_ids)
+        except RuntimeError:
+            # The loop closed during shutdown
+            pass
+
+    def _wake_for(self, organization_ids: Set[str]) -> None:
+        if self._wakeup is not None and not organization_ids.isdisjoint(self._positions):
+            self._wakeup.set()
+
+    async def _work(self) -> None:
+        while True:
+            self._wakeup.clear()
+            try:
+                await self.poll_once()
+            except Exception as e:
+                logger.error(f"Live event poll failed: {str(e)}")
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.poll_seconds)
+            except asyncio.TimeoutError:
+                pass
+
+    def start(self) -> None:
+        """Run the poller on the current event loop (application startup)"""
+        self._loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+        self._task = self._loop.create_task(self._work())
+        outbox.commit_listeners.append(self.wake)
+
+    async def stop(self) -> None:
+        if self.wake in outbox.commit_listeners:
+            outbox.commit_listeners.remove(self.wake)
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        for subscribers in self._subscribers.values():
+            live_connections.dec(len(subscribers))
+        self._subscribers.clear()
+        self._positions.clear()
+        self._task = self._loop = self._wakeup = None
+
+
+live_hub = LiveHub(SessionLocal)
@@ -0,0 +1,63 @@
+from sqlalchemy import exists
+from sqlalchemy.orm import Session
+from app.core.cache import make_cache
+from app.core.config import settings
+from app.models.employee import employee_projects
+from app.models.task import task_employees
+from typing import Iterable
+import time
+
+# kind -> (association table, assigned id column)
+_ASSIGNMENTS = {
+    "project": (employee_projects, employee_projects.c.projectId),
+    "task": (task_employees, task_employees.c.taskId),
+}
+
+# (organization id, employee id, kind) -> (expires at (epoch seconds), frozenset of confirmed ids)
+assignment_cache = make_cache("assignments", maxsize=settings.ASSIGNMENT_CACHE_SIZE)
+
+
+class MembershipService:
+    """Answers whether an employee is assigned to a project or task.
+
+    Each check is an indexed EXISTS against the association table. Confirmed
+    assignments are remembered per employee, so agents posting screenshots
+    for the same project skip the query; refusals are never cached. Entries
+    are dropped when assignments change (in every process with the Redis
+    cache backend) and expire after ASSIGNMENT_CACHE_TTL_SECONDS, which
+    bounds staleness in processes that keep their own.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def is_assigned_to_project(self, employee, project_id: str) -> bool:
+        return self._is_assigned(employee, "project", project_id)
+
+    def is_assigned_to_task(self, employee, task_id: str) -> bool:
+        return self._is_assigned(employee, "task", task_id)
+
+    def _is_assigned(self, employee, kind: str, target_id: str) -> bool:
+        key = (employee.organizationId, employee.id, kind)
+        now = time.time()
+        entry = assignment_cache.get(key)
+        known = entry[1] if entry and entry[0] > now else frozenset()
+        if target_id in known:
+            return True
+
+        table, column = _ASSIGNMENTS[kind]
+        assigned = self.db.query(exists().where(
+            table.c.employeeId == employee.id,
+            column == target_id
+        )).scalar()
+        if assigned:
+            expires = entry[0] if known else now + settings.ASSIGNMENT_CACHE_TTL_SECONDS
+            assignment_cache.set(key, (expires, known | {target_id}))
+        return assigned
+
+    @staticmethod
+    def invalidate(organization_id: str, employee_ids: Iterable[str]) -> None:
+        """Forget cached assignments of these employees; call after the change is committed"""
+        for employee_id in set(employee_ids):
+            for kind in _ASSIGNMENTS:
+                assignment_cache.delete((organization_id, employee_id, kind))
@@ -0,0 +1,238 @@
+from sqlalchemy import event, func, insert
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session, sessionmaker
+from app.core.config import settings
+from app.core.metrics import Counter, registry
+from app.db.database import WriteSessionLocal
+from app.models.outbox import OutboxCursor, OutboxEvent, OutboxSequence
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, Iterator, List, Set
+import logging
+import uuid
+
+logger = logging.getLogger(__name__)
+
+outbox_events_total = registry.register(Counter(
+    "outbox_events_total", "Events written to the outbox", ("type",)
+))
+outbox_delivered_total = registry.register(Counter(
+    "outbox_delivered_total", "Outbox events handed to dispatcher consumers", ("consumer",)
+))
+
+
+# Called with the organization ids after a commit that wrote events
+commit_listeners: List[Callable[[Set[str]], None]] = []
+
+
+def _now_ms() -> int:
+    return int(datetime.utcnow().timestamp() * 1000)
+
+
+def _upsert(db: Session, model):
+    """INSERT ... ON CONFLICT for the session's database"""
+    dialect = postgresql if db.get_bind().dialect.name == "postgresql" else sqlite
+    return dialect.insert(model)
+
+
+def record_event(
+    db: Session,
+    organization_id: str,
+    type: str,
+    entity: Any = None,
+    payload: Dict[str, Any] = None
+) -> None:
+    """Add an event to the caller's transaction; it is written when the session commits.
+
+    `entity` is an id, or a new model instance whose id is read after the flush.
+    """
+    db.info.setdefault("outbox", []).append((organization_id, type, entity, payload))
+
+
+def _allocate(db: Session, organization_id: str, count: int) -> int:
+    """Reserve `count` sequence numbers and return the last one.
+
+    The upsert locks the organization's row until commit (PostgreSQL), so
+    its events commit in sequence order and readers never see a gap that
+    fills in later.
+    """
+    statement = _upsert(db, OutboxSequence).values(organizationId=organization_id, lastSequence=count)
+    statement = statement.on_conflict_do_update(
+        index_elements=[OutboxSequence.organizationId],
+        set_={"lastSequence": OutboxSequence.lastSequence + count}
+    ).returning(OutboxSequence.lastSequence)
+    return db.execute(statement).scalar_one()
+
+
+@event.listens_for(Session, "before_commit")
+def _write_events(session):
+    if not session.info.get("outbox"):
+        return
+    # Assigns the ids of entities created in this transaction
+    session.flush()
+    pending = session.info.pop("outbox")
+    by_organization: Dict[str, List] = {}
+    for entry in pending:
+        by_organization.setdefault(entry[0], []).append(entry)
+    now = _now_ms()
+    rows = []
+    # Sorted, so concurrent transactions lock organizations in the same order
+    for organization_id in sorted(by_organization):
+        events = by_organization[organization_id]
+        first = _allocate(session, organization_id, len(events)) - len(events) + 1
+        for sequence, (_, type, entity, payload) in enumerate(events, start=first):
+            rows.append({
+                "id": uuid.uuid4().hex,
+                "organizationId": organization_id,
+                "sequence": sequence,
+                "type": type,
+                "entityId": getattr(entity, "id", entity),
+                "payload": payload,
+                "createdAt": now,
+            })
+            outbox_events_total.inc(1, type)
+    session.execute(insert(OutboxEvent), rows)
+    session.info["outbox_written"] = set(by_organization)
+
+
+@event.listens_for(Session, "after_commit")
+def _notify_listeners(session):
+    written = session.info.pop("outbox_written", None)
+    if written:
+        for listener in commit_listeners:
+            listener(written)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _discard_events(session, previous_transaction):
+    session.info.pop("outbox", None)
+    session.info.pop("outbox_written", None)
+
+
+def read_events(
+    db: Session,
+    organization_id: str,
+    since: int = 0,
+    limit: int = None,
+    types: List[str] = None,
+    until: int = None
+) -> List[OutboxEvent]:
+    """The organization's events after sequence `since` (up to `until`), oldest first"""
+    query = db.query(OutboxEvent).filter(
+        OutboxEvent.organizationId == organization_id,
+        OutboxEvent.sequence > since
+    )
+    if until is not None:
+        query = query.filter(OutboxEvent.sequence <= until)
+    if types:
+        query = query.filter(OutboxEvent.type.in_(types))
+    return query.order_by(OutboxEvent.sequence).limit(limit or settings.OUTBOX_BATCH_SIZE).all()
+
+
+def iter_events(
+    db: Session,
+    organization_id: str,
+    since: int = 0,
+    batch_size: int = None,
+    types: List[str] = None,
+    until: int = None
+) -> Iterator[List[OutboxEvent]]:
+    """Every event after `since` (up to `until`), in batches of one query each"""
+    while True:
+        batch = read_events(db, organization_id, since, batch_size, types, until)
+        if not batch:
+            return
+        yield batch
+        since = batch[-1].sequence
+
+
+def last_sequence(db: Session, organization_id: str) -> int:
+    last = db.query(OutboxSequence.lastSequence).filter(OutboxSequence.organizationId == organization_id).scalar()
+    return last or 0
+
+
+def prune_events(db: Session, retention_days: int = None) -> int:
+    """Delete events older than OUTBOX_RETENTION_DAYS; sequences keep counting"""
+    retention_days = settings.OUTBOX_RETENTION_DAYS if retention_days is None else retention_days
+    cutoff = int((datetime.utcnow() - timedelta(days=retention_days)).timestamp() * 1000)
+    deleted = db.query(OutboxEvent).filter(OutboxEvent.createdAt < cutoff).delete(synchronize_session=False)
+    db.commit()
+    return deleted
+
+
+Consumer = Callable[[Session, List[OutboxEvent]], None]
+
+
+class OutboxDispatcher:
+    """Hands outbox events to registered consumers, in order, a batch at a time.
+
+    Each consumer keeps a cursor per organization in outbox_cursors. The
+    handler runs in the transaction that advances the cursor, so its own
+    database writes apply exactly once; other side effects are at least
+    once. The cursor moves with a conditional UPDATE, so concurrent
+    dispatchers cannot both deliver a batch; the loser rolls back.
+    """
+
+    def __init__(self, session_factory: sessionmaker, batch_size: int = None):
+        self.session_factory = session_factory
+        self.batch_size = batch_size or settings.OUTBOX_BATCH_SIZE
+        self.consumers: Dict[str, Consumer] = {}
+
+    def consumer(self, name: str):
+        """Register `handler(db, events)` as a consumer"""
+        def register(handler: Consumer) -> Consumer:
+            self.consumers[name] = handler
+            return handler
+        return register
+
+    def _behind(self, db: Session, name: str) -> List[str]:
+        """Organizations with events this consumer has not read"""
+        cursor = db.query(OutboxCursor.lastSequence).filter(
+            OutboxCursor.consumer == name,
+            OutboxCursor.organizationId == OutboxSequence.organizationId
+        ).scalar_subquery()
+        return [organization_id for organization_id, in db.query(OutboxSequence.organizationId).filter(
+            OutboxSequence.lastSequence > func.coalesce(cursor, 0)
+        )]
+
+    def _deliver(self, db: Session, name: str, handler: Consumer, organization_id: str) -> int:
+        db.execute(_upsert(db, OutboxCursor).values(
+            consumer=name, organizationId=organization_id, lastSequence=0
+        ).on_conflict_do_nothing())
+        since = db.query(OutboxCursor.lastSequence).filter(
+            OutboxCursor.consumer == name, OutboxCursor.organizationId == organization_id
+        ).scalar()
+        events = read_events(db, organization_id, since, self.batch_size)
+        if not events:
+            db.rollback()
+            return 0
+        handler(db, events)
+        moved = db.query(OutboxCursor).filter(
+            OutboxCursor.consumer == name,
+            OutboxCursor.organizationId == organization_id,
+            OutboxCursor.lastSequence == since
+        ).update({OutboxCursor.lastSequence: events[-1].sequence}, synchronize_session=False)
+        if not moved:
+            db.rollback()
+            return 0
+        db.commit()
+        outbox_delivered_total.inc(len(events), name)
+        return len(events)
+
+    def run_once(self) -> int:
+        """Deliver up to one batch per consumer and organization; returns events delivered"""
+        delivered = 0
+        db = self.session_factory()
+        try:
+            for name, handler in list(self.consumers.items()):
+                for organization_id in self._behind(db, name):
+                    try:
+                        delivered += self._deliver(db, name, handler, organization_id)
+                    except Exception as e:
+                        db.rollback()
+                        logger.error(f"Outbox consumer {name} failed for {organization_id}: {str(e)}")
+            return delivered
+        finally:
+            db.close()
+
+
+outbox_dispatcher = OutboxDispatcher(WriteSessionLocal)
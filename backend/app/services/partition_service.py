@@ -0,0 +1,198 @@
+from datetime import datetime, timezone
+from sqlalchemy import func, text
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.models.organization import Organization
+from typing import Dict, Any, List, Optional
+import logging
+import re
+
+logger = logging.getLogger(__name__)
+
+# Partitioned table -> (partition key column, Organization retention column)
+PARTITIONED_TABLES = {
+    "screenshots": ("timestamp", "screenshotRetentionDays"),
+    "shifts": ("start", "shiftRetentionDays"),
+}
+
+_PARTITION_NAME = re.compile(r"^(?P<table>\w+)_p(?P<year>\d{4})_(?P<month>\d{2})$")
+_DAY_MS = 24 * 60 * 60 * 1000
+
+
+class MonthPartition:
+    """One monthly range partition; bounds are epoch milliseconds, upper bound exclusive"""
+
+    def __init__(self, table: str, year: int, month: int):
+        self.table = table
+        self.year = year
+        self.month = month
+
+    @property
+    def name(self) -> str:
+        return f"{self.table}_p{self.year:04d}_{self.month:02d}"
+
+    @property
+    def lower(self) -> int:
+        return _month_start_ms(self.year, self.month)
+
+    @property
+    def upper(self) -> int:
+        year, month = _next_month(self.year, self.month)
+        return _month_start_ms(year, month)
+
+    def next(self) -> "MonthPartition":
+        return MonthPartition(self.table, *_next_month(self.year, self.month))
+
+    @classmethod
+    def containing(cls, table: str, timestamp_ms: int) -> "MonthPartition":
+        moment = datetime.fromtimestamp(timestamp_ms / 1000, tz=timezone.utc)
+        return cls(table, moment.year, moment.month)
+
+    @classmethod
+    def from_name(cls, name: str) -> Optional["MonthPartition"]:
+        match = _PARTITION_NAME.match(name)
+        if not match:
+            return None
+        return cls(match["table"], int(match["year"]), int(match["month"]))
+
+
+def _next_month(year: int, month: int):
+    return (year + 1, 1) if month == 12 else (year, month + 1)
+
+
+def _month_start_ms(year: int, month: int) -> int:
+    return int(datetime(year, month, 1, tzinfo=timezone.utc).timestamp() * 1000)
+
+
+class PartitionService:
+    """Monthly range partitions of screenshots and shifts (PostgreSQL only).
+
+    Partitions span all organizations, so one can only be dropped once every
+    organization's retention has passed it; shorter per-organization
+    retention is left to row-level purging.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def is_partitioned(self, table: str) -> bool:
+        if self.db.get_bind().dialect.name != "postgresql":
+            return False
+        return self.db.execute(text(
+            "SELECT 1 FROM pg_partitioned_table p JOIN pg_class c ON c.oid = p.partrelid "
+            "WHERE c.relname = :table AND pg_table_is_visible(c.oid)"
+        ), {"table": table}).first() is not None
+
+    def list_partitions(self, table: str) -> List[MonthPartition]:
+        names = self.db.execute(text(
+            "SELECT child.relname FROM pg_inherits i "
+            "JOIN pg_class parent ON parent.oid = i.inhparent "
+            "JOIN pg_class child ON child.oid = i.inhrelid "
+            "WHERE parent.relname = :table AND pg_table_is_visible(parent.oid)"
+        ), {"table": table}).scalars()
+        # The DEFAULT partition does not follow the naming scheme and is never dropped
+        partitions = [MonthPartition.from_name(name) for name in names]
+        return sorted((p for p in partitions if p and p.table == table), key=lambda p: p.lower)
+
+    def retention_cutoff(self, table: str, now_ms: int = None) -> Optional[int]:
+        """Time before which no organization keeps data, or None to keep everything"""
+        retention = getattr(Organization, PARTITIONED_TABLES[table][1])
+        unlimited, longest = self.db.query(
+            func.count().filter(retention.is_(None)),
+            func.max(retention)
+        ).one()
+        if unlimited or longest is None:
+            return None
+        now_ms = now_ms if now_ms is not None else int(datetime.utcnow().timestamp() * 1000)
+        return now_ms - longest * _DAY_MS
+
+    def _default_rows_in(self, table: str, partition: MonthPartition) -> bool:
+        """Whether the DEFAULT partition holds rows that belong in `partition`"""
+        default = f"{table}_default"
+        if not self.db.execute(text("SELECT to_regclass(:name)"), {"name": default}).scalar():
+            return False
+        key = PARTITIONED_TABLES[table][0]
+        return self.db.execute(text(
+            f'SELECT 1 FROM "{default}" WHERE "{key}" >= :lower AND "{key}" < :upper LIMIT 1'
+        ), {"lower": partition.lower, "upper": partition.upper}).first() is not None
+
+    def _create_partition(self, table: str, partition: MonthPartition) -> None:
+        """Create a partition, first moving rows for it out of the DEFAULT partition.
+
+        PostgreSQL refuses to create a partition whose range has rows in the
+        DEFAULT partition (a month that was not created in time). The default
+        is detached, the rows moved and the default re-attached, all in the
+        caller's transaction.
+        """
+        create = (
+            f'CREATE TABLE "{partition.name}" PARTITION OF "{table}" '
+            f"FOR VALUES FROM ({partition.lower}) TO ({partition.upper})"
+        )
+        if not self._default_rows_in(table, partition):
+            self.db.execute(text(create))
+            return
+        default = f"{table}_default"
+        key = PARTITIONED_TABLES[table][0]
+        in_range = f'"{key}" >= {partition.lower} AND "{key}" < {partition.upper}'
+        self.db.execute(text(f'ALTER TABLE "{table}" DETACH PARTITION "{default}"'))
+        self.db.execute(text(create))
+        columns = ", ".join(f'"{name}"' for name in self.db.execute(text(
+            "SELECT column_name FROM information_schema.columns "
+            "WHERE table_name = :table AND table_schema = current_schema() ORDER BY ordinal_position"
+        ), {"table": default}).scalars())
+        moved = self.db.execute(text(
+            f'INSERT INTO "{partition.name}" ({columns}) SELECT {columns} FROM "{default}" WHERE {in_range}'
+        )).rowcount
+        self.db.execute(text(f'DELETE FROM "{default}" WHERE {in_range}'))
+        self.db.execute(text(f'ALTER TABLE "{table}" ATTACH PARTITION "{default}" DEFAULT'))
+        logger.warning(f"Moved {moved} rows of {partition.name} out of {default}")
+
+    def ensure_partitions(self, table: str, months_ahead: int, now_ms: int = None) -> List[str]:
+        """Create missing partitions from the current month to `months_ahead` months ahead"""
+        now_ms = now_ms if now_ms is not None else int(datetime.utcnow().timestamp() * 1000)
+        existing = {p.name for p in self.list_partitions(table)}
+        created = []
+        partition = MonthPartition.containing(table, now_ms)
+        for _ in range(months_ahead + 1):
+            if partition.name not in existing:
+                self._create_partition(table, partition)
+                created.append(partition.name)
+            partition = partition.next()
+        return created
+
+    def expire_partitions(self, table: str, detach_only: bool = False, now_ms: int = None) -> List[str]:
+        """Detach, and unless `detach_only` drop, partitions entirely before the retention cutoff"""
+        cutoff = self.retention_cutoff(table, now_ms)
+        if cutoff is None:
+            return []
+        expired = [p for p in self.list_partitions(table) if p.upper <= cutoff]
+        for partition in expired:
+            self.db.execute(text(f'ALTER TABLE "{table}" DETACH PARTITION "{partition.name}"'))
+            if not detach_only:
+                self.db.execute(text(f'DROP TABLE "{partition.name}"'))
+        return [p.name for p in expired]
+
+    def run_maintenance(
+        self,
+        months_ahead: int = None,
+        detach_only: bool = False,
+        now_ms: int = None
+    ) -> Dict[str, Any]:
+        """Pre-create future partitions and expire old ones for every partitioned table"""
+        months_ahead = settings.PARTITION_MONTHS_AHEAD if months_ahead is None else months_ahead
+        report = {}
+        for table in PARTITIONED_TABLES:
+            if not self.is_partitioned(table):
+                report[table] = {"partitioned": False, "created": [], "expired": []}
+                continue
+            try:
+                created = self.ensure_partitions(table, months_ahead, now_ms)
+                expired = self.expire_partitions(table, detach_only, now_ms)
+                self.db.commit()
+            except Exception as e:
+                self.db.rollback()
+                logger.error(f"Partition maintenance failed for {table}: {str(e)}")
+                raise
+            logger.info(f"{table}: created {created}, {'detached' if detach_only else 'dropped'} {expired}")
+            report[table] = {"partitioned": True, "created": created, "expired": expired}
+        return report
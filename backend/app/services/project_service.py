@@ -1,19 +1,43 @@
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, selectinload
 from sqlalchemy import and_, func
-from app.models.project import Project
-from app.models.employee import Employee
+from app.models.project import Project, project_teams
+from app.models.employee import Employee, employee_projects
 from app.models.team import Team
 from app.models.task import Task
 from app.models.shift import Shift
 from app.models.screenshot import Screenshot
 from app.schemas.project import ProjectCreate, ProjectUpdate, ProjectStats
-from typing import List, Optional
+from app.services.associations import Association
+from app.services.membership_service import MembershipService
+from app.services.outbox import record_event
+from typing import Iterable, List, Optional
+
+project_employees = Association(employee_projects, "projectId", "employeeId", Employee)
+project_team_links = Association(project_teams, "projectId", "teamId", Team)
 
 
 class ProjectService:
     def __init__(self, db: Session):
         self.db = db
 
+    def _query(self):
+        # Project responses include employee and team ids
+        return self.db.query(Project).options(selectinload(Project.employees), selectinload(Project.teams))
+
+    def _reload(self, project: Project) -> Project:
+        """Reload after a commit, which expires the eagerly loaded collections"""
+        return self._query().populate_existing().filter(Project.id == project.id).one()
+
+    def _payload(self, project: Project, extra: dict) -> dict:
+        return {"name": project.name, **extra}
+
+    def _record_members_changed(self, project: Project, added: Iterable[str], removed: Iterable[str]) -> None:
+        if added or removed:
+            record_event(self.db, project.organizationId, "project.members_changed", project.id, self._payload(project, {
+                "added": sorted(added),
+                "removed": sorted(removed),
+            }))
+
     def create_project(self, project_data: ProjectCreate, creator_id: str) -> Project:
         """Create a new project"""
         db_project = Project(
@@ -22,16 +46,13 @@ class ProjectService:
             billable=project_data.billable,
             organizationId=project_data.organizationId,
             creatorId=creator_id,
-            statuses=project_data.statuses or ["To do", "On hold", "In progress", "Done"],
-            priorities=project_data.priorities or ["low", "medium", "high"],
-            payroll=project_data.payroll or {"billRate": 0, "overtimeBillRate": 0},
-            screenshotSettings=project_data.screenshotSettings or {"screenshotEnabled": True}
+            # Empty values fall back to the model defaults
+            statuses=project_data.statuses or None,
+            priorities=project_data.priorities or None,
+            payroll=project_data.payroll or None,
+            screenshotSettings=project_data.screenshotSettings or None
         )
         
-        self.db.add(db_project)
-        self.db.commit()
-        self.db.refresh(db_project)
-        
         # Add employees if specified
         if project_data.employees:
             employees = self.db.query(Employee).filter(Employee.id.in_(project_data.employees)).all()
@@ -42,53 +63,84 @@ class ProjectService:
             teams = self.db.query(Team).filter(Team.id.in_(project_data.teams)).all()
             db_project.teams.extend(teams)
         
+        self.db.add(db_project)
+        record_event(self.db, db_project.organizationId, "project.created", db_project, self._payload(db_project, {
+            "employees": [e.id for e in db_project.employees]
+        }))
         self.db.commit()
-        return db_project
+        return self._reload(db_project)
 
     def get_project(self, project_id: str) -> Optional[Project]:
         """Get project by ID"""
-        return self.db.query(Project).filter(Project.id == project_id).first()
+        return self._query().filter(Project.id == project_id).first()
 
     def get_projects(self, organization_id: str, skip: int = 0, limit: int = 100) -> List[Project]:
         """Get all projects for an organization"""
-        return self.db.query(Project).filter(
+        return self._query().filter(
             Project.organizationId == organization_id
         ).offset(skip).limit(limit).all()
 
-    def get_user_projects(self, employee_id: str, skip: int = 0, limit: int = 100) -> List[Project]:
-        """Get projects assigned to a specific employee"""
-        return self.db.query(Project).join(Project.employees).filter(
-            Employee.id == employee_id
-        ).offset(skip).limit(limit).all()
+    def get_user_projects(
+        self, employee_id: str, skip: int = 0, limit: Optional[int] = 100, ids: Iterable[str] = None
+    ) -> List[Project]:
+        """Get projects assigned to a specific employee, optionally only those in `ids`"""
+        query = self._query().join(Project.employees).filter(Employee.id == employee_id)
+        if ids is not None:
+            query = query.filter(Project.id.in_(list(ids)))
+        return query.order_by(Project.id).offset(skip).limit(limit).all()
 
     def update_project(self, project_id: str, project_data: ProjectUpdate) -> Optional[Project]:
         """Update project"""
-        db_project = self.get_project(project_id)
+        # Collections are edited through the association tables, so only the row is loaded
+        db_project = self.db.query(Project).filter(Project.id == project_id).first()
         if not db_project:
             return None
         
         update_data = project_data.dict(exclude_unset=True)
+        fields = sorted(field for field in update_data if field != "employees")
         
-        # Handle employees update
+        # Handle employees update, touching only the changed rows
+        added = removed = reassigned = set()
         if "employees" in update_data:
-            employee_ids = update_data.pop("employees")
-            employees = self.db.query(Employee).filter(Employee.id.in_(employee_ids)).all()
-            db_project.employees.clear()
-            db_project.employees.extend(employees)
+            added, removed = project_employees.replace(self.db, project_id, update_data.pop("employees"))
+            reassigned = added | removed
         
         # Handle teams update
         if "teams" in update_data:
-            team_ids = update_data.pop("teams")
-            teams = self.db.query(Team).filter(Team.id.in_(team_ids)).all()
-            db_project.teams.clear()
-            db_project.teams.extend(teams)
+            project_team_links.replace(self.db, project_id, update_data.pop("teams"))
         
         # Update other fields
         for field, value in update_data.items():
             setattr(db_project, field, value)
+        self._record_members_changed(db_project, added, removed)
+        if fields:
+            record_event(self.db, db_project.organizationId, "project.updated", db_project.id, self._payload(db_project, {
+                "fields": fields
+            }))
+        
+        self.db.commit()
+        db_project = self._reload(db_project)
+        MembershipService.invalidate(db_project.organizationId, reassigned)
+        return db_project
+
+    def update_members(
+        self,
+        project_id: str,
+        add: Iterable[str] = (),
+        remove: Iterable[str] = ()
+    ) -> Optional[Project]:
+        """Add and remove employees without replacing the whole member list"""
+        db_project = self.db.query(Project).filter(Project.id == project_id).first()
+        if not db_project:
+            return None
+        
+        added = project_employees.add(self.db, project_id, add)
+        removed = project_employees.remove(self.db, project_id, remove)
+        self._record_members_changed(db_project, added, removed)
         
         self.db.commit()
-        self.db.refresh(db_project)
+        db_project = self._reload(db_project)
+        MembershipService.invalidate(db_project.organizationId, added | removed)
         return db_project
 
     def delete_project(self, project_id: str) -> Optional[Project]:
@@ -105,8 +157,13 @@ class ProjectService:
         if active_shifts > 0:
             raise ValueError("Cannot delete project with active time tracking sessions")
         
+        assigned = [e.id for e in db_project.employees]
         self.db.delete(db_project)
+        record_event(self.db, db_project.organizationId, "project.deleted", db_project.id, self._payload(db_project, {
+            "employees": assigned
+        }))
         self.db.commit()
+        MembershipService.invalidate(db_project.organizationId, assigned)
         return db_project
 
     def get_project_stats(self, project_id: str) -> ProjectStats:
@@ -0,0 +1,185 @@
+from pathlib import Path
+from sqlalchemy import case, func
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.models.organization import Organization
+from app.models.retention_run import RetentionRun
+from app.models.screenshot import Screenshot
+from app.models.shift import Shift
+from app.services.outbox import record_event
+from app.services.screenshot_service import productivity_cache
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+_DAY_MS = 24 * 60 * 60 * 1000
+
+
+def _now_ms() -> int:
+    return int(datetime.utcnow().timestamp() * 1000)
+
+
+class LocalImageStore:
+    """Screenshot images kept on local disk, addressed by imageUrl"""
+
+    def __init__(self, directory: Optional[str], url_prefix: str):
+        self.directory = Path(directory).resolve() if directory else None
+        self.url_prefix = url_prefix
+
+    def delete(self, image_url: Optional[str]) -> bool:
+        """Remove the file behind an imageUrl; URLs stored elsewhere are left alone"""
+        if not self.directory or not image_url or not image_url.startswith(self.url_prefix):
+            return False
+        path = (self.directory / image_url[len(self.url_prefix):]).resolve()
+        if self.directory not in path.parents:
+            logger.warning(f"Refusing to delete screenshot outside storage: {image_url}")
+            return False
+        try:
+            path.unlink()
+        except FileNotFoundError:
+            return False
+        return True
+
+
+image_store = LocalImageStore(settings.SCREENSHOT_STORAGE_DIR, settings.SCREENSHOT_URL_PREFIX)
+
+
+class RetentionService:
+    """Deletes screenshots past their organization's retention in small batches.
+
+    Each batch deletes rows and bumps Shift.deletedScreenshots in one short
+    transaction, then removes image files. Progress is kept in
+    retention_runs, so an interrupted run resumes with the same cutoff.
+    """
+
+    def __init__(
+        self,
+        db: Session,
+        batch_size: int = None,
+        pause_seconds: float = None,
+        sleep: Callable[[float], None] = time.sleep
+    ):
+        self.db = db
+        self.batch_size = batch_size or settings.RETENTION_BATCH_SIZE
+        self.pause_seconds = settings.RETENTION_BATCH_PAUSE_SECONDS if pause_seconds is None else pause_seconds
+        self.sleep = sleep
+
+    def start_run(self, organization: Organization, now_ms: int = None) -> Optional[RetentionRun]:
+        """The organization's unfinished run, or a new one; None without a retention policy"""
+        run = self.db.query(RetentionRun).filter(
+            RetentionRun.organizationId == organization.id,
+            RetentionRun.status != "completed"
+        ).order_by(RetentionRun.startedAt.desc()).first()
+        if run:
+            run.status = "running"
+            run.error = None
+            self.db.commit()
+            return run
+
+        if organization.screenshotRetentionDays is None:
+            return None
+        now_ms = now_ms if now_ms is not None else _now_ms()
+        run = RetentionRun(
+            organizationId=organization.id,
+            cutoff=now_ms - organization.screenshotRetentionDays * _DAY_MS
+        )
+        self.db.add(run)
+        self.db.commit()
+        self.db.refresh(run)
+        return run
+
+    def purge_batch(self, run: RetentionRun) -> int:
+        """Delete the oldest batch of expired screenshots; returns how many were deleted"""
+        rows = self.db.query(Screenshot.id, Screenshot.shiftId, Screenshot.imageUrl).filter(
+            Screenshot.organizationId == run.organizationId,
+            Screenshot.timestamp < run.cutoff
+        ).order_by(Screenshot.timestamp).limit(self.batch_size).all()
+        if not rows:
+            return 0
+
+        per_shift: Dict[str, int] = {}
+        for row in rows:
+            if row.shiftId:
+                per_shift[row.shiftId] = per_shift.get(row.shiftId, 0) + 1
+        if per_shift:
+            self.db.query(Shift).filter(Shift.id.in_(per_shift)).update({
+                Shift.deletedScreenshots: func.coalesce(Shift.deletedScreenshots, 0) + case(
+                    per_shift, value=Shift.id, else_=0
+                )
+            }, synchronize_session=False)
+
+        self.db.query(Screenshot).filter(
+            Screenshot.id.in_([row.id for row in rows])
+        ).delete(synchronize_session=False)
+        run.deletedScreenshots += len(rows)
+        run.updatedAt = _now_ms()
+        # One event per batch rather than per screenshot
+        record_event(self.db, run.organizationId, "screenshots.purged", None, {
+            "before": run.cutoff,
+            "count": len(rows),
+        })
+        self.db.commit()
+
+        # Files go after the commit: a crash leaves orphaned files, never rows without images
+        deleted_files = sum(image_store.delete(row.imageUrl) for row in rows)
+        if deleted_files:
+            run.deletedFiles += deleted_files
+            self.db.commit()
+        return len(rows)
+
+    def purge_organization(self, organization: Organization, max_batches: int = None, now_ms: int = None) -> Optional[RetentionRun]:
+        """Run (or resume) the organization's purge, stopping early after `max_batches`"""
+        run = None
+        batches = 0
+        try:
+            run = self.start_run(organization, now_ms)
+            if run is None:
+                return None
+            while max_batches is None or batches < max_batches:
+                if self.purge_batch(run) < self.batch_size:
+                    run.status = "completed"
+                    run.finishedAt = _now_ms()
+                    self.db.commit()
+                    break
+                batches += 1
+                if self.pause_seconds:
+                    self.sleep(self.pause_seconds)
+        except Exception as e:
+            self.db.rollback()
+            if run is not None:
+                run.status = "failed"
+                run.error = str(e)[:500]
+                self.db.commit()
+            logger.error(f"Screenshot retention failed for {organization.id}: {str(e)}")
+            raise
+        finally:
+            productivity_cache.invalidate_organization(organization.id)
+        return run
+
+    def purge_all(self, max_batches: int = None, now_ms: int = None) -> List[RetentionRun]:
+        """Purge every organization that has a retention policy or an unfinished run.
+
+        A failing organization is left with a failed run, which the next call
+        resumes, and the others are still purged.
+        """
+        unfinished = self.db.query(RetentionRun.organizationId).filter(RetentionRun.status != "completed")
+        organizations = self.db.query(Organization).filter(
+            Organization.screenshotRetentionDays.isnot(None) | Organization.id.in_(unfinished)
+        ).all()
+        runs = []
+        for organization in organizations:
+            try:
+                run = self.purge_organization(organization, max_batches, now_ms)
+            except Exception:
+                # Already logged and recorded on the run by purge_organization
+                self.db.rollback()
+                run = self.db.query(RetentionRun).filter(
+                    RetentionRun.organizationId == organization.id,
+                    RetentionRun.status == "failed"
+                ).order_by(RetentionRun.startedAt.desc()).first()
+            if run:
+                runs.append(run)
+        return runs
@@ -1,11 +1,18 @@
 from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_
+from sqlalchemy import and_, or_, func
+from app.core.cache import make_cache
+from app.services.outbox import record_event
+from app.core.config import settings
 from app.models.screenshot import Screenshot
 from app.schemas.screenshot import ScreenshotCreate, ScreenshotUpdate, ScreenshotResponse
-from typing import List, Optional
+from datetime import datetime
+from typing import List, Optional, Dict, Any
 import hashlib
 import uuid
 
+# Results for windows that ended in the past, dropped when screenshots change
+productivity_cache = make_cache("productivity", maxsize=settings.PRODUCTIVITY_CACHE_SIZE)
+
 
 class ScreenshotService:
     def __init__(self, db: Session):
@@ -15,7 +22,8 @@ class ScreenshotService:
         self, 
         screenshot_data: ScreenshotCreate, 
         employee_id: str, 
-        organization_id: str
+        organization_id: str,
+        team_id: str = None
     ) -> Screenshot:
         """Create a new screenshot record"""
         db_screenshot = Screenshot(
@@ -23,20 +31,27 @@ class ScreenshotService:
             productivity=screenshot_data.productivity,
             timestamp=screenshot_data.timestamp,
             employeeId=employee_id,
+            teamId=team_id,
             organizationId=organization_id,
             projectId=screenshot_data.projectId,
             taskId=screenshot_data.taskId,
             shiftId=screenshot_data.shiftId,
-            systemPermissions=screenshot_data.systemPermissions or {
-                "accessibility": "undetermined",
-                "screenAndSystemAudioRecording": "undetermined"
-            },
+            systemPermissions=screenshot_data.systemPermissions,  # None means all undetermined
             imageUrl=screenshot_data.imageUrl
         )
         
         self.db.add(db_screenshot)
+        record_event(self.db, organization_id, "screenshot.created", db_screenshot, {
+            "employeeId": employee_id,
+            "shiftId": db_screenshot.shiftId,
+            "projectId": db_screenshot.projectId,
+            "taskId": db_screenshot.taskId,
+            "timestamp": db_screenshot.timestamp,
+            "productivity": db_screenshot.productivity,
+        })
         self.db.commit()
         self.db.refresh(db_screenshot)
+        productivity_cache.invalidate_organization(organization_id)
         return db_screenshot
 
     def get_screenshot(self, screenshot_id: str) -> Optional[Screenshot]:
@@ -169,9 +184,14 @@ class ScreenshotService:
         
         for field, value in update_data.items():
             setattr(db_screenshot, field, value)
+        record_event(self.db, db_screenshot.organizationId, "screenshot.updated", db_screenshot.id, {
+            "employeeId": db_screenshot.employeeId,
+            "fields": sorted(update_data),
+        })
         
         self.db.commit()
         self.db.refresh(db_screenshot)
+        productivity_cache.invalidate_organization(db_screenshot.organizationId)
         return db_screenshot
 
     def delete_screenshot(self, screenshot_id: str) -> Optional[Screenshot]:
@@ -181,5 +201,75 @@ class ScreenshotService:
             return None
         
         self.db.delete(db_screenshot)
+        record_event(self.db, db_screenshot.organizationId, "screenshot.deleted", db_screenshot.id, {
+            "employeeId": db_screenshot.employeeId,
+            "timestamp": db_screenshot.timestamp,
+        })
         self.db.commit()
-        return db_screenshot
\ No newline at end of file
+        productivity_cache.invalidate_organization(db_screenshot.organizationId)
+        return db_screenshot
+
+    def get_productivity_analytics(
+        self,
+        organization_id: str,
+        start_time: int,
+        end_time: int,
+        employee_id: str = None,
+        team_id: str = None,
+        project_id: str = None,
+        top_sites: int = 10
+    ) -> Dict[str, Any]:
+        """Get productivity averages and top sites from grouped aggregates"""
+        cache_key = (organization_id, start_time, end_time, employee_id, team_id, project_id, top_sites)
+        # Only windows that are already over are stable enough to cache
+        closed = end_time < int(datetime.utcnow().timestamp() * 1000)
+        if closed:
+            cached = productivity_cache.get(cache_key)
+            if cached is not None:
+                return cached
+        
+        conditions = [
+            Screenshot.organizationId == organization_id,
+            Screenshot.timestamp >= start_time,
+            Screenshot.timestamp <= end_time
+        ]
+        if employee_id:
+            conditions.append(Screenshot.employeeId == employee_id)
+        if team_id:
+            conditions.append(Screenshot.teamId == team_id)
+        if project_id:
+            conditions.append(Screenshot.projectId == project_id)
+        
+        average = func.avg(Screenshot.productivity)
+        count = func.count(Screenshot.id)
+        
+        def grouped(column) -> List[Dict[str, Any]]:
+            rows = self.db.query(column, average, count).filter(
+                and_(*conditions, column.isnot(None))
+            ).group_by(column).order_by(count.desc()).all()
+            return [
+                {"id": group_id, "averageProductivity": float(avg or 0), "screenshotCount": total}
+                for group_id, avg, total in rows
+            ]
+        
+        overall_average, overall_count = self.db.query(average, count).filter(and_(*conditions)).one()
+        
+        sites = self.db.query(Screenshot.site, count, average).filter(
+            and_(*conditions, Screenshot.site.isnot(None))
+        ).group_by(Screenshot.site).order_by(count.desc(), Screenshot.site).limit(top_sites).all()
+        
+        result = {
+            "averageProductivity": float(overall_average or 0),
+            "screenshotCount": overall_count,
+            "byEmployee": grouped(Screenshot.employeeId),
+            "byTeam": grouped(Screenshot.teamId),
+            "byProject": grouped(Screenshot.projectId),
+            "topSites": [
+                {"site": site, "screenshotCount": total, "averageProductivity": float(avg or 0)}
+                for site, total, avg in sites
+            ]
+        }
+        
+        if closed:
+            productivity_cache.set(cache_key, result)
+        return result
\ No newline at end of file
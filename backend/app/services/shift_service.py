@@ -1,10 +1,17 @@
 from sqlalchemy.orm import Session
-from sqlalchemy import and_, func, or_
+from sqlalchemy import and_, case, func, or_
 from app.models.shift import Shift
 from app.models.employee import Employee
 from app.schemas.shift import ShiftCreate, ShiftUpdate, ShiftStart
+from app.services.time_buckets import get_zone, bucket_boundaries, covered_time
+from app.services.shift_store import shift_store
+from app.services.interval_index import IntervalIndex, merge_per_key
+from app.services.outbox import record_event
 from datetime import datetime
 from typing import List, Optional, Dict, Any
+import numpy as np
+
+MAX_CONCURRENCY_POINTS = 20000
 
 
 class ShiftService:
@@ -41,6 +48,12 @@ class ShiftService:
         )
         
         self.db.add(db_shift)
+        record_event(self.db, organization_id, "shift.started", db_shift, {
+            "employeeId": employee_id,
+            "projectId": db_shift.projectId,
+            "taskId": db_shift.taskId,
+            "start": current_time,
+        })
         self.db.commit()
         self.db.refresh(db_shift)
         return db_shift
@@ -62,9 +75,15 @@ class ShiftService:
         db_shift.endTranslated = current_time + db_shift.timezoneOffset
         db_shift.lastActivityEnd = current_time
         db_shift.lastActivityEndTranslated = current_time + db_shift.timezoneOffset
+        record_event(self.db, db_shift.organizationId, "shift.ended", db_shift.id, {
+            "employeeId": employee_id,
+            "start": db_shift.start,
+            "end": current_time,
+        })
         
         self.db.commit()
         self.db.refresh(db_shift)
+        shift_store.append(db_shift)
         return db_shift
 
     def get_active_shift(self, employee_id: str) -> Optional[Shift]:
@@ -123,13 +142,19 @@ class ShiftService:
         
         for field, value in update_data.items():
             setattr(db_shift, field, value)
+        record_event(self.db, db_shift.organizationId, "shift.updated", db_shift.id, {
+            "employeeId": employee_id,
+            "fields": sorted(update_data),
+        })
         
         self.db.commit()
         self.db.refresh(db_shift)
+        shift_store.invalidate(db_shift.organizationId)
         return db_shift
 
-    def get_project_time_analytics(
+    def _overlapping(
         self,
+        query,
         organization_id: str,
         start_time: int,
         end_time: int,
@@ -137,15 +162,20 @@ class ShiftService:
         team_id: str = None,
         project_id: str = None,
         task_id: str = None,
-        shift_id: str = None
-    ) -> Dict[str, Any]:
-        """Get project time analytics"""
-        query = self.db.query(Shift).filter(
+        shift_id: str = None,
+        include_active: bool = False
+    ):
+        """Restrict a query to shifts overlapping [start_time, end_time)"""
+        if include_active:
+            still_running = or_(Shift.end.is_(None), Shift.end > start_time)
+        else:
+            still_running = and_(Shift.end.isnot(None), Shift.end > start_time)
+        
+        query = query.filter(
             and_(
                 Shift.organizationId == organization_id,
-                Shift.start >= start_time,
-                or_(Shift.end <= end_time, Shift.end.is_(None)),
-                Shift.end.isnot(None)  # Only completed shifts
+                Shift.start < end_time,
+                still_running
             )
         )
         
@@ -164,42 +194,200 @@ class ShiftService:
         if shift_id:
             query = query.filter(Shift.id == shift_id)
         
-        shifts = query.all()
+        return query
+
+    def get_project_time_analytics(
+        self,
+        organization_id: str,
+        start_time: int,
+        end_time: int,
+        employee_id: str = None,
+        team_id: str = None,
+        project_id: str = None,
+        task_id: str = None,
+        shift_id: str = None
+    ) -> Dict[str, Any]:
+        """Get project time analytics"""
+        if shift_store.enabled and not shift_id:
+            columns = shift_store.get(self.db, organization_id)
+            return columns.project_time_analytics(
+                start_time, end_time,
+                employee_id=employee_id,
+                team_id=team_id,
+                project_id=project_id,
+                task_id=task_id
+            )
+        
+        # Shifts crossing the window edges only count the part inside it
+        clipped_start = case((Shift.start < start_time, start_time), else_=Shift.start)
+        clipped_end = case((Shift.end > end_time, end_time), else_=Shift.end)
+        
+        query = self.db.query(
+            Shift.projectId,
+            Shift.taskId,
+            func.sum(clipped_end - clipped_start),
+            func.count(Shift.id)
+        )
+        query = self._overlapping(
+            query, organization_id, start_time, end_time,
+            employee_id=employee_id,
+            team_id=team_id,
+            project_id=project_id,
+            task_id=task_id,
+            shift_id=shift_id
+        )
+        rows = query.group_by(Shift.projectId, Shift.taskId).all()
         
-        # Calculate analytics
-        total_time = sum((shift.end - shift.start) for shift in shifts if shift.end)
-        total_shifts = len(shifts)
+        total_time = sum(int(row_time) for _, _, row_time, _ in rows)
+        total_shifts = sum(row_count for _, _, _, row_count in rows)
         
-        # Group by project
+        # Group by project, then by task within project
         project_breakdown = {}
-        for shift in shifts:
-            if shift.projectId:
-                if shift.projectId not in project_breakdown:
-                    project_breakdown[shift.projectId] = {
-                        "totalTime": 0,
-                        "shiftCount": 0,
-                        "tasks": {}
-                    }
-                
-                shift_time = shift.end - shift.start if shift.end else 0
-                project_breakdown[shift.projectId]["totalTime"] += shift_time
-                project_breakdown[shift.projectId]["shiftCount"] += 1
-                
-                # Group by task within project
-                if shift.taskId:
-                    task_id = shift.taskId
-                    if task_id not in project_breakdown[shift.projectId]["tasks"]:
-                        project_breakdown[shift.projectId]["tasks"][task_id] = {
-                            "totalTime": 0,
-                            "shiftCount": 0
-                        }
-                    
-                    project_breakdown[shift.projectId]["tasks"][task_id]["totalTime"] += shift_time
-                    project_breakdown[shift.projectId]["tasks"][task_id]["shiftCount"] += 1
+        for row_project_id, row_task_id, row_time, row_count in rows:
+            if not row_project_id:
+                continue
+            
+            project = project_breakdown.setdefault(row_project_id, {
+                "totalTime": 0,
+                "shiftCount": 0,
+                "tasks": {}
+            })
+            project["totalTime"] += int(row_time)
+            project["shiftCount"] += row_count
+            
+            if row_task_id:
+                project["tasks"][row_task_id] = {
+                    "totalTime": int(row_time),
+                    "shiftCount": row_count
+                }
         
         return {
             "totalTime": total_time,
             "totalShifts": total_shifts,
             "projectBreakdown": project_breakdown,
             "averageShiftDuration": total_time / total_shifts if total_shifts > 0 else 0
-        }
\ No newline at end of file
+        }
+
+    def get_time_series(
+        self,
+        organization_id: str,
+        start_time: int,
+        end_time: int,
+        interval: str = "day",
+        timezone: str = None,
+        employee_id: str = None,
+        team_id: str = None,
+        project_id: str = None,
+        task_id: str = None
+    ) -> Dict[str, Any]:
+        """Get tracked time bucketed by local hour/day/week"""
+        zone = get_zone(timezone)
+        edges = bucket_boundaries(start_time, end_time, interval, zone)
+        
+        query = self._overlapping(
+            self.db.query(Shift.start, Shift.end), organization_id, start_time, end_time,
+            employee_id=employee_id,
+            team_id=team_id,
+            project_id=project_id,
+            task_id=task_id
+        )
+        
+        rows = np.array(query.all(), dtype=np.int64).reshape(-1, 2)
+        
+        # Only count time inside the requested window
+        points = np.clip(np.array(edges, dtype=np.int64), start_time, end_time)
+        totals = np.diff(covered_time(rows[:, 0], rows[:, 1], points))
+        
+        buckets = [
+            {
+                "start": edges[i],
+                "end": edges[i + 1],
+                "label": datetime.fromtimestamp(edges[i] / 1000, zone).isoformat(),
+                "totalTime": int(totals[i])
+            }
+            for i in range(len(totals))
+        ]
+        
+        return {
+            "interval": interval,
+            "timezone": zone.key,
+            "totalTime": int(totals.sum()),
+            "buckets": buckets
+        }
+
+    def get_concurrency(
+        self,
+        organization_id: str,
+        start_time: int,
+        end_time: int,
+        step: int = 60000,
+        team_id: str = None,
+        project_id: str = None,
+        task_id: str = None
+    ) -> Dict[str, Any]:
+        """Get the number of employees clocked in at each step of a window"""
+        if end_time <= start_time:
+            raise ValueError("End time must be after start time")
+        if (end_time - start_time) / step > MAX_CONCURRENCY_POINTS:
+            raise ValueError(f"Window spans more than {MAX_CONCURRENCY_POINTS} points, use a larger step")
+        
+        now = int(datetime.utcnow().timestamp() * 1000)
+        query = self._overlapping(
+            self.db.query(Shift.employeeId, Shift.start, func.coalesce(Shift.end, now)),
+            organization_id, start_time, end_time,
+            team_id=team_id,
+            project_id=project_id,
+            task_id=task_id,
+            include_active=True
+        )
+        # Overlapping shifts of the same employee count once
+        index = IntervalIndex(*merge_per_key(query.all()))
+        
+        points = np.arange(start_time, end_time, step, dtype=np.int64)
+        counts = index.counts_at(points)
+        peak, peak_at = index.peak(start_time, end_time)
+        
+        return {
+            "step": step,
+            "peak": peak,
+            "peakAt": peak_at,
+            "points": [
+                {"time": int(point), "count": int(count)}
+                for point, count in zip(points, counts)
+            ]
+        }
+
+    def get_roster(
+        self,
+        organization_id: str,
+        at: int,
+        team_id: str = None,
+        project_id: str = None,
+        task_id: str = None
+    ) -> Dict[str, Any]:
+        """Get who was clocked in at a point in time"""
+        # A stabbing query is an overlap with [at, at + 1), served by the start/end index
+        query = self._overlapping(
+            self.db.query(Shift.id, Shift.employeeId, Shift.projectId, Shift.taskId, Shift.start),
+            organization_id, at, at + 1,
+            team_id=team_id,
+            project_id=project_id,
+            task_id=task_id,
+            include_active=True
+        )
+        
+        employees = {}
+        for shift_id, employee_id, row_project_id, row_task_id, start in query.order_by(Shift.start).all():
+            employees.setdefault(employee_id, {
+                "employeeId": employee_id,
+                "shiftId": shift_id,
+                "projectId": row_project_id,
+                "taskId": row_task_id,
+                "start": start
+            })
+        
+        return {
+            "at": at,
+            "count": len(employees),
+            "employees": list(employees.values())
+        }
@@ -0,0 +1,274 @@
+from collections import OrderedDict
+from sqlalchemy import and_
+from sqlalchemy.orm import Session
+from app.core.cache import caches
+from app.core.config import settings
+from app.models.shift import Shift
+from typing import Dict, Any, Iterable, Optional, Set, Tuple
+import numpy as np
+import threading
+import time
+
+# Rough per-entry cost of the id dictionaries (string + dict slot + list slot)
+_DICTIONARY_ENTRY_BYTES = 160
+# Shifts that ended this long before a load may still be appended after it
+# (end_shift commits, then appends); their ids are kept to skip those appends
+_RECENT_END_MS = 10 * 60 * 1000
+
+
+class _Dictionary:
+    """Dictionary encoding for id columns; code 0 is reserved for None"""
+
+    def __init__(self):
+        self.codes: Dict[str, int] = {}
+        self.values: list = [None]
+
+    def encode(self, value: Optional[str]) -> int:
+        if value is None:
+            return 0
+        code = self.codes.get(value)
+        if code is None:
+            code = len(self.values)
+            self.codes[value] = code
+            self.values.append(value)
+        return code
+
+    def lookup(self, value: str) -> int:
+        """Code for an existing value, or -1 so that filters match nothing"""
+        return self.codes.get(value, -1)
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+
+class OrgShiftColumns:
+    """Closed shifts of one organization stored as NumPy columns"""
+
+    ID_COLUMNS = ("employee", "team", "project", "task")
+
+    def __init__(self, capacity: int = 1024):
+        self.size = 0
+        self.loaded_at = time.monotonic()
+        self.start = np.empty(capacity, dtype=np.int64)
+        self.end = np.empty(capacity, dtype=np.int64)
+        self.codes = {name: np.empty(capacity, dtype=np.int32) for name in self.ID_COLUMNS}
+        self.dictionaries = {name: _Dictionary() for name in self.ID_COLUMNS}
+        # Ids of loaded shifts that ended shortly before the load
+        self.recent_ids: Set[str] = set()
+
+    @property
+    def nbytes(self) -> int:
+        arrays = self.start.nbytes + self.end.nbytes + sum(a.nbytes for a in self.codes.values())
+        entries = sum(len(d) for d in self.dictionaries.values()) + len(self.recent_ids)
+        return arrays + entries * _DICTIONARY_ENTRY_BYTES
+
+    def _reserve(self, extra: int) -> None:
+        needed = self.size + extra
+        capacity = len(self.start)
+        if needed <= capacity:
+            return
+        while capacity < needed:
+            capacity *= 2
+        self.start = np.resize(self.start, capacity)
+        self.end = np.resize(self.end, capacity)
+        self.codes = {name: np.resize(a, capacity) for name, a in self.codes.items()}
+
+    def extend(self, rows: Iterable[Tuple[int, int, str, str, str, str]]) -> None:
+        """Append (start, end, employeeId, teamId, projectId, taskId) rows"""
+        rows = list(rows)
+        if not rows:
+            return
+        self._reserve(len(rows))
+        n, i = len(rows), self.size
+        self.start[i:i + n] = [row[0] for row in rows]
+        self.end[i:i + n] = [row[1] for row in rows]
+        for offset, name in enumerate(self.ID_COLUMNS, start=2):
+            encode = self.dictionaries[name].encode
+            self.codes[name][i:i + n] = [encode(row[offset]) for row in rows]
+        self.size += n
+
+    def project_time_analytics(
+        self,
+        start_time: int,
+        end_time: int,
+        employee_id: str = None,
+        team_id: str = None,
+        project_id: str = None,
+        task_id: str = None
+    ) -> Dict[str, Any]:
+        """Same result as ShiftService.get_project_time_analytics, from memory"""
+        start = self.start[:self.size]
+        end = self.end[:self.size]
+        mask = (start < end_time) & (end > start_time)
+        for name, value in zip(self.ID_COLUMNS, (employee_id, team_id, project_id, task_id)):
+            if value:
+                mask &= self.codes[name][:self.size] == self.dictionaries[name].lookup(value)
+
+        clipped = np.minimum(end[mask], end_time) - np.maximum(start[mask], start_time)
+        projects = self.codes["project"][:self.size][mask]
+        tasks = self.codes["task"][:self.size][mask]
+
+        total_time = int(clipped.sum())
+        total_shifts = int(mask.sum())
+
+        project_values = self.dictionaries["project"].values
+        task_values = self.dictionaries["task"].values
+        project_times = np.bincount(projects, weights=clipped, minlength=len(project_values))
+        project_counts = np.bincount(projects, minlength=len(project_values))
+
+        project_breakdown = {}
+        for code in np.flatnonzero(project_counts[1:]) + 1:
+            project_breakdown[project_values[code]] = {
+                "totalTime": int(project_times[code]),
+                "shiftCount": int(project_counts[code]),
+                "tasks": {}
+            }
+
+        # Group by (project, task) pairs through a combined key
+        with_task = (projects > 0) & (tasks > 0)
+        pairs = projects[with_task].astype(np.int64) * len(task_values) + tasks[with_task]
+        keys, inverse = np.unique(pairs, return_inverse=True)
+        pair_times = np.bincount(inverse, weights=clipped[with_task], minlength=len(keys))
+        pair_counts = np.bincount(inverse, minlength=len(keys))
+        for key, pair_time, pair_count in zip(keys, pair_times, pair_counts):
+            project_code, task_code = divmod(int(key), len(task_values))
+            project_breakdown[project_values[project_code]]["tasks"][task_values[task_code]] = {
+                "totalTime": int(pair_time),
+                "shiftCount": int(pair_count)
+            }
+
+        return {
+            "totalTime": total_time,
+            "totalShifts": total_shifts,
+            "projectBreakdown": project_breakdown,
+            "averageShiftDuration": total_time / total_shifts if total_shifts > 0 else 0
+        }
+
+
+class ShiftColumnStore:
+    """Lazily loaded per-organization column cache with an LRU memory budget.
+
+    Loads run outside the store-wide lock, so one large organization does not
+    hold up requests for others; a per-organization lock makes concurrent
+    requests for the same one wait for a single load. A load that overlaps
+    an append or invalidation of its organization is used once but not kept.
+    """
+
+    LOAD_BATCH_SIZE = 10000
+
+    def __init__(self, enabled: bool, memory_budget_bytes: int, max_age_seconds: int):
+        self.enabled = enabled
+        self.memory_budget_bytes = memory_budget_bytes
+        self.max_age_seconds = max_age_seconds
+        self.hits = 0
+        self.misses = 0
+        self._orgs: "OrderedDict[str, OrgShiftColumns]" = OrderedDict()
+        self._lock = threading.Lock()
+        # Organizations being loaded, and those changed while loading
+        self._loading: Dict[str, threading.Lock] = {}
+        self._stale: Set[str] = set()
+
+    def _cached(self, organization_id: str) -> Optional[OrgShiftColumns]:
+        columns = self._orgs.get(organization_id)
+        if columns and time.monotonic() - columns.loaded_at < self.max_age_seconds:
+            self._orgs.move_to_end(organization_id)
+            self.hits += 1
+            return columns
+        return None
+
+    def get(self, db: Session, organization_id: str) -> OrgShiftColumns:
+        """Columns for an organization, loading them from the database if needed"""
+        with self._lock:
+            columns = self._cached(organization_id)
+            if columns:
+                return columns
+            loading = self._loading.setdefault(organization_id, threading.Lock())
+
+        with loading:
+            with self._lock:
+                # Loaded by the request this one waited for
+                columns = self._cached(organization_id)
+                if columns:
+                    return columns
+                self.misses += 1
+                self._loading[organization_id] = loading
+                self._stale.discard(organization_id)
+            columns = None
+            try:
+                columns = self._load(db, organization_id)
+            finally:
+                with self._lock:
+                    if columns is not None and organization_id not in self._stale:
+                        self._orgs[organization_id] = columns
+                        self._evict()
+                    self._stale.discard(organization_id)
+                    if self._loading.get(organization_id) is loading:
+                        del self._loading[organization_id]
+            return columns
+
+    def append(self, shift: Shift) -> None:
+        """Add a just-closed shift to its organization, if it is loaded"""
+        with self._lock:
+            if shift.organizationId in self._loading:
+                self._stale.add(shift.organizationId)
+            columns = self._orgs.get(shift.organizationId)
+            # Loaded after the shift's commit, so already counted
+            if columns is None or shift.id in columns.recent_ids:
+                return
+            columns.extend([(
+                shift.start, shift.end, shift.employeeId,
+                shift.teamId, shift.projectId, shift.taskId
+            )])
+            self._evict()
+
+    def invalidate(self, organization_id: str = None) -> None:
+        """Drop one organization, or everything"""
+        with self._lock:
+            if organization_id is None:
+                self._orgs.clear()
+                self._stale.update(self._loading)
+            else:
+                self._orgs.pop(organization_id, None)
+                if organization_id in self._loading:
+                    self._stale.add(organization_id)
+
+    @property
+    def nbytes(self) -> int:
+        return sum(columns.nbytes for columns in self._orgs.values())
+
+    def __len__(self) -> int:
+        return len(self._orgs)
+
+    def _load(self, db: Session, organization_id: str) -> OrgShiftColumns:
+        columns = OrgShiftColumns()
+        recent = int(time.time() * 1000) - _RECENT_END_MS
+        query = db.query(
+            Shift.id, Shift.start, Shift.end, Shift.employeeId,
+            Shift.teamId, Shift.projectId, Shift.taskId
+        ).filter(
+            and_(Shift.organizationId == organization_id, Shift.end.isnot(None))
+        ).yield_per(self.LOAD_BATCH_SIZE)
+
+        batch = []
+        for row in query:
+            if row.end >= recent:
+                columns.recent_ids.add(row.id)
+            batch.append(tuple(row)[1:])
+            if len(batch) >= self.LOAD_BATCH_SIZE:
+                columns.extend(batch)
+                batch = []
+        columns.extend(batch)
+        return columns
+
+    def _evict(self) -> None:
+        # Always keep the most recently used organization
+        while len(self._orgs) > 1 and self.nbytes > self.memory_budget_bytes:
+            self._orgs.popitem(last=False)
+
+
+shift_store = ShiftColumnStore(
+    enabled=settings.SHIFT_STORE_ENABLED,
+    memory_budget_bytes=settings.SHIFT_STORE_MEMORY_BUDGET_MB * 1024 * 1024,
+    max_age_seconds=settings.SHIFT_STORE_MAX_AGE_SECONDS
+)
+caches["shift_store"] = shift_store
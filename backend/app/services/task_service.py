@@ -1,17 +1,40 @@
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, selectinload
 from sqlalchemy import and_
-from app.models.task import Task
+from app.models.task import Task, task_employees
 from app.models.employee import Employee
 from app.models.team import Team
 from app.models.shift import Shift
 from app.schemas.task import TaskCreate, TaskUpdate
-from typing import List, Optional
+from app.services.associations import Association
+from app.services.membership_service import MembershipService
+from app.services.outbox import record_event
+from typing import Iterable, List, Optional
+
+task_employee_links = Association(task_employees, "taskId", "employeeId", Employee)
 
 
 class TaskService:
     def __init__(self, db: Session):
         self.db = db
 
+    def _query(self):
+        # Task responses include employee and team ids
+        return self.db.query(Task).options(selectinload(Task.employees), selectinload(Task.teams))
+
+    def _reload(self, task: Task) -> Task:
+        """Reload after a commit, which expires the eagerly loaded collections"""
+        return self._query().populate_existing().filter(Task.id == task.id).one()
+
+    def _payload(self, task: Task, extra: dict) -> dict:
+        return {"name": task.name, "projectId": task.projectId, **extra}
+
+    def _record_members_changed(self, task: Task, added: Iterable[str], removed: Iterable[str]) -> None:
+        if added or removed:
+            record_event(self.db, task.organizationId, "task.members_changed", task.id, self._payload(task, {
+                "added": sorted(added),
+                "removed": sorted(removed),
+            }))
+
     def create_task(self, task_data: TaskCreate, creator_id: str, organization_id: str) -> Task:
         """Create a new task"""
         db_task = Task(
@@ -27,10 +50,6 @@ class TaskService:
             organizationId=organization_id
         )
         
-        self.db.add(db_task)
-        self.db.commit()
-        self.db.refresh(db_task)
-        
         # Add employees if specified
         if task_data.employees:
             employees = self.db.query(Employee).filter(Employee.id.in_(task_data.employees)).all()
@@ -41,49 +60,83 @@ class TaskService:
             teams = self.db.query(Team).filter(Team.id.in_(task_data.teams)).all()
             db_task.teams.extend(teams)
         
+        self.db.add(db_task)
+        record_event(self.db, db_task.organizationId, "task.created", db_task, self._payload(db_task, {
+            "employees": [e.id for e in db_task.employees]
+        }))
         self.db.commit()
-        return db_task
+        return self._reload(db_task)
 
     def get_task(self, task_id: str) -> Optional[Task]:
         """Get task by ID"""
-        return self.db.query(Task).filter(Task.id == task_id).first()
+        return self._query().filter(Task.id == task_id).first()
 
     def get_tasks(self, organization_id: str, project_id: str = None, skip: int = 0, limit: int = 100) -> List[Task]:
         """Get tasks for an organization, optionally filtered by project"""
-        query = self.db.query(Task).filter(Task.organizationId == organization_id)
+        query = self._query().filter(Task.organizationId == organization_id)
         
         if project_id:
             query = query.filter(Task.projectId == project_id)
         
         return query.offset(skip).limit(limit).all()
 
-    def get_user_tasks(self, employee_id: str, skip: int = 0, limit: int = 100) -> List[Task]:
-        """Get tasks assigned to a specific employee"""
-        return self.db.query(Task).join(Task.employees).filter(
-            Employee.id == employee_id
-        ).offset(skip).limit(limit).all()
+    def get_user_tasks(
+        self, employee_id: str, skip: int = 0, limit: Optional[int] = 100, ids: Iterable[str] = None
+    ) -> List[Task]:
+        """Get tasks assigned to a specific employee, optionally only those in `ids`"""
+        query = self._query().join(Task.employees).filter(Employee.id == employee_id)
+        if ids is not None:
+            query = query.filter(Task.id.in_(list(ids)))
+        return query.order_by(Task.id).offset(skip).limit(limit).all()
 
     def update_task(self, task_id: str, task_data: TaskUpdate) -> Optional[Task]:
         """Update task"""
-        db_task = self.get_task(task_id)
+        # Collections are edited through the association tables, so only the row is loaded
+        db_task = self.db.query(Task).filter(Task.id == task_id).first()
         if not db_task:
             return None
         
         update_data = task_data.dict(exclude_unset=True)
+        fields = sorted(field for field in update_data if field != "employees")
         
-        # Handle employees update
+        # Handle employees update, touching only the changed rows
+        added = removed = reassigned = set()
         if "employees" in update_data:
-            employee_ids = update_data.pop("employees")
-            employees = self.db.query(Employee).filter(Employee.id.in_(employee_ids)).all()
-            db_task.employees.clear()
-            db_task.employees.extend(employees)
+            added, removed = task_employee_links.replace(self.db, task_id, update_data.pop("employees"))
+            reassigned = added | removed
         
         # Update other fields
         for field, value in update_data.items():
             setattr(db_task, field, value)
+        self._record_members_changed(db_task, added, removed)
+        if fields:
+            record_event(self.db, db_task.organizationId, "task.updated", db_task.id, self._payload(db_task, {
+                "fields": fields
+            }))
+        
+        self.db.commit()
+        db_task = self._reload(db_task)
+        MembershipService.invalidate(db_task.organizationId, reassigned)
+        return db_task
+
+    def update_members(
+        self,
+        task_id: str,
+        add: Iterable[str] = (),
+        remove: Iterable[str] = ()
+    ) -> Optional[Task]:
+        """Add and remove employees without replacing the whole member list"""
+        db_task = self.db.query(Task).filter(Task.id == task_id).first()
+        if not db_task:
+            return None
+        
+        added = task_employee_links.add(self.db, task_id, add)
+        removed = task_employee_links.remove(self.db, task_id, remove)
+        self._record_members_changed(db_task, added, removed)
         
         self.db.commit()
-        self.db.refresh(db_task)
+        db_task = self._reload(db_task)
+        MembershipService.invalidate(db_task.organizationId, added | removed)
         return db_task
 
     def delete_task(self, task_id: str) -> Optional[Task]:
@@ -100,6 +153,11 @@ class TaskService:
         if active_shifts > 0:
             raise ValueError("Cannot delete task with active time tracking sessions")
         
+        assigned = [e.id for e in db_task.employees]
         self.db.delete(db_task)
+        record_event(self.db, db_task.organizationId, "task.deleted", db_task.id, self._payload(db_task, {
+            "employees": assigned
+        }))
         self.db.commit()
+        MembershipService.invalidate(db_task.organizationId, assigned)
         return db_task
\ No newline at end of file
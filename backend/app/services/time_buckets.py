@@ -0,0 +1,75 @@
+from datetime import datetime, timedelta, time
+from typing import List
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+import numpy as np
+
+BUCKET_INTERVALS = ("hour", "day", "week")
+MAX_BUCKETS = 5000
+
+
+def get_zone(timezone: str = None) -> ZoneInfo:
+    """Resolve an IANA timezone name, defaulting to UTC"""
+    try:
+        return ZoneInfo(timezone or "UTC")
+    except (ZoneInfoNotFoundError, ValueError):
+        raise ValueError(f"Unknown timezone: {timezone}")
+
+
+def _floor_local(ts_ms: int, interval: str, zone: ZoneInfo) -> int:
+    """Floor a timestamp to the start of its local hour/day/week"""
+    local = datetime.fromtimestamp(ts_ms / 1000, zone)
+    if interval == "hour":
+        # Keeps `fold`, so the repeated hour of a DST fall-back stays distinct
+        floored = local.replace(minute=0, second=0, microsecond=0)
+    else:
+        day = local.date()
+        if interval == "week":
+            day -= timedelta(days=day.weekday())
+        floored = datetime.combine(day, time(0), tzinfo=zone)
+    return int(floored.timestamp() * 1000)
+
+
+def _next_boundary(boundary_ms: int, interval: str, zone: ZoneInfo) -> int:
+    """Start of the local bucket following the one starting at boundary_ms"""
+    if interval == "hour":
+        # Step in absolute time so 23/25-hour days produce 23/25 buckets
+        return _floor_local(boundary_ms + 3600000, interval, zone)
+    local = datetime.fromtimestamp(boundary_ms / 1000, zone)
+    step = timedelta(days=7 if interval == "week" else 1)
+    return int(datetime.combine(local.date() + step, time(0), tzinfo=zone).timestamp() * 1000)
+
+
+def bucket_boundaries(start_ms: int, end_ms: int, interval: str, zone: ZoneInfo) -> List[int]:
+    """Bucket edges (UTC milliseconds) covering [start_ms, end_ms) in local time"""
+    if interval not in BUCKET_INTERVALS:
+        raise ValueError(f"Unsupported interval: {interval}")
+    if end_ms <= start_ms:
+        raise ValueError("End time must be after start time")
+
+    edges = [_floor_local(start_ms, interval, zone)]
+    while edges[-1] < end_ms:
+        if len(edges) > MAX_BUCKETS:
+            raise ValueError(f"Time range spans more than {MAX_BUCKETS} {interval} buckets")
+        edges.append(_next_boundary(edges[-1], interval, zone))
+    return edges
+
+
+def covered_time(starts: np.ndarray, ends: np.ndarray, points: np.ndarray) -> np.ndarray:
+    """Total interval time elapsed before each point.
+
+    For every point t this is sum(clip(t - start, 0, end - start)) over all
+    intervals, computed with two sorted prefix sums instead of an n*m scan.
+    Differences of consecutive points give per-bucket totals with intervals
+    that cross bucket edges split exactly.
+    """
+    starts = np.sort(starts.astype(np.int64))
+    ends = np.sort(ends.astype(np.int64))
+    points = points.astype(np.int64)
+
+    start_prefix = np.concatenate(([0], np.cumsum(starts)))
+    end_prefix = np.concatenate(([0], np.cumsum(ends)))
+
+    started = np.searchsorted(starts, points, side="right")
+    ended = np.searchsorted(ends, points, side="right")
+
+    return (points * started - start_prefix[started]) - (points * ended - end_prefix[ended])
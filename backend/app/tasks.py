@@ -0,0 +1,83 @@
+"""
+Background tasks, registered with app.core.jobs.
+
+Imported by the API (to enqueue) and by the Celery worker (to run).
+"""
+from app.core.jobs import JobContext, task
+from app.models.organization import Organization
+from app.services.bulk_invite_service import BulkInviteService
+from app.services.email_queue import email_queue
+from app.services.outbox import outbox_dispatcher, prune_events
+from app.services.partition_service import PartitionService
+from app.services.retention_service import RetentionService
+from typing import Any, Dict, List
+import os
+
+
+@task("retention.purge", admin=True)
+def purge_screenshots(ctx: JobContext, max_batches: int = None) -> List[Dict[str, Any]]:
+    """Screenshots past retention, for the job's organization or (system jobs) all of them"""
+    service = RetentionService(ctx.db)
+    if ctx.organization_id:
+        organization = ctx.db.query(Organization).filter(Organization.id == ctx.organization_id).one()
+        runs = [run for run in [service.purge_organization(organization, max_batches)] if run]
+    else:
+        runs = service.purge_all(max_batches)
+    return [
+        {
+            "organizationId": run.organizationId,
+            "status": run.status,
+            "deletedScreenshots": run.deletedScreenshots,
+            "deletedFiles": run.deletedFiles,
+        }
+        for run in runs
+    ]
+
+
+@task("partitions.maintain")
+def maintain_partitions(ctx: JobContext, months_ahead: int = None, detach_only: bool = False) -> Dict[str, Any]:
+    return PartitionService(ctx.db).run_maintenance(months_ahead, detach_only)
+
+
+@task("email.deliver")
+def deliver_emails(ctx: JobContext) -> Dict[str, int]:
+    """Send due queued emails until a poll comes back short of a full batch"""
+    totals = {"sent": 0, "retrying": 0, "dead": 0}
+    while True:
+        counts = email_queue.run_once()
+        for outcome, count in counts.items():
+            totals[outcome] += count
+        if sum(counts.values()) < email_queue.batch_size:
+            return totals
+
+
+@task("outbox.dispatch")
+def dispatch_outbox(ctx: JobContext) -> int:
+    """Hand new outbox events to the dispatcher's consumers until they are caught up"""
+    total = 0
+    while True:
+        delivered = outbox_dispatcher.run_once()
+        total += delivered
+        if not delivered:
+            return total
+
+
+@task("outbox.prune")
+def prune_outbox(ctx: JobContext, retention_days: int = None) -> int:
+    return prune_events(ctx.db, retention_days)
+
+
+def _remove_upload(params: Dict[str, Any]) -> None:
+    """Delete the upload of a bulk invitation whose worker died before it could"""
+    if params.get("path") and os.path.exists(params["path"]):
+        os.remove(params["path"])
+
+
+@task("employees.bulk_invite", cleanup=_remove_upload)
+def bulk_invite(ctx: JobContext, path: str, fmt: str) -> Dict[str, int]:
+    """Invite the employees in an upload saved by spool_upload, then delete it"""
+    try:
+        with open(path, "rb") as upload:
+            return BulkInviteService(ctx.db).run(ctx, upload, fmt)
+    finally:
+        os.remove(path)
@@ -1,3 +1,11 @@
+import os
+
+# Emails go to an in-memory transport; tests run the queue themselves
+os.environ.setdefault("EMAIL_TRANSPORT", "fake")
+os.environ.setdefault("EMAIL_QUEUE_WORKER", "false")
+# Jobs run inline when enqueued
+os.environ.setdefault("JOB_BACKEND", "eager")
+
 import pytest
 from fastapi.testclient import TestClient
 from sqlalchemy import create_engine
@@ -7,6 +15,7 @@ from app.db.database import Base, get_db
 from app.main import app
 from app.models import *
 from app.core.security import create_access_token, get_password_hash
+from app.core.instrumentation import track_queries
 from datetime import datetime
 
 # Create test database
@@ -33,10 +42,13 @@ def db():
 
 
 def override_get_db():
-    # Create tables if they don't exist
-    Base.metadata.create_all(bind=engine)
+    # Create tables if they don't exist, outside of the request's query count
+    with track_queries():
+        Base.metadata.create_all(bind=engine)
     try:
         db = TestingSessionLocal()
+        # Accidental lazy loads (N+1) fail requests under test
+        db.info["strict_loading"] = True
         yield db
     finally:
         db.close()
@@ -137,6 +149,13 @@ def user_headers(user_token):
     return {"Authorization": f"Bearer {user_token}"}
 
 
+@pytest.fixture
+def metrics_headers(monkeypatch):
+    from app.core.config import settings
+    monkeypatch.setattr(settings, "METRICS_TOKEN", "test-metrics-token")
+    return {"Authorization": "Bearer test-metrics-token"}
+
+
 @pytest.fixture
 def test_project(db, test_organization, test_admin_user):
     from app.models.project import Project
@@ -0,0 +1,309 @@
+import pytest
+from fastapi.testclient import TestClient
+from datetime import datetime
+from zoneinfo import ZoneInfo
+
+NEW_YORK = ZoneInfo("America/New_York")
+
+
+def _ms(dt: datetime) -> int:
+    return int(dt.timestamp() * 1000)
+
+
+def _add_shift(db, user, start: int, end: int, project_id: str = None, task_id: str = None):
+    from app.models.shift import Shift
+    shift = Shift(
+        type="manual",
+        start=start,
+        end=end,
+        employeeId=user.id,
+        organizationId=user.organizationId,
+        teamId=user.teamId,
+        projectId=project_id,
+        taskId=task_id
+    )
+    db.add(shift)
+    db.commit()
+    return shift
+
+
+def test_time_series_splits_shift_across_local_days(client: TestClient, admin_headers, db, test_user):
+    """Test that a shift crossing local midnight is split between days"""
+    _add_shift(
+        db, test_user,
+        _ms(datetime(2024, 3, 4, 22, 0, tzinfo=NEW_YORK)),
+        _ms(datetime(2024, 3, 5, 2, 0, tzinfo=NEW_YORK))
+    )
+
+    response = client.get(
+        "/api/v1/analytics/time-series",
+        params={
+            "start": _ms(datetime(2024, 3, 4, tzinfo=NEW_YORK)),
+            "end": _ms(datetime(2024, 3, 6, tzinfo=NEW_YORK)),
+            "interval": "day",
+            "timezone": "America/New_York"
+        },
+        headers=admin_headers
+    )
+    assert response.status_code == 200
+    data = response.json()
+    assert data["timezone"] == "America/New_York"
+    assert [b["totalTime"] for b in data["buckets"]] == [2 * 3600000, 2 * 3600000]
+    assert data["buckets"][1]["label"].startswith("2024-03-05T00:00:00")
+    assert data["totalTime"] == 4 * 3600000
+
+
+def test_time_series_dst_fall_back_has_25_hours(client: TestClient, admin_headers, db, test_user):
+    """Test hourly buckets on a DST fall-back day"""
+    day_start = _ms(datetime(2024, 11, 3, tzinfo=NEW_YORK))
+    day_end = _ms(datetime(2024, 11, 4, tzinfo=NEW_YORK))
+    _add_shift(db, test_user, day_start, day_end)
+
+    response = client.get(
+        "/api/v1/analytics/time-series",
+        params={"start": day_start, "end": day_end, "interval": "hour", "timezone": "America/New_York"},
+        headers=admin_headers
+    )
+    assert response.status_code == 200
+    buckets = response.json()["buckets"]
+    assert len(buckets) == 25
+    assert all(b["totalTime"] == 3600000 for b in buckets)
+
+
+def test_time_series_clips_to_window(client: TestClient, admin_headers, db, test_user):
+    """Test that only time inside the requested window is counted"""
+    _add_shift(db, test_user, 0, 10 * 3600000)
+
+    response = client.get(
+        "/api/v1/analytics/time-series",
+        params={"start": 3600000, "end": 3 * 3600000, "interval": "day"},
+        headers=admin_headers
+    )
+    assert response.status_code == 200
+    assert response.json()["totalTime"] == 2 * 3600000
+
+
+def test_time_series_invalid_timezone(client: TestClient, admin_headers):
+    """Test time series with an unknown timezone"""
+    response = client.get(
+        "/api/v1/analytics/time-series",
+        params={"start": 0, "end": 3600000, "timezone": "Mars/Olympus"},
+        headers=admin_headers
+    )
+    assert response.status_code == 400
+    assert "Unknown timezone" in response.json()["detail"]
+
+
+def test_project_time_counts_overlapping_shifts_proportionally(
+    client: TestClient, admin_headers, db, test_user, test_project, test_task
+):
+    """Test that shifts crossing the window edges are clipped, not dropped"""
+    hour = 3600000
+    window_start, window_end = 10 * hour, 20 * hour
+    # Overnight shift starting before the window
+    _add_shift(db, test_user, 8 * hour, 12 * hour, test_project.id, test_task.id)
+    # Shift fully inside the window
+    _add_shift(db, test_user, 13 * hour, 14 * hour, test_project.id)
+    # Shift running past the window end
+    _add_shift(db, test_user, 19 * hour, 23 * hour, test_project.id, test_task.id)
+    # Shift entirely outside the window
+    _add_shift(db, test_user, 1 * hour, 2 * hour, test_project.id)
+
+    response = client.get(
+        "/api/v1/analytics/project-time",
+        params={"start": window_start, "end": window_end},
+        headers=admin_headers
+    )
+    assert response.status_code == 200
+    data = response.json()
+    assert data["totalTime"] == 4 * hour
+    assert data["totalShifts"] == 3
+    project = data["projectBreakdown"][test_project.id]
+    assert project["totalTime"] == 4 * hour
+    assert project["shiftCount"] == 3
+    assert project["tasks"][test_task.id] == {"totalTime": 3 * hour, "shiftCount": 2}
+
+
+@pytest.fixture
+def columnar_store(monkeypatch):
+    from app.services.shift_store import shift_store
+    monkeypatch.setattr(shift_store, "enabled", True)
+    shift_store.invalidate()
+    yield shift_store
+    shift_store.invalidate()
+
+
+def test_project_time_from_columnar_store_matches_sql(
+    client: TestClient, admin_headers, db, test_user, test_project, test_task, columnar_store, monkeypatch
+):
+    """Test that the columnar store returns the same analytics as SQL"""
+    import random
+
+    rng = random.Random(42)
+    hour = 3600000
+    for _ in range(50):
+        start = rng.randrange(0, 48 * hour)
+        _add_shift(
+            db, test_user, start, start + rng.randrange(1, 10 * hour),
+            rng.choice([None, test_project.id]), rng.choice([None, test_task.id])
+        )
+
+    for filters in ({}, {"projectId": test_project.id}, {"taskId": test_task.id}, {"employeeId": "missing"}):
+        params = {"start": 12 * hour, "end": 36 * hour, **filters}
+        monkeypatch.setattr(columnar_store, "enabled", False)
+        expected = client.get("/api/v1/analytics/project-time", params=params, headers=admin_headers).json()
+        monkeypatch.setattr(columnar_store, "enabled", True)
+        cached = client.get("/api/v1/analytics/project-time", params=params, headers=admin_headers).json()
+        assert cached == expected
+
+
+def test_columnar_store_appends_ended_shift(client: TestClient, admin_headers, user_headers, columnar_store):
+    """Test that ending a shift updates an already loaded store"""
+    params = {"start": 0, "end": 2 ** 62}
+    before = client.get("/api/v1/analytics/project-time", params=params, headers=admin_headers).json()
+    assert before["totalShifts"] == 0
+    misses = columnar_store.misses
+
+    client.post("/api/v1/user/time-tracking/start", json={"name": "Shift"}, headers=user_headers)
+    client.post("/api/v1/user/time-tracking/end", headers=user_headers)
+
+    after = client.get("/api/v1/analytics/project-time", params=params, headers=admin_headers).json()
+    assert after["totalShifts"] == 1
+    assert columnar_store.misses == misses
+
+
+def test_columnar_store_loads_outside_the_store_lock():
+    """Test that a slow load does not block other organizations and is not kept if shifts ended meanwhile"""
+    import threading
+    from types import SimpleNamespace
+    from app.services.shift_store import OrgShiftColumns, ShiftColumnStore
+
+    store = ShiftColumnStore(enabled=True, memory_budget_bytes=2 ** 30, max_age_seconds=3600)
+    started, release = threading.Event(), threading.Event()
+
+    def load(db, organization_id):
+        if organization_id == "slow":
+            started.set()
+            release.wait(5)
+        return OrgShiftColumns()
+
+    store._load = load
+    fast = store.get(None, "fast")
+    loader = threading.Thread(target=store.get, args=(None, "slow"))
+    loader.start()
+    assert started.wait(5)
+
+    assert store.get(None, "fast") is fast
+    store.append(SimpleNamespace(
+        id="s1", organizationId="slow", start=0, end=1, employeeId="e", teamId=None, projectId=None, taskId=None
+    ))
+    release.set()
+    loader.join(5)
+    assert store.misses == 2 and store.hits == 1
+    assert len(store) == 1
+
+
+def test_columnar_store_skips_appends_of_loaded_shifts(db, test_user):
+    """Test that a shift committed before a load and appended after it is counted once"""
+    import time
+    from app.services.shift_store import ShiftColumnStore
+    now = int(time.time() * 1000)
+    old = _add_shift(db, test_user, 0, 1)
+    ended = _add_shift(db, test_user, now - 1000, now)
+
+    store = ShiftColumnStore(enabled=True, memory_budget_bytes=2 ** 30, max_age_seconds=3600)
+    store.get(db, test_user.organizationId)
+    store.append(ended)
+    columns = store.get(db, test_user.organizationId)
+    assert columns.project_time_analytics(0, 2 ** 62)["totalShifts"] == 2
+    assert old.id not in columns.recent_ids
+
+
+def test_concurrency_curve_and_peak(client: TestClient, admin_headers, db, test_user, test_admin_user):
+    """Test concurrency counts employees once and finds the peak"""
+    minute = 60000
+    _add_shift(db, test_user, 0, 30 * minute)
+    # Overlapping shift of the same employee must not double count
+    _add_shift(db, test_user, 10 * minute, 20 * minute)
+    _add_shift(db, test_admin_user, 15 * minute, 45 * minute)
+
+    response = client.get(
+        "/api/v1/analytics/concurrency",
+        params={"start": 0, "end": 60 * minute, "step": 10 * minute},
+        headers=admin_headers
+    )
+    assert response.status_code == 200
+    data = response.json()
+    assert [p["count"] for p in data["points"]] == [1, 1, 2, 1, 1, 0]
+    assert data["peak"] == 2
+    assert data["peakAt"] == 15 * minute
+
+
+def test_working_at_roster(client: TestClient, admin_headers, db, test_user, test_admin_user):
+    """Test who was working at a point in time"""
+    minute = 60000
+    shift = _add_shift(db, test_user, 0, 30 * minute)
+    _add_shift(db, test_admin_user, 30 * minute, 45 * minute)
+
+    response = client.get(
+        "/api/v1/analytics/working-at", params={"at": 29 * minute}, headers=admin_headers
+    )
+    assert response.status_code == 200
+    data = response.json()
+    assert data["count"] == 1
+    assert data["employees"][0]["employeeId"] == test_user.id
+    assert data["employees"][0]["shiftId"] == shift.id
+
+
+def _add_screenshot(db, user, timestamp: int, productivity: float, site: str, project_id: str = None):
+    from app.models.screenshot import Screenshot
+    screenshot = Screenshot(
+        site=site,
+        productivity=productivity,
+        timestamp=timestamp,
+        employeeId=user.id,
+        teamId=user.teamId,
+        organizationId=user.organizationId,
+        projectId=project_id
+    )
+    db.add(screenshot)
+    db.commit()
+    return screenshot
+
+
+def test_productivity_analytics(client: TestClient, admin_headers, db, test_user, test_admin_user, test_project):
+    """Test productivity averages and top sites"""
+    _add_screenshot(db, test_user, 1000, 0.5, "github.com", test_project.id)
+    _add_screenshot(db, test_user, 2000, 1.0, "github.com", test_project.id)
+    _add_screenshot(db, test_admin_user, 3000, 0.0, "news.com")
+    # Outside the window
+    _add_screenshot(db, test_user, 10 ** 9, 1.0, "other.com")
+
+    response = client.get(
+        "/api/v1/analytics/productivity", params={"start": 0, "end": 10000, "top": 1}, headers=admin_headers
+    )
+    assert response.status_code == 200
+    data = response.json()
+    assert data["screenshotCount"] == 3
+    assert data["averageProductivity"] == pytest.approx(0.5)
+    by_employee = {group["id"]: group for group in data["byEmployee"]}
+    assert by_employee[test_user.id] == {"id": test_user.id, "averageProductivity": 0.75, "screenshotCount": 2}
+    assert data["byProject"] == [{"id": test_project.id, "averageProductivity": 0.75, "screenshotCount": 2}]
+    assert data["byTeam"][0]["screenshotCount"] == 3
+    assert data["topSites"] == [{"site": "github.com", "screenshotCount": 2, "averageProductivity": 0.75}]
+
+
+def test_productivity_cache_invalidated_by_new_screenshot(client: TestClient, admin_headers, user_headers, db, test_user):
+    """Test that a cached closed window sees screenshots uploaded later"""
+    params = {"start": 0, "end": 10000}
+    _add_screenshot(db, test_user, 1000, 1.0, "github.com")
+    assert client.get("/api/v1/analytics/productivity", params=params, headers=admin_headers).json()["screenshotCount"] == 1
+
+    response = client.post(
+        "/api/v1/user/screenshots/", json={"timestamp": 2000, "productivity": 0.0}, headers=user_headers
+    )
+    assert response.status_code == 200
+
+    data = client.get("/api/v1/analytics/productivity", params=params, headers=admin_headers).json()
+    assert data["screenshotCount"] == 2
+    assert data["averageProductivity"] == pytest.approx(0.5)
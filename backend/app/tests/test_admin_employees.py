@@ -58,6 +58,68 @@ def test_create_employee_unauthorized(client: TestClient, user_headers):
     assert response.status_code == 403
 
 
+def test_bulk_invite_csv(client: TestClient, admin_headers, test_user, test_project, db):
+    """Test inviting employees from a CSV upload"""
+    from app.models.employee import Employee
+    
+    upload = (
+        "name,email,title,projects,isAdmin\n"
+        f"Ann,ann@example.com,Engineer,{test_project.id},false\n"
+        "Bob,bob@example.com,,,yes\n"
+        f"Existing,{test_user.email},,,\n"
+        "Ann Again,ann@example.com,,,\n"
+        "Broken,not-an-email,,,\n"
+    )
+    response = client.post(
+        "/api/v1/employee/bulk-invite",
+        files={"file": ("employees.csv", upload, "text/csv")},
+        headers=admin_headers
+    )
+    assert response.status_code == 202
+    job_id = response.json()["id"]
+    
+    # Jobs run eagerly in tests
+    job = client.get(f"/api/v1/jobs/{job_id}", headers=admin_headers).json()
+    assert job["status"] == "completed"
+    assert job["result"] == {"processedRows": 5, "createdEmployees": 2, "skippedRows": 3, "emailsQueued": 2}
+    assert sorted(e["row"] for e in job["progress"]["errors"]) == [4, 5, 6]
+    
+    ann = db.query(Employee).filter(Employee.email == "ann@example.com").one()
+    assert [p.id for p in ann.projects] == [test_project.id]
+    assert ann.invited is not None
+    assert db.query(Employee).filter(Employee.email == "bob@example.com").one().isAdmin
+
+
+def test_bulk_invite_json_lines_in_chunks(db, test_organization, test_admin_user):
+    """Test that duplicates are caught across chunks of a JSON lines upload"""
+    import io
+    import json
+    from app.core.jobs import JobContext
+    from app.models.job import Job
+    from app.services.bulk_invite_service import BulkInviteService
+    
+    rows = [{"name": f"Employee {i}", "email": f"employee{i % 5}@example.com"} for i in range(7)]
+    upload = io.BytesIO("\n".join(json.dumps(row) for row in rows).encode())
+    job = Job(name="employees.bulk_invite", organizationId=test_organization.id, createdBy=test_admin_user.id)
+    db.add(job)
+    db.commit()
+    counts = BulkInviteService(db, chunk_size=3).run(JobContext(db, job), upload, "ndjson")
+    
+    assert counts["createdEmployees"] == 5
+    assert job.progress["processedRows"] == 7
+    assert [e["error"] for e in job.progress["errors"]] == ["Duplicate email in upload"] * 2
+
+
+def test_bulk_invite_rejects_unknown_format(client: TestClient, admin_headers):
+    """Test that only CSV and JSON uploads are accepted"""
+    response = client.post(
+        "/api/v1/employee/bulk-invite",
+        files={"file": ("employees.xlsx", b"data", "application/octet-stream")},
+        headers=admin_headers
+    )
+    assert response.status_code == 400
+
+
 def test_get_employees(client: TestClient, admin_headers, test_user):
     """Test getting all employees"""
     response = client.get("/api/v1/employee/", headers=admin_headers)
@@ -99,6 +99,62 @@ def test_update_project_employees(client: TestClient, admin_headers, test_projec
     assert test_user.id in data["employees"]
 
 
+def test_update_project_employees_writes_only_changes(db, test_project, test_user, test_admin_user):
+    """Replacing the member list inserts and deletes only the rows that changed"""
+    from sqlalchemy import event
+    from app.schemas.project import ProjectUpdate
+    from app.services.project_service import ProjectService
+
+    test_project.employees.append(test_user)
+    db.commit()
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    engine = db.get_bind()
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        project = ProjectService(db).update_project(
+            test_project.id, ProjectUpdate(employees=[test_user.id, test_admin_user.id])
+        )
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+
+    assert {e.id for e in project.employees} == {test_user.id, test_admin_user.id}
+    writes = [s for s in statements if "employee_projects" in s and not s.startswith("SELECT")]
+    assert len(writes) == 1 and writes[0].startswith("INSERT")
+
+
+def test_patch_project_employees(client: TestClient, admin_headers, db, test_project, test_user, test_admin_user):
+    """Test adding and removing project employees without replacing the list"""
+    test_project.employees.append(test_admin_user)
+    db.commit()
+    
+    response = client.patch(
+        f"/api/v1/project/{test_project.id}/employees",
+        json={"add": [test_user.id, "nonexistent"]},
+        headers=admin_headers
+    )
+    assert response.status_code == 200
+    assert sorted(response.json()["employees"]) == sorted([test_user.id, test_admin_user.id])
+    
+    response = client.patch(
+        f"/api/v1/project/{test_project.id}/employees",
+        json={"remove": [test_admin_user.id]},
+        headers=admin_headers
+    )
+    assert response.status_code == 200
+    assert response.json()["employees"] == [test_user.id]
+    
+    response = client.patch(
+        f"/api/v1/project/{test_project.id}/employees",
+        json={"add": [test_user.id], "remove": [test_user.id]},
+        headers=admin_headers
+    )
+    assert response.status_code == 422
+
+
 def test_delete_project(client: TestClient, admin_headers, test_project):
     """Test deleting project"""
     response = client.delete(f"/api/v1/project/{test_project.id}", headers=admin_headers)
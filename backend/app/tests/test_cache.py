@@ -0,0 +1,80 @@
+import pytest
+from app.core.cache import FakeRedis, RedisTier, TwoTierCache
+
+
+@pytest.fixture
+def redis_server():
+    return FakeRedis()
+
+
+def _process(redis_server, name="shared_test"):
+    """A cache as one worker process sees it"""
+    return TwoTierCache(name, maxsize=100, tier=RedisTier(redis_server.connect(), retry_seconds=60), local_ttl_seconds=30)
+
+
+def test_values_are_shared_between_processes(redis_server):
+    first, second = _process(redis_server), _process(redis_server)
+    first.set(("org1", "a", None, 5), {"total": 1})
+
+    # Read through from Redis, then kept in the second process's L1
+    assert second.get(("org1", "a", None, 5)) == {"total": 1}
+    assert second.local.get(("org1", "a", None, 5))[1] == {"total": 1}
+    assert second.get(("org1", "missing")) is None
+    assert (second.hits, second.misses) == (1, 1)
+
+
+def test_invalidation_reaches_other_processes(redis_server):
+    """Test that deletes and organization invalidations clear L1 and L2 everywhere"""
+    first, second = _process(redis_server), _process(redis_server)
+    for key in [("org1", "a"), ("org1", "b"), ("org2", "a")]:
+        first.set(key, key[1])
+        assert second.get(key) == key[1]
+
+    first.delete(("org1", "a"))
+    assert second.local.get(("org1", "a")) is None
+    assert second.get(("org1", "a")) is None
+    assert second.get(("org1", "b")) == "b"
+
+    second.invalidate_organization("org1")
+    assert first.get(("org1", "b")) is None
+    assert first.get(("org2", "a")) == "a"
+
+    first.clear()
+    assert len(second) == 0 and second.get(("org2", "a")) is None
+
+
+def test_falls_back_to_local_cache_when_redis_is_down(redis_server):
+    first, second = _process(redis_server), _process(redis_server)
+    first.tier.client.fail = second.tier.client.fail = True
+
+    first.set(("org1", "a"), 1)
+    assert first.get(("org1", "a")) == 1
+    assert second.get(("org1", "a")) is None
+
+    # Redis is skipped until retry_seconds pass, even once it is back
+    first.tier.client.fail = False
+    first.set(("org1", "b"), 2)
+    assert redis_server.server["hashes"] == {}
+
+
+def test_invalidation_missed_during_outage_clears_cache_on_recovery(redis_server):
+    """Test that L2 values invalidated while Redis failed are not served once it is back"""
+    first, second = _process(redis_server), _process(redis_server)
+    first.set(("org1", "a"), "old")
+    first.set(("org2", "a"), "other")
+    assert second.get(("org1", "a")) == "old"
+
+    first.tier.client.fail = True
+    first.invalidate_organization("org1")
+    first.tier.client.fail = False
+    # Still within retry_seconds, the stale L2 value is not read back
+    assert first.get(("org1", "a")) is None
+
+    first.tier._down_until = 0
+    assert first.get(("org1", "b")) is None
+    assert redis_server.server["hashes"] == {}
+    assert len(second) == 0
+    assert second.get(("org1", "a")) is None and second.get(("org2", "a")) is None
+
+    first.set(("org1", "a"), "new")
+    assert second.get(("org1", "a")) == "new"
@@ -0,0 +1,157 @@
+import threading
+import time
+from sqlalchemy import create_engine, text
+from app.db.database import WRITE_OPTIONS, configure_sqlite, sqlite_pragmas
+
+
+def test_sqlite_production_profile_pragmas(tmp_path):
+    """Test that the production profile enables WAL and relaxed syncing"""
+    engine = create_engine(f"sqlite:///{tmp_path / 'profile.db'}")
+    configure_sqlite(engine, sqlite_pragmas(), begin_immediate=False)
+    with engine.connect() as conn:
+        assert conn.execute(text("PRAGMA journal_mode")).scalar() == "wal"
+        assert conn.execute(text("PRAGMA synchronous")).scalar() == 1  # NORMAL
+        assert conn.execute(text("PRAGMA busy_timeout")).scalar() == 5000
+    engine.dispose()
+
+
+def test_sqlite_read_then_write_transactions_wait(tmp_path):
+    """Test that a write transaction's reads happen under the write lock, so concurrent increments are not lost"""
+    engine = create_engine(f"sqlite:///{tmp_path / 'immediate.db'}")
+    configure_sqlite(engine, sqlite_pragmas(), begin_immediate=True)
+    writer = engine.execution_options(**WRITE_OPTIONS)
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE t (x INTEGER)"))
+        conn.execute(text("INSERT INTO t VALUES (0)"))
+
+    first_read = threading.Event()
+
+    def increment(after_read=None):
+        with writer.begin() as conn:
+            value = conn.execute(text("SELECT x FROM t")).scalar()
+            if after_read:
+                after_read()
+            conn.execute(text("UPDATE t SET x = :x"), {"x": value + 1})
+
+    def slow_increment():
+        def pause():
+            first_read.set()
+            time.sleep(0.2)
+        increment(pause)
+
+    thread = threading.Thread(target=slow_increment)
+    thread.start()
+    first_read.wait()
+    increment()
+    thread.join()
+
+    with engine.connect() as conn:
+        assert conn.execute(text("SELECT x FROM t")).scalar() == 2
+    engine.dispose()
+
+
+def test_sqlite_open_reader_does_not_block_writers(tmp_path, monkeypatch):
+    """Test that a session that only reads, left open, does not hold the write lock"""
+    from sqlalchemy.orm import sessionmaker
+    from app.core.config import settings
+    from app.db.database import Base
+    from app.models.organization import Organization
+    monkeypatch.setattr(settings, "SQLITE_BUSY_TIMEOUT_MS", 100)
+    engine = create_engine(f"sqlite:///{tmp_path / 'readers.db'}")
+    configure_sqlite(engine, sqlite_pragmas(), begin_immediate=True)
+    Base.metadata.create_all(bind=engine, tables=[Organization.__table__])
+
+    reader = sessionmaker(bind=engine)()
+    writer = sessionmaker(bind=engine.execution_options(**WRITE_OPTIONS))()
+    try:
+        assert reader.query(Organization).count() == 0
+        writer.add(Organization(name="Written", domain="written.com"))
+        writer.commit()
+        # The reader keeps its snapshot until its transaction ends
+        assert reader.query(Organization).count() == 0
+        reader.commit()
+        assert reader.query(Organization).count() == 1
+    finally:
+        reader.close()
+        writer.close()
+        engine.dispose()
+
+
+def test_screenshot_permissions_compact_storage(db, test_user):
+    """Test that known permissions are packed into a code and others kept as JSON"""
+    from app.models.screenshot import Screenshot
+    default = Screenshot(employeeId=test_user.id, organizationId=test_user.organizationId, timestamp=1)
+    packed = Screenshot(
+        employeeId=test_user.id, organizationId=test_user.organizationId, timestamp=2,
+        systemPermissions={"accessibility": "authorized", "screenAndSystemAudioRecording": "denied"}
+    )
+    other = Screenshot(
+        employeeId=test_user.id, organizationId=test_user.organizationId, timestamp=3,
+        systemPermissions={"accessibility": "limited"}
+    )
+    db.add_all([default, packed, other])
+    db.commit()
+
+    rows = db.execute(text('SELECT "permissionsCode", "systemPermissions" FROM screenshots ORDER BY timestamp')).all()
+    assert rows[0] == (None, None)
+    assert rows[1] == (9, None)
+    assert rows[2][0] is None and rows[2][1] is not None
+
+    db.expire_all()
+    assert default.systemPermissions == {"accessibility": "undetermined", "screenAndSystemAudioRecording": "undetermined"}
+    assert packed.systemPermissions == {"accessibility": "authorized", "screenAndSystemAudioRecording": "denied"}
+    assert other.systemPermissions == {"accessibility": "limited"}
+
+
+def test_project_json_defaults_stored_as_null(db, test_project):
+    """Test that project settings equal to the defaults are not stored"""
+    test_project.priorities = ["p1", "p2"]
+    db.commit()
+    row = db.execute(text("SELECT statuses, priorities, payroll FROM projects")).one()
+    assert row.statuses is None and row.payroll is None
+    assert row.priorities is not None
+
+    db.expire_all()
+    assert test_project.statuses == ["To do", "On hold", "In progress", "Done"]
+    assert test_project.priorities == ["p1", "p2"]
+    assert test_project.payroll == {"billRate": 0, "overtimeBillRate": 0}
+
+
+def test_project_json_settings_are_changed_by_assignment(db, test_project):
+    """Test that in-place edits, which would be lost, raise and that assigning a new value is stored"""
+    import pytest
+    with pytest.raises(TypeError):
+        test_project.statuses.append("Blocked")
+    with pytest.raises(TypeError):
+        test_project.payroll["billRate"] = 10
+
+    test_project.statuses = test_project.statuses + ["Blocked"]
+    test_project.payroll = {**test_project.payroll, "billRate": 10}
+    db.commit()
+    db.expire_all()
+    assert test_project.statuses[-1] == "Blocked"
+    assert test_project.payroll == {"billRate": 10, "overtimeBillRate": 0}
+
+
+def test_strict_loading_raises_on_lazy_load(db, test_user, test_project):
+    """Test that strict sessions refuse lazy loads but allow explicit loader options"""
+    import pytest
+    from sqlalchemy.exc import InvalidRequestError
+    from sqlalchemy.orm import selectinload
+    from app.models.employee import Employee
+    test_project.employees.append(test_user)
+    db.commit()
+    user_id, project_id = test_user.id, test_project.id
+    db.expunge_all()
+
+    db.info["strict_loading"] = True
+    try:
+        employee = db.query(Employee).filter(Employee.id == user_id).one()
+        with pytest.raises(InvalidRequestError):
+            employee.projects
+        db.expunge_all()
+
+        employee = db.query(Employee).options(selectinload(Employee.projects)).filter(Employee.id == user_id).one()
+        assert [p.id for p in employee.projects] == [project_id]
+    finally:
+        db.info.pop("strict_loading")
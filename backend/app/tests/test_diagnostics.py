@@ -0,0 +1,189 @@
+import pytest
+from fastapi.testclient import TestClient
+from app.tests.utils import assert_query_budget
+
+
+def _add_employees(db, organization_id: str, count: int):
+    from app.models.employee import Employee
+    for i in range(count):
+        db.add(Employee(name=f"Employee {i}", email=f"employee{i}@test.com", organizationId=organization_id))
+    db.commit()
+
+
+def test_query_count_headers(client: TestClient, admin_headers):
+    """Test that responses report query count and DB time"""
+    response = client.get(
+        "/api/v1/analytics/project-time", params={"start": 0, "end": 1000}, headers=admin_headers
+    )
+    assert response.status_code == 200
+    assert int(response.headers["x-db-query-count"]) >= 1
+    assert response.headers["server-timing"].startswith("db;dur=")
+    # Current user lookup plus one grouped aggregate
+    assert_query_budget(response, 2)
+
+
+def test_query_metrics_per_route(client: TestClient, admin_headers, db, test_organization):
+    """Test that employee listing loads projects in one query instead of per row"""
+    from app.core.instrumentation import route_query_metrics
+    route_query_metrics.reset()
+    _add_employees(db, test_organization.id, 6)
+
+    response = client.get("/api/v1/employee/", headers=admin_headers)
+    assert response.status_code == 200
+    # Current user, employees, and their projects via selectinload
+    assert_query_budget(response, 3)
+
+    metrics = client.get("/api/v1/diagnostics/queries", headers=admin_headers).json()
+    entry = metrics["GET /api/v1/employee/"]
+    assert entry["requests"] == 1
+    assert entry["queries"] == int(response.headers["x-db-query-count"])
+    assert entry["nPlusOneRequests"] == 0
+
+
+def test_repeated_statements_flagged(db, test_organization):
+    """Test that identical statements run once per row are reported as N+1"""
+    from sqlalchemy import text
+    from app.core.instrumentation import track_queries
+    with track_queries() as stats:
+        for _ in range(6):
+            db.execute(text("SELECT name FROM organizations WHERE id = :id"), {"id": test_organization.id})
+    assert [times for _, times in stats.repeated(5)] == [6]
+
+
+def test_query_metrics_require_admin(client: TestClient, user_headers):
+    """Test that query metrics are admin only"""
+    response = client.get("/api/v1/diagnostics/queries", headers=user_headers)
+    assert response.status_code == 403
+
+
+@pytest.fixture
+def profile_dir(tmp_path, monkeypatch):
+    from app.core.config import settings
+    from app.core.profiling import profile_store
+    monkeypatch.setattr(settings, "PROFILE_TOKEN", "secret")
+    monkeypatch.setattr(profile_store, "directory", tmp_path)
+    monkeypatch.setattr(profile_store, "max_files", 2)
+    return tmp_path
+
+
+def test_profile_requested_by_token(client: TestClient, admin_headers, profile_dir):
+    """Test that requests with the profiling token are profiled and retrievable"""
+    response = client.get(
+        "/api/v1/analytics/project-time",
+        params={"start": 0, "end": 1000},
+        headers={**admin_headers, "X-Profile-Token": "secret"}
+    )
+    assert response.status_code == 200
+    name = response.headers["x-profile-id"]
+    assert "GET_api_v1_analytics_project_time" in name
+
+    profiles = client.get("/api/v1/diagnostics/profiles", headers=admin_headers).json()
+    assert [p["name"] for p in profiles] == [name]
+
+    download = client.get(f"/api/v1/diagnostics/profiles/{name}", headers=admin_headers)
+    assert download.status_code == 200
+    assert len(download.content) > 0
+
+
+def test_profile_ring_buffer_and_unsampled_requests(client: TestClient, admin_headers, profile_dir):
+    """Test that only sampled requests are stored and old profiles are dropped"""
+    response = client.get("/health", headers={"X-Profile-Token": "wrong"})
+    assert "x-profile-id" not in response.headers
+
+    for _ in range(3):
+        client.get("/health", headers={"X-Profile-Token": "secret"})
+    assert len(list(profile_dir.glob("*.pstats"))) == 2
+
+    missing = client.get("/api/v1/diagnostics/profiles/../../etc/passwd", headers=admin_headers)
+    assert missing.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_profile_excludes_other_tasks():
+    """Test that code other tasks run while the profiled request awaits is not recorded"""
+    import asyncio
+    import cProfile
+    import pstats
+    from app.core.profiling import _Profiled
+
+    def profiled_work():
+        return sum(range(100))
+
+    def other_work():
+        return sum(range(100))
+
+    async def request():
+        profiled_work()
+        await asyncio.sleep(0.01)
+        profiled_work()
+        return "done"
+
+    async def other():
+        other_work()
+
+    profiler = cProfile.Profile()
+    results = await asyncio.gather(_Profiled(request(), profiler), other())
+    assert results[0] == "done"
+
+    functions = {name for _, _, name in pstats.Stats(profiler).stats}
+    assert "profiled_work" in functions
+    assert "other_work" not in functions
+
+
+@pytest.fixture
+def observed_timeouts():
+    from sqlalchemy import event
+    from sqlalchemy.engine import Engine
+    from app.db.database import current_statement_timeout
+    seen = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        seen.append(current_statement_timeout())
+
+    event.listen(Engine, "before_cursor_execute", record)
+    yield seen
+    event.remove(Engine, "before_cursor_execute", record)
+
+
+def test_statement_timeout_per_route_class(client: TestClient, admin_headers, user_headers, db, observed_timeouts):
+    """Test that agent and analytics routes run queries under their own timeouts"""
+    from sqlalchemy import text
+    from app.core.config import settings
+    response = client.get("/api/v1/user/time-tracking/active", headers=user_headers)
+    assert response.status_code in (200, 404)
+    assert set(observed_timeouts) == {settings.DB_AGENT_STATEMENT_TIMEOUT_MS}
+
+    observed_timeouts.clear()
+    response = client.get(
+        "/api/v1/analytics/project-time", params={"start": 0, "end": 1000}, headers=admin_headers
+    )
+    assert response.status_code == 200
+    assert set(observed_timeouts) == {settings.DB_ANALYTICS_STATEMENT_TIMEOUT_MS}
+
+    observed_timeouts.clear()
+    response = client.get("/api/v1/employee/", headers=admin_headers)
+    assert response.status_code == 200
+    assert set(observed_timeouts) == {settings.DB_STATEMENT_TIMEOUT_MS}
+
+    # Jobs and scripts run outside requests
+    observed_timeouts.clear()
+    db.execute(text("SELECT 1"))
+    assert observed_timeouts == [settings.DB_JOB_STATEMENT_TIMEOUT_MS]
+
+
+def test_statement_timeout_interrupts_slow_query(db):
+    """Test that a query running past the statement timeout is aborted"""
+    from sqlalchemy import text
+    from sqlalchemy.exc import OperationalError
+    from app.db.database import statement_timeout_ms
+    slow_query = text(
+        "WITH RECURSIVE n(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM n WHERE i < 100000000) "
+        "SELECT count(*) FROM n"
+    )
+    token = statement_timeout_ms.set(50)
+    try:
+        with pytest.raises(OperationalError, match="interrupted"):
+            db.execute(slow_query)
+    finally:
+        statement_timeout_ms.reset(token)
+        db.rollback()
@@ -0,0 +1,86 @@
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import sessionmaker
+from app.core.config import settings
+from app.models.email_delivery import EmailDelivery
+from app.services.email_queue import EmailQueue
+from app.services.email_service import EmailService, FakeTransport
+import time
+
+
+@pytest.fixture
+def transport():
+    return FakeTransport()
+
+
+@pytest.fixture
+def queue(db, transport):
+    return EmailQueue(sessionmaker(bind=db.get_bind()), EmailService(transport), concurrency=2, max_attempts=3)
+
+
+def test_invitation_is_queued_not_sent(client: TestClient, admin_headers, db, queue, transport):
+    """Creating an employee stores the invitation; the worker sends it"""
+    response = client.post(
+        "/api/v1/employee/",
+        json={"name": "New Employee", "email": "new@example.com"},
+        headers=admin_headers
+    )
+    assert response.status_code == 200
+    delivery = db.query(EmailDelivery).one()
+    assert (delivery.kind, delivery.recipient, delivery.status) == ("verification", "new@example.com", "pending")
+    assert transport.sent == []
+
+    assert queue.run_once() == {"sent": 1, "retrying": 0, "dead": 0}
+    assert [m.to for m in transport.sent] == ["new@example.com"]
+    assert "verify-email?token=" in transport.sent[0].html
+    db.refresh(delivery)
+    assert delivery.status == "sent" and delivery.attempts == 1
+
+
+def test_failed_delivery_retries_with_backoff_then_dead_letters(db, queue, transport):
+    """Transient failures back off exponentially; the last attempt dead-letters"""
+    queue.enqueue(db, "password_reset", "user@example.com", "User")
+    db.commit()
+    transport.fail_next(3)
+
+    delays = []
+    for attempt in range(3):
+        counts = queue.run_once()
+        db.expire_all()
+        delivery = db.query(EmailDelivery).one()
+        if attempt < 2:
+            assert counts["retrying"] == 1
+            delays.append(delivery.nextAttemptAt - time.time() * 1000)
+            # Make the retry due now
+            delivery.nextAttemptAt = 0
+            db.commit()
+    assert counts["dead"] == 1
+    assert delivery.status == "dead" and delivery.attempts == 3
+    assert delivery.lastError == "Fake failure"
+    base = settings.EMAIL_RETRY_BASE_SECONDS * 1000
+    assert base * 0.4 <= delays[0] <= base
+    assert base * 0.9 <= delays[1] <= base * 2
+
+    assert queue.requeue_dead(db) == 1
+    assert queue.run_once()["sent"] == 1
+    assert [m.to for m in transport.sent] == ["user@example.com"]
+
+
+def test_permanent_failure_dead_letters_immediately(db, queue, transport):
+    queue.enqueue(db, "verification", "bounce@example.com", "Bounce")
+    db.commit()
+    transport.fail_next(permanent=True)
+
+    assert queue.run_once()["dead"] == 1
+    assert db.query(EmailDelivery).one().attempts == 1
+
+
+def test_claimed_delivery_is_not_sent_twice(db, queue, transport):
+    """A delivery another worker claimed is skipped until its lease runs out"""
+    queue.enqueue_many(db, "verification", [("a@example.com", "A"), ("b@example.com", "B")])
+    db.commit()
+    claimed = queue._claim(db, 10 ** 13)
+    assert len(claimed) == 2
+
+    assert queue.run_once() == {"sent": 0, "retrying": 0, "dead": 0}
+    assert transport.sent == []
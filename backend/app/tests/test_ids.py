@@ -0,0 +1,40 @@
+import uuid
+from app.db.ids import uuid7_hex
+
+
+def test_uuid7_hex_format():
+    """Test that ids keep the existing 32-character hex shape and are valid UUIDv7"""
+    value = uuid7_hex()
+    assert len(value) == 32
+    parsed = uuid.UUID(value)
+    assert parsed.version == 7
+    assert parsed.variant == uuid.RFC_4122
+
+
+def test_uuid7_hex_time_ordered():
+    """Test that ids generated in sequence sort in creation order"""
+    ids = [uuid7_hex() for _ in range(10000)]
+    assert ids == sorted(ids)
+    assert len(set(ids)) == len(ids)
+
+
+def test_new_shifts_get_time_ordered_ids(db, test_user):
+    """Test that new rows use UUIDv7 ids while old string ids still load"""
+    from app.models.shift import Shift
+    legacy = Shift(id=uuid.uuid4().hex, start=0, employeeId=test_user.id, organizationId=test_user.organizationId)
+    new = Shift(start=0, employeeId=test_user.id, organizationId=test_user.organizationId)
+    db.add_all([legacy, new])
+    db.commit()
+    assert uuid.UUID(new.id).version == 7
+    assert db.query(Shift).filter(Shift.id == legacy.id).one().id == legacy.id
+
+
+def test_malformed_ids_match_nothing(db, test_user):
+    """Test that ids are compared in their hex form and malformed ones find no row instead of failing"""
+    from app.models.shift import Shift
+    shift = Shift(start=0, employeeId=test_user.id, organizationId=test_user.organizationId)
+    db.add(shift)
+    db.commit()
+    dashed = str(uuid.UUID(shift.id)).upper()
+    assert db.query(Shift).filter(Shift.id == dashed).one().id == shift.id
+    assert db.query(Shift).filter(Shift.id.in_(["not-a-uuid", shift.id[:-1] + "g"])).all() == []
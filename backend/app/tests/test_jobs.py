@@ -0,0 +1,111 @@
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import sessionmaker
+from app.core import jobs
+from app.core.jobs import Task, enqueue, run_job
+from app.models.job import Job
+
+
+@pytest.fixture
+def flaky_task(monkeypatch):
+    """A task that reports progress, then fails when asked to"""
+    def flaky(ctx, fail: bool = False):
+        ctx.progress(step=1)
+        if fail:
+            raise RuntimeError("Boom")
+        return {"ok": True}
+    monkeypatch.setitem(jobs.tasks, "test.flaky", Task("test.flaky", flaky, admin=True))
+
+
+def test_admin_starts_job_and_polls_status(
+    client: TestClient, admin_headers, metrics_headers, test_organization, flaky_task
+):
+    """Test that a started job runs (eagerly in tests) and reports its outcome"""
+    response = client.post("/api/v1/jobs/test.flaky", json={}, headers=admin_headers)
+    assert response.status_code == 202
+    job_id = response.json()["id"]
+
+    job = client.get(f"/api/v1/jobs/{job_id}", headers=admin_headers).json()
+    assert job["status"] == "completed"
+    assert job["organizationId"] == test_organization.id
+    assert job["progress"] == {"step": 1}
+    assert job["result"] == {"ok": True}
+    assert job["startedAt"] >= job["queuedAt"] and job["finishedAt"] >= job["startedAt"]
+
+    listed = client.get("/api/v1/jobs/", params={"name": "test.flaky"}, headers=admin_headers).json()
+    assert [j["id"] for j in listed] == [job_id]
+
+    metrics = client.get("/metrics", headers=metrics_headers).text
+    assert 'job_queue_latency_seconds_count{task="test.flaky"}' in metrics
+    assert 'job_duration_seconds_count{task="test.flaky"}' in metrics
+    assert 'jobs_total{task="test.flaky",status="completed"}' in metrics
+
+
+def test_failed_job_keeps_error_and_progress(client: TestClient, admin_headers, flaky_task):
+    response = client.post("/api/v1/jobs/test.flaky", json={"params": {"fail": True}}, headers=admin_headers)
+    job = client.get(f"/api/v1/jobs/{response.json()['id']}", headers=admin_headers).json()
+    assert job["status"] == "failed"
+    assert job["error"] == "Boom"
+    assert job["progress"] == {"step": 1}
+    assert job["result"] is None
+
+
+def test_start_job_rejects_bad_requests(client: TestClient, admin_headers, user_headers, flaky_task):
+    """Test that only admin tasks with valid params can be started"""
+    assert client.post("/api/v1/jobs/partitions.maintain", json={}, headers=admin_headers).status_code == 404
+    assert client.post("/api/v1/jobs/no.such.task", json={}, headers=admin_headers).status_code == 404
+    response = client.post("/api/v1/jobs/test.flaky", json={"params": {"nope": 1}}, headers=admin_headers)
+    assert response.status_code == 400
+    assert client.post("/api/v1/jobs/test.flaky", json={}, headers=user_headers).status_code == 403
+
+
+def test_jobs_are_scoped_to_organization(client: TestClient, admin_headers, db, flaky_task):
+    """Test that system jobs and other organizations' jobs are not visible"""
+    job = enqueue(db, "test.flaky")
+    assert job.organizationId is None
+    assert client.get(f"/api/v1/jobs/{job.id}", headers=admin_headers).status_code == 404
+    assert client.get("/api/v1/jobs/", headers=admin_headers).json() == []
+
+
+def test_run_job_ignores_duplicate_delivery(db, flaky_task):
+    """Test that a job is only run once when its message is delivered twice"""
+    job = enqueue(db, "test.flaky")
+    db.refresh(job)
+    finished_at = job.finishedAt
+
+    assert run_job(job.id, sessionmaker(bind=db.get_bind())) is None
+    db.refresh(job)
+    assert job.status == "completed" and job.finishedAt == finished_at
+
+
+def test_retention_purge_runs_for_admin_organization(client: TestClient, admin_headers, test_organization):
+    test_organization_id = test_organization.id
+    response = client.post("/api/v1/jobs/retention.purge", json={}, headers=admin_headers)
+    job = client.get(f"/api/v1/jobs/{response.json()['id']}", headers=admin_headers).json()
+    assert job["status"] == "completed"
+    # Without a retention policy there is nothing to purge
+    assert job["result"] == []
+    assert job["organizationId"] == test_organization_id
+
+
+def test_recover_jobs_fails_abandoned_and_runs_lost_jobs(db, flaky_task, monkeypatch):
+    """Test that a sweep fails jobs whose worker died and runs due jobs left queued by a restart"""
+    cleaned = []
+    monkeypatch.setattr(jobs.tasks["test.flaky"], "cleanup", cleaned.append)
+    now = jobs._now_ms()
+    abandoned = Job(name="test.flaky", params={"fail": False}, status="running", startedAt=now - 600000,
+                    heartbeatAt=now - 600000)
+    alive = Job(name="test.flaky", status="running", startedAt=now - 600000, heartbeatAt=now)
+    lost = Job(name="test.flaky", status="queued", queuedAt=now - 1000, scheduledAt=now - 1000)
+    later = Job(name="test.flaky", status="queued", queuedAt=now, scheduledAt=now + 3600000)
+    db.add_all([abandoned, alive, lost, later])
+    db.commit()
+
+    assert jobs.recover_jobs(sessionmaker(bind=db.get_bind())) == {"abandoned": 1, "dispatched": 1}
+
+    db.expire_all()
+    assert abandoned.status == "failed" and abandoned.error == "The worker running this job stopped"
+    assert cleaned == [{"fail": False}]
+    assert alive.status == "running"
+    assert lost.status == "completed"
+    assert later.status == "queued"
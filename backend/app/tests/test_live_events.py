@@ -0,0 +1,89 @@
+import asyncio
+import json
+import pytest
+from sqlalchemy.orm import sessionmaker
+from app.services.live_events import RESET_FRAME, LiveHub
+from app.services.outbox import record_event
+
+
+def _frames(subscription):
+    frames = []
+    while not subscription.queue.empty():
+        frames.append(subscription.queue.get_nowait())
+    return frames
+
+
+def _record(db, organization_id, *types):
+    for type in types:
+        record_event(db, organization_id, type, "entity", {"employeeId": "e1"})
+    db.commit()
+
+
+@pytest.fixture
+def hub(db):
+    return LiveHub(sessionmaker(bind=db.get_bind()), queue_size=3)
+
+
+@pytest.mark.asyncio
+async def test_events_fan_out_to_organization_subscribers(hub, db, test_organization):
+    """Test that one poll queues the dashboard's events to every subscriber of the organization"""
+    _record(db, test_organization.id, "shift.started")
+    first = await hub.subscribe(test_organization.id)
+    second = await hub.subscribe(test_organization.id)
+    other = await hub.subscribe("other-organization")
+
+    _record(db, test_organization.id, "shift.started", "project.created", "screenshot.created")
+    assert await hub.poll_once() == 2
+    assert await hub.poll_once() == 0
+
+    frames = _frames(first)
+    assert frames == _frames(second)
+    assert [frame.split("\n")[:2] for frame in frames] == [
+        ["id: 2", "event: shift.started"], ["id: 4", "event: screenshot.created"]
+    ]
+    data = json.loads(frames[0].split("\n")[2][len("data: "):])
+    assert data["payload"] == {"employeeId": "e1"} and data["entityId"] == "entity"
+    assert other.queue.empty()
+
+    hub.unsubscribe(first)
+    hub.unsubscribe(second)
+    _record(db, test_organization.id, "shift.ended")
+    assert await hub.poll_once() == 0
+
+
+@pytest.mark.asyncio
+async def test_resuming_subscriber_gets_missed_events_once(hub, db, test_organization):
+    _record(db, test_organization.id, "shift.started", "screenshot.created", "shift.ended", "shift.started")
+    subscription = await hub.subscribe(test_organization.id, since=1)
+    assert [frame.split("\n")[0] for frame in _frames(subscription)] == ["id: 2", "id: 3", "id: 4"]
+
+    # Too far behind to fit in the queue
+    behind = await hub.subscribe(test_organization.id, since=0)
+    _record(db, test_organization.id, "shift.started")
+    await hub.poll_once()
+    assert _frames(behind)[0] == RESET_FRAME
+    assert [frame.split("\n")[0] for frame in _frames(subscription)] == ["id: 5"]
+
+
+@pytest.mark.asyncio
+async def test_subscriber_ahead_of_head_gets_new_events(hub, db, test_organization):
+    _record(db, test_organization.id, "shift.started")
+    subscription = await hub.subscribe(test_organization.id, since=100)
+    _record(db, test_organization.id, "shift.ended")
+    await hub.poll_once()
+    assert [frame.split("\n")[0] for frame in _frames(subscription)] == ["id: 2"]
+
+
+@pytest.mark.asyncio
+async def test_commits_on_other_threads_wake_the_poller(hub, db, test_organization):
+    """Test that the commit listener hands the organizations to the loop instead of reading subscriptions"""
+    await hub.subscribe(test_organization.id)
+    # The loop state start() sets up, without the poller
+    hub._loop, hub._wakeup = asyncio.get_running_loop(), asyncio.Event()
+
+    await asyncio.to_thread(hub.wake, {"other-organization"})
+    await asyncio.sleep(0)
+    assert not hub._wakeup.is_set()
+    await asyncio.to_thread(hub.wake, {test_organization.id})
+    await asyncio.sleep(0)
+    assert hub._wakeup.is_set()
@@ -0,0 +1,35 @@
+import pytest
+from fastapi.testclient import TestClient
+
+
+def test_metrics_exposition(client: TestClient, admin_headers, metrics_headers):
+    """Test that /metrics reports route latency, caches and pool stats"""
+    client.get("/api/v1/analytics/productivity", params={"start": 0, "end": 1000}, headers=admin_headers)
+
+    response = client.get("/metrics", headers=metrics_headers)
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    body = response.text
+    assert '# TYPE http_request_duration_seconds histogram' in body
+    assert 'http_request_duration_seconds_count{method="GET",route="/api/v1/analytics/productivity"}' in body
+    assert 'http_requests_total{method="GET",route="/api/v1/analytics/productivity",status="200"}' in body
+    assert 'http_requests_in_flight' in body
+    assert 'cache_misses_total{cache="productivity"}' in body
+    assert 'db_pool_size{engine="primary"}' in body
+
+
+def test_metrics_require_the_token(client: TestClient, admin_headers, monkeypatch):
+    """Test that /metrics is not served without METRICS_TOKEN, and only to its bearer with one"""
+    from app.core.config import settings
+    assert client.get("/metrics").status_code == 404
+    monkeypatch.setattr(settings, "METRICS_TOKEN", "secret")
+    assert client.get("/metrics").status_code == 401
+    assert client.get("/metrics", headers=admin_headers).status_code == 401
+    assert client.get("/metrics", headers={"Authorization": "Bearer secret"}).status_code == 200
+
+
+def test_label_values_are_escaped():
+    from app.core.metrics import Counter
+    counter = Counter("escaped_total", "Label escaping", ("value",))
+    counter.inc(1, 'a\\b "c"\nd')
+    assert counter.render()[-1] == 'escaped_total{value="a\\\\b \\"c\\"\\nd"} 1'
@@ -0,0 +1,110 @@
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import sessionmaker
+from app.models.outbox import OutboxCursor, OutboxEvent
+from app.services.outbox import OutboxDispatcher, record_event
+
+
+def _events(db, organization_id):
+    return db.query(OutboxEvent).filter(
+        OutboxEvent.organizationId == organization_id
+    ).order_by(OutboxEvent.sequence).all()
+
+
+def test_mutations_record_events_in_order(client: TestClient, user_headers, admin_headers, db, test_user, test_project):
+    """Test that shift and screenshot changes are written to the outbox with sequences"""
+    test_project.employees.append(test_user)
+    db.commit()
+
+    shift = client.post(
+        "/api/v1/user/time-tracking/start", json={"name": "Work", "projectId": test_project.id}, headers=user_headers
+    ).json()
+    client.post("/api/v1/user/screenshots/", json={"timestamp": 2000, "productivity": 1.0}, headers=user_headers)
+    client.post("/api/v1/user/time-tracking/end", headers=user_headers)
+
+    events = _events(db, test_user.organizationId)
+    assert [e.type for e in events] == ["shift.started", "screenshot.created", "shift.ended"]
+    assert [e.sequence for e in events] == [1, 2, 3]
+    assert events[0].entityId == shift["id"]
+    assert events[0].payload["projectId"] == test_project.id
+    assert events[1].payload["employeeId"] == test_user.id
+
+    page = client.get("/api/v1/events/", params={"since": 1}, headers=admin_headers).json()
+    assert [e["type"] for e in page["events"]] == ["screenshot.created", "shift.ended"]
+    assert page["lastSequence"] == 3
+
+    page = client.get("/api/v1/events/", params={"type": "shift.ended"}, headers=admin_headers).json()
+    assert [e["sequence"] for e in page["events"]] == [3]
+    assert client.get("/api/v1/events/", params={"since": 3}, headers=admin_headers).json() == {
+        "events": [], "lastSequence": 3
+    }
+
+
+def test_member_changes_record_added_and_removed(client: TestClient, admin_headers, db, test_user, test_admin_user, test_project):
+    client.patch(
+        f"/api/v1/project/{test_project.id}/employees", json={"add": [test_user.id]}, headers=admin_headers
+    )
+    client.put(
+        f"/api/v1/project/{test_project.id}",
+        json={"name": "Renamed", "employees": [test_admin_user.id]},
+        headers=admin_headers
+    )
+
+    events = [(e.type, e.payload) for e in _events(db, test_project.organizationId)]
+    assert events == [
+        ("project.members_changed", {"name": "Test Project", "added": [test_user.id], "removed": []}),
+        ("project.members_changed", {"name": "Renamed", "added": [test_admin_user.id], "removed": [test_user.id]}),
+        ("project.updated", {"name": "Renamed", "fields": ["name"]}),
+    ]
+
+
+def test_rolled_back_events_are_discarded(db, test_organization):
+    record_event(db, test_organization.id, "test.discarded")
+    db.rollback()
+    record_event(db, test_organization.id, "test.kept")
+    db.commit()
+
+    events = _events(db, test_organization.id)
+    assert [(e.type, e.sequence) for e in events] == [("test.kept", 1)]
+
+
+def test_sequences_are_per_organization(db, test_organization):
+    from app.models.organization import Organization
+    other = Organization(name="Other", domain="other.com")
+    db.add(other)
+    db.commit()
+
+    for i in range(3):
+        record_event(db, test_organization.id, "test.event", payload={"i": i})
+        record_event(db, other.id, "test.event", payload={"i": i})
+    db.commit()
+    record_event(db, other.id, "test.event")
+    db.commit()
+
+    assert [e.sequence for e in _events(db, test_organization.id)] == [1, 2, 3]
+    assert [e.sequence for e in _events(db, other.id)] == [1, 2, 3, 4]
+
+
+def test_dispatcher_delivers_batches_in_order(db, test_organization):
+    """Test that consumers get every event once, in order, and failed batches are retried"""
+    for i in range(5):
+        record_event(db, test_organization.id, "test.event", payload={"i": i})
+    db.commit()
+
+    dispatcher = OutboxDispatcher(sessionmaker(bind=db.get_bind()), batch_size=2)
+    batches = []
+    failures = [RuntimeError("Consumer down")]
+
+    @dispatcher.consumer("test")
+    def consume(session, events):
+        if failures:
+            raise failures.pop()
+        batches.append([e.payload["i"] for e in events])
+
+    assert dispatcher.run_once() == 0
+    while dispatcher.run_once():
+        pass
+
+    assert batches == [[0, 1], [2, 3], [4]]
+    cursor = db.query(OutboxCursor).filter(OutboxCursor.consumer == "test").one()
+    assert cursor.lastSequence == 5
@@ -0,0 +1,41 @@
+from datetime import datetime, timezone
+from app.services.partition_service import MonthPartition, PartitionService
+
+
+def _ms(*args) -> int:
+    return int(datetime(*args, tzinfo=timezone.utc).timestamp() * 1000)
+
+
+def test_month_partition_bounds():
+    """Test monthly partition names and millisecond bounds, across a year end"""
+    partition = MonthPartition.containing("screenshots", _ms(2026, 12, 31, 23, 59))
+    assert partition.name == "screenshots_p2026_12"
+    assert partition.lower == _ms(2026, 12, 1)
+    assert partition.upper == _ms(2027, 1, 1)
+    assert partition.next().name == "screenshots_p2027_01"
+
+    parsed = MonthPartition.from_name("shifts_p2027_01")
+    assert (parsed.table, parsed.year, parsed.month) == ("shifts", 2027, 1)
+    assert MonthPartition.from_name("shifts_default") is None
+
+
+def test_retention_cutoff_uses_longest_retention(db, test_organization):
+    """Test that partitions are only expired once every organization's retention passed"""
+    from app.models.organization import Organization
+    service = PartitionService(db)
+    now = _ms(2026, 10, 1)
+    assert service.retention_cutoff("screenshots", now) is None
+
+    test_organization.screenshotRetentionDays = 30
+    db.add(Organization(name="Other", domain="other.com", screenshotRetentionDays=90))
+    db.commit()
+    assert service.retention_cutoff("screenshots", now) == now - 90 * 24 * 60 * 60 * 1000
+    # Shift retention is independent and still unlimited
+    assert service.retention_cutoff("shifts", now) is None
+
+
+def test_maintenance_skips_unpartitioned_tables(db):
+    """Test that maintenance is a no-op on databases without partitioning"""
+    report = PartitionService(db).run_maintenance()
+    assert report["screenshots"] == {"partitioned": False, "created": [], "expired": []}
+    assert report["shifts"]["partitioned"] is False
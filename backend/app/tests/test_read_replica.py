@@ -0,0 +1,62 @@
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+from app.db.database import Base, read_replica
+
+
+@pytest.fixture
+def replica(monkeypatch):
+    """Second in-memory database standing in for the read replica"""
+    replica_engine = create_engine(
+        "sqlite:///:memory:",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    Base.metadata.create_all(bind=replica_engine)
+    session_factory = sessionmaker(autocommit=False, autoflush=False, bind=replica_engine)
+    monkeypatch.setattr(read_replica, "session_factory", session_factory)
+    monkeypatch.setattr(read_replica, "down_until", 0.0)
+    monkeypatch.setattr(read_replica, "_writes", {})
+    yield session_factory
+    Base.metadata.drop_all(bind=replica_engine)
+
+
+def _add_replica_employee(session_factory, organization_id: str):
+    from app.models.employee import Employee
+    replica_db = session_factory()
+    replica_db.add(Employee(name="Replica Only", email="replica@test.com", organizationId=organization_id))
+    replica_db.commit()
+    replica_db.close()
+
+
+def _employee_names(client: TestClient, headers):
+    response = client.get("/api/v1/employee/", headers=headers)
+    assert response.status_code == 200
+    return {employee["name"] for employee in response.json()}
+
+
+def test_reads_use_replica(client: TestClient, admin_headers, test_organization, replica):
+    """Test that list endpoints read from the replica"""
+    _add_replica_employee(replica, test_organization.id)
+    assert _employee_names(client, admin_headers) == {"Replica Only"}
+
+
+def test_reads_follow_own_writes(client: TestClient, admin_headers, test_organization, test_user, replica):
+    """Test that a user's reads go to the primary right after their writes"""
+    _add_replica_employee(replica, test_organization.id)
+    response = client.put(f"/api/v1/employee/{test_user.id}", json={"name": "Renamed"}, headers=admin_headers)
+    assert response.status_code == 200
+
+    assert "Renamed" in _employee_names(client, admin_headers)
+
+
+def test_reads_fall_back_when_replica_down(client: TestClient, admin_headers, test_user, monkeypatch):
+    """Test that an unreachable replica is skipped in favour of the primary"""
+    unreachable = create_engine("sqlite:////nonexistent/replica.db")
+    monkeypatch.setattr(read_replica, "session_factory", sessionmaker(bind=unreachable))
+    monkeypatch.setattr(read_replica, "down_until", 0.0)
+
+    assert "Test User" in _employee_names(client, admin_headers)
+    assert read_replica.down_until > 0
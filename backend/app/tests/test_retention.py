@@ -0,0 +1,129 @@
+import pytest
+from app.services.retention_service import RetentionService, LocalImageStore
+
+DAY_MS = 24 * 60 * 60 * 1000
+NOW = 1000 * DAY_MS
+
+
+@pytest.fixture
+def image_dir(tmp_path, monkeypatch):
+    from app.services import retention_service
+    monkeypatch.setattr(retention_service, "image_store", LocalImageStore(str(tmp_path), "/screenshots/"))
+    return tmp_path
+
+
+def _add_screenshots(db, user, shift_id: str, timestamps, image_dir=None):
+    from app.models.screenshot import Screenshot
+    for i, timestamp in enumerate(timestamps):
+        image_url = None
+        if image_dir is not None:
+            (image_dir / f"{shift_id}-{i}.png").write_bytes(b"png")
+            image_url = f"/screenshots/{shift_id}-{i}.png"
+        db.add(Screenshot(
+            employeeId=user.id,
+            organizationId=user.organizationId,
+            shiftId=shift_id,
+            timestamp=timestamp,
+            imageUrl=image_url
+        ))
+    db.commit()
+
+
+def _add_shift(db, user, start: int):
+    from app.models.shift import Shift
+    shift = Shift(start=start, end=start + DAY_MS, employeeId=user.id, organizationId=user.organizationId)
+    db.add(shift)
+    db.commit()
+    return shift
+
+
+def test_purge_deletes_expired_screenshots_in_batches(db, test_user, test_organization, image_dir):
+    """Test that expired rows and files are deleted and shift counters updated"""
+    from app.models.screenshot import Screenshot
+    test_organization.screenshotRetentionDays = 30
+    db.commit()
+    old_shift = _add_shift(db, test_user, NOW - 100 * DAY_MS)
+    new_shift = _add_shift(db, test_user, NOW - DAY_MS)
+    _add_screenshots(db, test_user, old_shift.id, [NOW - 100 * DAY_MS + i for i in range(5)], image_dir)
+    _add_screenshots(db, test_user, new_shift.id, [NOW - DAY_MS], image_dir)
+
+    pauses = []
+    service = RetentionService(db, batch_size=2, pause_seconds=0.5, sleep=pauses.append)
+    run = service.purge_organization(test_organization, now_ms=NOW)
+
+    assert run.status == "completed"
+    assert run.deletedScreenshots == 5
+    assert run.deletedFiles == 5
+    assert pauses == [0.5, 0.5]
+    assert db.query(Screenshot).count() == 1
+    assert sorted(p.name for p in image_dir.iterdir()) == [f"{new_shift.id}-0.png"]
+    db.refresh(old_shift)
+    db.refresh(new_shift)
+    assert old_shift.deletedScreenshots == 5
+    assert new_shift.deletedScreenshots == 0
+
+
+def test_purge_resumes_bounded_run(db, test_user, test_organization):
+    """Test that a run stopped after max_batches resumes with the same cutoff"""
+    from app.models.retention_run import RetentionRun
+    test_organization.screenshotRetentionDays = 30
+    db.commit()
+    shift = _add_shift(db, test_user, NOW - 100 * DAY_MS)
+    _add_screenshots(db, test_user, shift.id, [NOW - 100 * DAY_MS + i for i in range(5)])
+
+    service = RetentionService(db, batch_size=2, pause_seconds=0)
+    first = service.purge_organization(test_organization, max_batches=1, now_ms=NOW)
+    assert first.status == "running"
+    assert first.deletedScreenshots == 2
+
+    # A later invocation keeps the original cutoff rather than recomputing it
+    resumed = service.purge_organization(test_organization, now_ms=NOW + 365 * DAY_MS)
+    assert resumed.id == first.id
+    assert resumed.status == "completed"
+    assert resumed.deletedScreenshots == 5
+    assert db.query(RetentionRun).count() == 1
+
+
+def test_purge_skips_organizations_without_policy(db, test_user, test_organization):
+    """Test that screenshots are kept forever without a retention policy"""
+    from app.models.screenshot import Screenshot
+    shift = _add_shift(db, test_user, 0)
+    _add_screenshots(db, test_user, shift.id, [0])
+    assert RetentionService(db).purge_all(now_ms=NOW) == []
+    assert db.query(Screenshot).count() == 1
+
+
+def test_purge_all_continues_after_a_failing_organization(db, test_user, test_organization, monkeypatch):
+    """Test that one organization's error fails its run without stopping the others"""
+    from app.models.organization import Organization
+    from app.models.screenshot import Screenshot
+    broken = Organization(name="Broken", domain="broken.com", screenshotRetentionDays=30)
+    test_organization.screenshotRetentionDays = 30
+    db.add(broken)
+    db.commit()
+    shift = _add_shift(db, test_user, NOW - 100 * DAY_MS)
+    _add_screenshots(db, test_user, shift.id, [NOW - 100 * DAY_MS])
+
+    service = RetentionService(db, pause_seconds=0)
+    purge_batch = service.purge_batch
+
+    def failing_batch(run):
+        if run.organizationId == broken.id:
+            raise RuntimeError("disk full")
+        return purge_batch(run)
+
+    monkeypatch.setattr(service, "purge_batch", failing_batch)
+    runs = {run.organizationId: run for run in service.purge_all(now_ms=NOW)}
+    assert runs[broken.id].status == "failed" and runs[broken.id].error == "disk full"
+    assert runs[test_organization.id].status == "completed"
+    assert db.query(Screenshot).count() == 0
+
+
+def test_image_store_stays_inside_directory(tmp_path):
+    """Test that crafted image URLs cannot delete files outside storage"""
+    outside = tmp_path / "secret.txt"
+    outside.write_text("keep")
+    store = LocalImageStore(str(tmp_path / "images"), "/screenshots/")
+    assert store.delete("/screenshots/../secret.txt") is False
+    assert store.delete("https://cdn.example.com/a.png") is False
+    assert outside.exists()
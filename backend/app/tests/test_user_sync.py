@@ -0,0 +1,73 @@
+from fastapi.testclient import TestClient
+from app.models.outbox import OutboxEvent
+
+
+def _sync(client, headers, since=0):
+    response = client.get("/api/v1/user/sync/", params={"since": since}, headers=headers)
+    assert response.status_code == 200
+    return response.json()
+
+
+def test_first_sync_returns_full_catalog(client: TestClient, user_headers, db, test_user, test_project, test_task):
+    test_project.employees.append(test_user)
+    test_task.employees.append(test_user)
+    db.commit()
+
+    result = _sync(client, user_headers)
+    assert result["full"] is True
+    assert [p["id"] for p in result["projects"]] == [test_project.id]
+    assert [t["id"] for t in result["tasks"]] == [test_task.id]
+
+
+def test_sync_returns_only_changes_for_the_employee(
+    client: TestClient, user_headers, admin_headers, db, test_user, test_admin_user, test_project
+):
+    """Test that updates, assignments and removals since a version are returned, and nothing when up to date"""
+    client.put(f"/api/v1/project/{test_project.id}", json={"description": "Before the first sync"}, headers=admin_headers)
+    version = _sync(client, user_headers)["version"]
+    assert version == 1
+
+    other = client.post("/api/v1/project/", json={
+        "name": "Other", "organizationId": test_user.organizationId, "employees": [test_admin_user.id]
+    }, headers=admin_headers).json()
+    client.patch(f"/api/v1/employee/{test_user.id}/projects", json={"add": [test_project.id]}, headers=admin_headers)
+    task = client.post(
+        "/api/v1/task/", json={"name": "Build", "projectId": test_project.id, "employees": [test_user.id]},
+        headers=admin_headers
+    ).json()
+
+    result = _sync(client, user_headers, version)
+    assert result["full"] is False
+    assert [p["id"] for p in result["projects"]] == [test_project.id]
+    assert [t["id"] for t in result["tasks"]] == [task["id"]]
+    assert result["deletedProjects"] == [] and result["deletedTasks"] == []
+    version = result["version"]
+
+    # Changes to other employees' projects are not sent
+    client.put(f"/api/v1/project/{other['id']}", json={"name": "Renamed"}, headers=admin_headers)
+    assert _sync(client, user_headers, version)["projects"] == []
+
+    client.put(f"/api/v1/task/{task['id']}", json={"name": "Ship"}, headers=admin_headers)
+    client.patch(f"/api/v1/project/{test_project.id}/employees", json={"remove": [test_user.id]}, headers=admin_headers)
+    result = _sync(client, user_headers, version)
+    assert [t["name"] for t in result["tasks"]] == ["Ship"]
+    assert result["deletedProjects"] == [test_project.id]
+
+    client.delete(f"/api/v1/task/{task['id']}", headers=admin_headers)
+    result = _sync(client, user_headers, result["version"])
+    assert result["tasks"] == [] and result["deletedTasks"] == [task["id"]]
+
+    assert _sync(client, user_headers, result["version"]) == {
+        "version": result["version"], "full": False, "projects": [], "tasks": [], "deletedProjects": [], "deletedTasks": []
+    }
+
+
+def test_pruned_version_falls_back_to_full_catalog(client: TestClient, user_headers, admin_headers, db, test_user, test_project):
+    client.patch(f"/api/v1/employee/{test_user.id}/projects", json={"add": [test_project.id]}, headers=admin_headers)
+    client.put(f"/api/v1/project/{test_project.id}", json={"name": "Renamed"}, headers=admin_headers)
+    db.query(OutboxEvent).filter(OutboxEvent.sequence == 2).delete()
+    db.commit()
+
+    result = _sync(client, user_headers, 1)
+    assert result["full"] is True
+    assert [p["name"] for p in result["projects"]] == ["Renamed"]
@@ -217,4 +217,26 @@ def test_get_time_tracking_history_with_filters(client: TestClient, user_headers
 def test_unauthorized_time_tracking_access(client: TestClient):
     """Test accessing time tracking endpoints without authentication"""
     response = client.post("/api/v1/user/time-tracking/start", json={"name": "Test"})
-    assert response.status_code == 401
\ No newline at end of file
+    assert response.status_code == 401
+
+
+def test_assignment_checks_cached_until_unassigned(client: TestClient, admin_headers, db, test_user, test_project):
+    """Confirmed assignments skip the query until the project's employees change"""
+    from app.core.instrumentation import track_queries
+    from app.services.membership_service import MembershipService
+
+    test_project.employees.append(test_user)
+    db.commit()
+    membership = MembershipService(db)
+    assert membership.is_assigned_to_project(test_user, test_project.id)
+    with track_queries() as stats:
+        assert membership.is_assigned_to_project(test_user, test_project.id)
+    assert stats.count == 0
+
+    response = client.put(
+        f"/api/v1/project/{test_project.id}",
+        json={"employees": []},
+        headers=admin_headers
+    )
+    assert response.status_code == 200
+    assert not membership.is_assigned_to_project(test_user, test_project.id)
@@ -0,0 +1,20 @@
+from contextlib import contextmanager
+from app.core.instrumentation import track_queries
+
+
+def assert_query_budget(response, max_queries: int):
+    """Fail if a request ran more SQL queries than its budget"""
+    count = int(response.headers["x-db-query-count"])
+    assert count <= max_queries, (
+        f"{response.request.method} {response.request.url.path} ran {count} queries, budget is {max_queries}"
+    )
+
+
+@contextmanager
+def query_budget(max_queries: int):
+    """Fail if the block runs more SQL queries than its budget"""
+    with track_queries() as stats:
+        yield stats
+    assert stats.count <= max_queries, (
+        f"Ran {stats.count} queries, budget is {max_queries}:\n" + "\n".join(stats.statements)
+    )
@@ -0,0 +1,91 @@
+"""
+Celery worker for background jobs (JOB_BACKEND=celery), using REDIS_URL as broker.
+
+    celery -A app.worker worker --pool threads --concurrency 4
+    celery -A app.worker beat
+
+The thread pool keeps every job in one process, so JOB_METRICS_PORT exposes
+all of their metrics. Beat schedules retention, partition maintenance, email
+delivery, job recovery, outbox pruning and, once a consumer is registered on
+outbox_dispatcher, outbox dispatch; with other backends, run those from cron
+via the CLI scripts.
+"""
+from celery import Celery
+from celery.schedules import crontab
+from celery.signals import worker_ready
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from app.core.config import settings
+from app.core.jobs import enqueue, recover_jobs, run_job, run_untracked
+from app.core.metrics import registry
+from app.db.database import WriteSessionLocal
+from app.services.outbox import outbox_dispatcher
+import app.tasks  # noqa: F401 (registers the tasks)
+import threading
+
+celery_app = Celery("insightful", broker=settings.REDIS_URL)
+celery_app.conf.update(
+    # A job whose worker dies is redelivered; run_job skips ones that already started
+    task_acks_late=True,
+    worker_prefetch_multiplier=1,
+    task_ignore_result=True,
+    beat_schedule={
+        "retention-purge": {"task": "jobs.schedule", "schedule": crontab(hour=3, minute=0), "args": ("retention.purge",)},
+        "partition-maintenance": {
+            "task": "jobs.schedule", "schedule": crontab(hour=2, minute=0), "args": ("partitions.maintain",)
+        },
+        "email-delivery": {"task": "jobs.run_untracked", "schedule": settings.EMAIL_POLL_SECONDS, "args": ("email.deliver",)},
+        "outbox-prune": {"task": "jobs.schedule", "schedule": crontab(hour=4, minute=0), "args": ("outbox.prune",)},
+        "jobs-recover": {"task": "jobs.recover", "schedule": settings.JOB_RECOVER_SECONDS},
+    },
+)
+# Consumers register when app.tasks is imported; without any, polling would only cost broker messages
+if outbox_dispatcher.consumers:
+    celery_app.conf.beat_schedule["outbox-dispatch"] = {
+        "task": "jobs.run_untracked", "schedule": settings.OUTBOX_POLL_SECONDS, "args": ("outbox.dispatch",)
+    }
+
+
+@celery_app.task(name="jobs.run")
+def run_job_task(job_id: str) -> None:
+    run_job(job_id, WriteSessionLocal)
+
+
+@celery_app.task(name="jobs.schedule")
+def schedule_job_task(name: str) -> None:
+    """Record a system job from beat; enqueue hands it back to a worker"""
+    db = WriteSessionLocal()
+    try:
+        enqueue(db, name)
+    finally:
+        db.close()
+
+
+@celery_app.task(name="jobs.recover")
+def recover_jobs_task() -> None:
+    """Fail jobs whose worker died and resend due jobs whose messages were lost"""
+    recover_jobs(WriteSessionLocal)
+
+
+@celery_app.task(name="jobs.run_untracked")
+def run_untracked_task(name: str) -> None:
+    run_untracked(name, WriteSessionLocal)
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        body = registry.render().encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@worker_ready.connect
+def serve_metrics(**kwargs) -> None:
+    if settings.JOB_METRICS_PORT:
+        server = ThreadingHTTPServer(("0.0.0.0", settings.JOB_METRICS_PORT), _MetricsHandler)
+        threading.Thread(target=server.serve_forever, name="metrics", daemon=True).start()
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Throughput of SQLite's default settings vs the production profile.
+
+Writer threads insert screenshots the way agents do (one row per
+transaction); reader threads run an analytics-style aggregate at the same
+time. Each profile gets a fresh database file.
+
+    cd backend && python -m benchmarks.sqlite_profiles --seconds 10 --writers 4 --readers 4
+"""
+import argparse
+import tempfile
+import threading
+import time
+from pathlib import Path
+from sqlalchemy import create_engine, func
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+from app.db.database import WRITE_OPTIONS, Base, configure_sqlite, sqlite_pragmas
+from app.models import Employee, Organization, Screenshot
+
+
+def _setup(path: Path, profile: str, pool_size: int):
+    engine = create_engine(f"sqlite:///{path}", pool_size=pool_size, max_overflow=0)
+    WriteSession = sessionmaker(bind=engine)
+    if profile == "production":
+        configure_sqlite(engine, sqlite_pragmas(), begin_immediate=True)
+        WriteSession = sessionmaker(bind=engine.execution_options(**WRITE_OPTIONS))
+    Base.metadata.create_all(bind=engine)
+    Session = sessionmaker(bind=engine)
+    db = WriteSession()
+    org = Organization(name="Benchmark", domain="benchmark.local")
+    db.add(org)
+    db.flush()
+    employee = Employee(name="Agent", email="agent@benchmark.local", organizationId=org.id)
+    db.add(employee)
+    db.commit()
+    ids = (org.id, employee.id)
+    db.close()
+    return engine, Session, WriteSession, ids
+
+
+def _run(profile: str, seconds: float, writers: int, readers: int):
+    with tempfile.TemporaryDirectory() as directory:
+        engine, Session, WriteSession, (org_id, employee_id) = _setup(
+            Path(directory) / "bench.db", profile, writers + readers
+        )
+        counts = {"writes": 0, "reads": 0, "errors": 0}
+        lock = threading.Lock()
+        deadline = time.perf_counter() + seconds
+
+        def count(key):
+            with lock:
+                counts[key] += 1
+
+        def writer():
+            db = WriteSession()
+            while time.perf_counter() < deadline:
+                try:
+                    db.add(Screenshot(
+                        employeeId=employee_id,
+                        organizationId=org_id,
+                        timestamp=int(time.time() * 1000),
+                        productivity=0.5,
+                        site="example.com"
+                    ))
+                    db.commit()
+                    count("writes")
+                except OperationalError:
+                    db.rollback()
+                    count("errors")
+            db.close()
+
+        def reader():
+            db = Session()
+            while time.perf_counter() < deadline:
+                try:
+                    db.query(Screenshot.site, func.count(), func.avg(Screenshot.productivity)).filter(
+                        Screenshot.organizationId == org_id
+                    ).group_by(Screenshot.site).all()
+                    db.commit()
+                    count("reads")
+                except OperationalError:
+                    db.rollback()
+                    count("errors")
+            db.close()
+
+        threads = [threading.Thread(target=writer) for _ in range(writers)]
+        threads += [threading.Thread(target=reader) for _ in range(readers)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        engine.dispose()
+    return {key: value / seconds for key, value in counts.items()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark SQLite engine profiles")
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--writers", type=int, default=4)
+    parser.add_argument("--readers", type=int, default=4)
+    args = parser.parse_args()
+
+    print(f"{'profile':<12}{'writes/s':>12}{'reads/s':>12}{'errors/s':>12}")
+    for profile in ("default", "production"):
+        result = _run(profile, args.seconds, args.writers, args.readers)
+        print(f"{profile:<12}{result['writes']:>12.1f}{result['reads']:>12.1f}{result['errors']:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
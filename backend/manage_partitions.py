@@ -0,0 +1,33 @@
+#!/usr/bin/env python3
+"""
+Partition maintenance for screenshots and shifts (PostgreSQL).
+
+Creates monthly partitions ahead of time and drops (or detaches) those past
+every organization's retention. Run daily, e.g. from cron:
+
+    python manage_partitions.py --months-ahead 3
+"""
+import argparse
+import json
+from app.db.database import WriteSessionLocal
+from app.services.partition_service import PartitionService
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Maintain time-range partitions")
+    parser.add_argument("--months-ahead", type=int, default=None,
+                        help="Months of future partitions to keep (default: PARTITION_MONTHS_AHEAD)")
+    parser.add_argument("--detach-only", action="store_true",
+                        help="Detach expired partitions instead of dropping them, e.g. to archive them first")
+    args = parser.parse_args()
+
+    db = WriteSessionLocal()
+    try:
+        report = PartitionService(db).run_maintenance(args.months_ahead, args.detach_only)
+        print(json.dumps(report, indent=2))
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
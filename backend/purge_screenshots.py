@@ -0,0 +1,37 @@
+#!/usr/bin/env python3
+"""
+Screenshot retention purge.
+
+Deletes screenshots (rows and local image files) older than each
+organization's screenshotRetentionDays in small batches. Interrupted or
+bounded runs resume where they stopped on the next invocation:
+
+    python purge_screenshots.py --max-batches 500
+"""
+import argparse
+from app.db.database import WriteSessionLocal
+from app.services.retention_service import RetentionService
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Purge screenshots past their retention")
+    parser.add_argument("--batch-size", type=int, default=None,
+                        help="Screenshots per transaction (default: RETENTION_BATCH_SIZE)")
+    parser.add_argument("--pause", type=float, default=None,
+                        help="Seconds between batches (default: RETENTION_BATCH_PAUSE_SECONDS)")
+    parser.add_argument("--max-batches", type=int, default=None,
+                        help="Stop each organization after this many batches and resume next run")
+    args = parser.parse_args()
+
+    db = WriteSessionLocal()
+    try:
+        service = RetentionService(db, batch_size=args.batch_size, pause_seconds=args.pause)
+        for run in service.purge_all(max_batches=args.max_batches):
+            print(f"{run.organizationId}: {run.status}, {run.deletedScreenshots} screenshots, "
+                  f"{run.deletedFiles} files")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""
+Email queue maintenance.
+
+The API process delivers queued emails itself (EMAIL_QUEUE_WORKER). This
+script drains the queue where that worker is disabled, and lists or
+requeues dead-lettered deliveries:
+
+    python send_emails.py              # send everything due now
+    python send_emails.py --dead       # list dead letters
+    python send_emails.py --requeue    # retry all dead letters
+"""
+import argparse
+from app.db.database import WriteSessionLocal
+from app.models.email_delivery import EmailDelivery
+from app.services.email_queue import email_queue
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Send queued emails and manage dead letters")
+    parser.add_argument("--dead", action="store_true", help="List dead-lettered deliveries")
+    parser.add_argument("--requeue", nargs="*", metavar="ID",
+                        help="Requeue dead deliveries (all of them when no ids are given)")
+    args = parser.parse_args()
+
+    db = WriteSessionLocal()
+    try:
+        if args.dead:
+            for delivery in db.query(EmailDelivery).filter(EmailDelivery.status == "dead").order_by(
+                EmailDelivery.createdAt
+            ):
+                print(f"{delivery.id} {delivery.kind} {delivery.recipient} "
+                      f"after {delivery.attempts} attempts: {delivery.lastError}")
+            return
+        if args.requeue is not None:
+            print(f"Requeued {email_queue.requeue_dead(db, args.requeue or None)} deliveries")
+            return
+    finally:
+        db.close()
+
+    while True:
+        counts = email_queue.run_once()
+        if any(counts.values()):
+            print(", ".join(f"{count} {outcome}" for outcome, count in counts.items()))
+        if sum(counts.values()) < email_queue.batch_size:
+            break
+
+
+if __name__ == "__main__":
+    main()